@@ -0,0 +1,87 @@
+"""
+bench_datetime_parsing.py
+
+Compare the per-row datetime parsing used originally by
+parse_and_enrich_datetime() with the unique-timestamp path.
+
+Usage:
+    python benchmarks/bench_datetime_parsing.py [--rows 10000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_cleaning import (
+    START_TIME_COL,
+    END_TIME_COL,
+    TRIP_DURATION_COL,
+    TRIP_DATE_COL,
+    START_HOUR_COL,
+    START_WEEKDAY_COL,
+    START_MONTH_COL,
+    TRIP_DURATION_MIN_COL,
+    parse_and_enrich_datetime,
+)
+
+
+def synthetic_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Minute-resolution start/end strings spread over one month."""
+    rng = np.random.default_rng(seed)
+    minutes = rng.integers(0, 31 * 24 * 60, n_rows)
+    # Format the ~45k distinct minutes once, then broadcast them
+    stamps = (pd.Timestamp("2024-08-01") + pd.to_timedelta(np.arange(32 * 24 * 60), unit="min"))
+    labels = np.asarray(stamps.strftime("%m/%d/%Y %H:%M"), dtype=object)
+    durations = rng.integers(60, 3600, n_rows)
+    return pd.DataFrame(
+        {
+            TRIP_DURATION_COL: durations,
+            START_TIME_COL: labels[minutes],
+            END_TIME_COL: labels[minutes + durations // 60],
+        }
+    )
+
+
+def per_row_enrich(df: pd.DataFrame) -> pd.DataFrame:
+    """The original implementation: parse and format every row."""
+    df = df.copy()
+    df[START_TIME_COL] = pd.to_datetime(df[START_TIME_COL], format="%m/%d/%Y %H:%M")
+    df[END_TIME_COL] = pd.to_datetime(df[END_TIME_COL], format="%m/%d/%Y %H:%M")
+    df[TRIP_DATE_COL] = df[START_TIME_COL].dt.date
+    df[START_HOUR_COL] = df[START_TIME_COL].dt.hour
+    df[START_WEEKDAY_COL] = df[START_TIME_COL].dt.day_name()
+    df[START_MONTH_COL] = df[START_TIME_COL].dt.strftime("%B")
+    df[TRIP_DURATION_MIN_COL] = df[TRIP_DURATION_COL] / 60.0
+    return df
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    print(f"rows: {args.rows:,}  distinct start times: {df[START_TIME_COL].nunique():,}")
+
+    old, t_old = timed(per_row_enrich, df)
+    new, t_new = timed(parse_and_enrich_datetime, df)
+    pd.testing.assert_frame_equal(new, old)
+
+    print(f"per-row parsing:          {t_old:8.2f} s")
+    print(f"unique-timestamp parsing: {t_new:8.2f} s")
+    print(f"speedup:                  {t_old / t_new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+bench_suite.py
+
+Time and measure the peak memory of the loading, cleaning and analytics
+stages on synthetic trip data (src/synthetic.py) at several sizes, and
+write the results to a JSON file so runs can be compared over time.
+
+Every stage is timed `--repeat` times without tracing (the best time is
+kept), then run once more under tracemalloc for its peak memory, i.e.
+the most memory the stage held at once on top of its inputs.
+
+Usage:
+    python benchmarks/bench_suite.py [--rows 100000 1000000 10000000]
+                                     [--output bench_results.json]
+                                     [--baseline previous.json]
+"""
+
+import argparse
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import analytics
+from src.data_cleaning import clean_basic, clean_chunks, parse_and_enrich_datetime
+from src.data_loading import iter_raw_data_chunks, load_raw_data
+from src.sql_backend import TripDatabase, build_trip_database
+from src.synthetic import write_synthetic_csv
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+SCHEMA_VERSION = 1
+
+# Public analytics helpers that do not touch trip data
+NOT_BENCHMARKED = {"partials_for"}
+
+
+def _rows(result):
+    """Row count of a stage's output (None when it is not a frame)."""
+    return len(result) if isinstance(result, (pd.DataFrame, pd.Series)) else None
+
+
+def analytics_benchmarks(csv_path: str):
+    """
+    (name, function of the enriched frame) for every public analytics function.
+
+    The partial / merge / finalize steps each get their own entry; the
+    streaming summary re-reads the CSV in chunks.
+    """
+
+    def partials(df):
+        return analytics.partial_trip_aggregates(df)
+
+    def merged(df):
+        half = len(df) // 2
+        return analytics.merge_trip_aggregates([partials(df.iloc[:half]), partials(df.iloc[half:])])
+
+    def stream(df):
+        return analytics.stream_trip_summary(clean_chunks(iter_raw_data_chunks(csv_path)))
+
+    return [
+        ("hourly_trip_counts", analytics.hourly_trip_counts),
+        ("daily_trip_counts", analytics.daily_trip_counts),
+        ("weekly_trip_counts", analytics.weekly_trip_counts),
+        ("period_trip_counts(month)", lambda df: analytics.period_trip_counts(df, "month")),
+        ("period_from_daily_counts(week)", lambda df: analytics.period_from_daily_counts(
+            analytics.daily_trip_counts(df), "week")),
+        ("weekly_from_daily_counts", lambda df: analytics.weekly_from_daily_counts(analytics.daily_trip_counts(df))),
+        ("popular_stations(start)", lambda df: analytics.popular_stations(df, by="start")),
+        ("popular_stations(end)", lambda df: analytics.popular_stations(df, by="end")),
+        ("station_id_counts(start)", lambda df: analytics.station_id_counts(df, by="start")),
+        ("top_n_counts", lambda df: analytics.top_n_counts(df["Bike Id"].value_counts(sort=False), 10)),
+        ("user_type_summary", analytics.user_type_summary),
+        ("trip_duration_summary", analytics.trip_duration_summary),
+        ("partial_trip_aggregates", partials),
+        ("merge_trip_aggregates", merged),
+        ("finalize_trip_aggregates", lambda df: analytics.finalize_trip_aggregates(partials(df))),
+        ("compute_aggregates", analytics.compute_aggregates),
+        ("compute_aggregates(approximate)", lambda df: analytics.compute_aggregates(df, approximate=True)),
+        ("stream_trip_summary", stream),
+    ]
+
+
+def sql_backend_benchmarks():
+    """(name, function of an unfiltered SQLSelection) for the pushed-down queries."""
+    return [
+        ("sql hourly_trip_counts", lambda s: s.hourly_trip_counts()),
+        ("sql daily_trip_counts", lambda s: s.daily_trip_counts()),
+        ("sql weekly_trip_counts", lambda s: s.weekly_trip_counts()),
+        ("sql popular_stations(start)", lambda s: s.popular_stations(by="start")),
+        ("sql user_type_summary", lambda s: s.user_type_summary()),
+    ]
+
+
+def uncovered_analytics(names) -> list:
+    """Public analytics functions missing from the benchmark list."""
+    public = [
+        name
+        for name, member in inspect.getmembers(analytics, inspect.isfunction)
+        if not name.startswith("_") and member.__module__ == analytics.__name__
+    ]
+    covered = {name.split("(")[0] for name in names}
+    return sorted(set(public) - covered - NOT_BENCHMARKED)
+
+
+def measure(func, arg, repeat: int, trace_memory: bool) -> dict:
+    """Best wall time over `repeat` runs, plus the traced peak of one more run."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - start)
+
+    peak_mb = None
+    if trace_memory:
+        del result
+        tracemalloc.start()
+        try:
+            result = func(arg)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+    return {"seconds": best, "peak_mb": peak_mb, "rows_out": _rows(result), "result": result}
+
+
+def run_size(n_rows: int, seed: int, repeat: int, trace_memory: bool, workdir: str) -> list:
+    """Benchmark every stage on one synthetic dataset size."""
+    csv_path = os.path.join(workdir, f"trips_{n_rows}_{seed}.csv")
+    write_synthetic_csv(csv_path, n_rows, seed=seed)
+
+    records = []
+
+    def record(group, stage, func, arg, rows_in):
+        m = measure(func, arg, repeat, trace_memory)
+        records.append(
+            {
+                "rows": n_rows,
+                "group": group,
+                "stage": stage,
+                "seconds": round(m["seconds"], 6),
+                "peak_mb": None if m["peak_mb"] is None else round(m["peak_mb"], 3),
+                "rows_in": rows_in,
+                "rows_out": m["rows_out"],
+            }
+        )
+        peak = "" if m["peak_mb"] is None else f"{m['peak_mb']:10.1f} MB"
+        print(f"  {stage:<34} {m['seconds']:9.3f} s {peak}")
+        return m["result"]
+
+    print(f"\n{n_rows:,} rows")
+    raw = record("data_loading", "load_raw_data", load_raw_data, csv_path, n_rows)
+    basic = record("data_cleaning", "clean_basic", clean_basic, raw, len(raw))
+    del raw
+    df = record("data_cleaning", "parse_and_enrich_datetime", parse_and_enrich_datetime, basic, len(basic))
+    del basic
+
+    for stage, func in analytics_benchmarks(csv_path):
+        record("analytics", stage, func, df, len(df))
+
+    db_path = os.path.join(workdir, f"trips_{n_rows}_{seed}.sqlite")
+
+    def build(d):
+        # Each run recreates the file, so no connection may outlive it
+        build_trip_database(d, db_path).close()
+
+    record("sql_backend", "build_trip_database", build, df, len(df))
+    with TripDatabase(db_path) as db:
+        for stage, func in sql_backend_benchmarks():
+            record("sql_backend", stage, func, db.select(), len(df))
+    os.remove(db_path)
+
+    os.remove(csv_path)
+    return records
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results: list, baseline_path: str) -> None:
+    """Print the time / memory ratio of each stage against a previous run."""
+    with open(baseline_path) as handle:
+        baseline = {(r["rows"], r["stage"]): r for r in json.load(handle)["results"]}
+
+    print(f"\nCompared with {baseline_path} (ratio > 1 = slower / bigger now):")
+    for r in results:
+        old = baseline.get((r["rows"], r["stage"]))
+        if old is None:
+            continue
+        time_ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("nan")
+        line = f"  {r['rows']:>10,} {r['stage']:<34} time x{time_ratio:6.2f}"
+        if r["peak_mb"] is not None and old.get("peak_mb"):
+            line += f"   memory x{r['peak_mb'] / old['peak_mb']:6.2f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc runs.")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="A previous results file to compare with.")
+    args = parser.parse_args()
+
+    missing = uncovered_analytics(name for name, _ in analytics_benchmarks(""))
+    if missing:
+        print(f"warning: analytics functions without a benchmark: {missing}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in args.rows:
+            results.extend(run_size(n_rows, args.seed, max(args.repeat, 1), not args.no_memory, workdir))
+
+    report = {
+        "schema_version": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "config": {"rows": args.rows, "seed": args.seed, "repeat": args.repeat, "memory": not args.no_memory},
+        "results": results,
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
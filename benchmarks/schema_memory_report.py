@@ -0,0 +1,84 @@
+"""
+schema_memory_report.py
+
+Memory usage of the cleaned trip frame before and after the compact
+schema (schema.py), plus a check that every analytics function returns
+the same results on both versions.
+
+Usage:
+    python benchmarks/schema_memory_report.py [--rows 1000000]
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import analytics
+from src.data_cleaning import TRIP_DATE_COL, TRIP_DURATION_COL, TRIP_DURATION_MIN_COL, full_clean_pipeline
+from src.schema import memory_usage_report
+from src.synthetic import generate_trips
+
+
+def to_legacy_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Rebuild the pre-schema frame: object strings, datetime.date, int64/float64."""
+    legacy = {}
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            legacy[col] = series.astype(object)
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            legacy[col] = series.astype("int64")
+        else:
+            legacy[col] = series
+    legacy = pd.DataFrame(legacy)
+    legacy[TRIP_DATE_COL] = df[TRIP_DATE_COL].dt.date
+    legacy[TRIP_DURATION_MIN_COL] = legacy[TRIP_DURATION_COL] / 60.0
+    return legacy
+
+
+def compare_analytics(legacy: pd.DataFrame, compact: pd.DataFrame) -> None:
+    """Assert every analytics function gives the same answer on both frames."""
+    checks = {
+        "hourly_trip_counts": analytics.hourly_trip_counts,
+        "daily_trip_counts": analytics.daily_trip_counts,
+        "weekly_trip_counts": analytics.weekly_trip_counts,
+        "popular_stations(start)": lambda d: analytics.popular_stations(d, by="start"),
+        "popular_stations(end)": lambda d: analytics.popular_stations(d, by="end"),
+        "user_type_summary": analytics.user_type_summary,
+    }
+    for name, func in checks.items():
+        old, new = func(legacy), func(compact)
+        if TRIP_DATE_COL in old.columns:
+            old[TRIP_DATE_COL] = pd.to_datetime(old[TRIP_DATE_COL])
+        # float32 minutes: averages agree to float32 precision
+        pd.testing.assert_frame_equal(new, old, check_dtype=False, rtol=1e-6)
+        print(f"  {name:<26} identical")
+
+    old, new = analytics.trip_duration_summary(legacy), analytics.trip_duration_summary(compact)
+    assert old.keys() == new.keys()
+    assert all(np.isclose(old[k], new[k], rtol=1e-6) for k in old)
+    print(f"  {'trip_duration_summary':<26} identical")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    compact = full_clean_pipeline(generate_trips(args.rows))
+    legacy = to_legacy_dtypes(compact)
+
+    report = memory_usage_report(legacy, compact)
+    with pd.option_context("display.width", 120, "display.max_columns", 10):
+        print(report.to_string(index=False, float_format="{:.1f}".format))
+
+    print("\nAnalytics results (legacy vs compact schema):")
+    compare_analytics(legacy, compact)
+
+
+if __name__ == "__main__":
+    main()
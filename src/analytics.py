@@ -1,55 +1,38 @@
 
-from typing import Dict, Literal
-
-# -----------------------------------------------------------------------
-# Import handling:
-# The following block allows analytics.py to be imported or executed
-# -----------------------------------------------------------------------
+from typing import Dict, Iterable, Literal
 
+import numpy as np
 import pandas as pd
 
-try:
-    # Intento 1: Cuando analytics.py se importa como parte del paquete src
-    from .data_cleaning import (
-        TRIP_DATE_COL,
-        START_HOUR_COL,
-    )
-    from .data_loading import START_TIME_COL
-except ImportError:
-    # Intento 2: Cuando analytics.py se ejecuta directamente
-    try:
-        from data_cleaning import (
-            TRIP_DATE_COL,
-            START_HOUR_COL,
-            TRIP_DURATION_MIN_COL,
-            START_WEEKDAY_COL,
-            START_MONTH_COL
-        )
-        from data_loading import START_TIME_COL
-    except ImportError:
-        # Intento 3: Cuando se ejecuta desde otro directorio
-        import sys
-        import os
-        
-        # Agregar el directorio actual al path
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        sys.path.insert(0, current_dir)
-        
-        from data_cleaning import (
-            TRIP_DATE_COL,
-            START_HOUR_COL,
-            TRIP_DURATION_MIN_COL,
-            START_WEEKDAY_COL,
-            START_MONTH_COL
-        )
-        from data_loading import START_TIME_COL
+from .data_cleaning import (
+    TRIP_DATE_COL,
+    START_HOUR_COL,
+    TRIP_DURATION_MIN_COL,
+    START_WEEKDAY_COL,
+    START_MONTH_COL
+)
+from .data_loading import START_TIME_COL
+from .instrumentation import instrument
+from .sketches import DEFAULT_HEAVY_HITTER_CAPACITY, DurationSketch, HeavyHitters
 
 # =======================================================================
 #                               ANALYTICS
 # =======================================================================
+#
+# Station names and User Type are categoricals (see schema.py). Groupbys
+# use observed=True so unused categories never show up as zero rows, and
+# key columns are returned as plain values, as with the object schema.
+
+
+def _plain_values(values):
+    """Convert categorical values / index back to their category dtype."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(values.dtype.categories.dtype)
+    return values
 
 
 
+@instrument()
 def hourly_trip_counts(df: pd.DataFrame) -> pd.DataFrame:
     """
     Compute the total number of trips occurring in each hour of the day.
@@ -74,12 +57,13 @@ def hourly_trip_counts(df: pd.DataFrame) -> pd.DataFrame:
     return grouped
 
     
+@instrument()
 def daily_trip_counts(df: pd.DataFrame) -> pd.DataFrame:
     """
     Compute the total number of trips per calendar day.
 
     Returns:
-            - TRIP_DATE_COL (datetime.date)
+            - TRIP_DATE_COL (datetime64[s], midnight of each day)
             - trip_count (int)
 
     Raises:
@@ -99,7 +83,7 @@ def daily_trip_counts(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def weekly_trip_counts(df: pd.DataFrame) -> pd.DataFrame:
- """
+    """
     Compute the number of trips grouped by ISO week number.
     Week labels follow the ISO format YYYY-Www.
 
@@ -111,29 +95,127 @@ def weekly_trip_counts(df: pd.DataFrame) -> pd.DataFrame:
         ValueError: If TRIP_DATE_COL is missing.
     """
 
-    
+    return period_trip_counts(df, period="week")
+
+
+# -----------------------------------------------------------------------
+# Calendar bucketing
+# -----------------------------------------------------------------------
+#
+# Trips are counted per day number (np.bincount over days since the first
+# trip date), each day in that small range is mapped to an integer period
+# key (ISO year * 100 + ISO week, year * 100 + month, year * 10 + quarter),
+# and labels are formatted once per resulting period. No column is added
+# to the frame and no string is built per trip.
+
+CALENDAR_PERIODS = ("week", "month", "quarter")
+
+
+def _day_numbers(dates: pd.Series) -> np.ndarray:
+    """Days since the epoch of a date column (datetime64 or date objects), NaT dropped."""
+    if not pd.api.types.is_datetime64_any_dtype(dates.dtype):
+        dates = pd.to_datetime(dates)
+    days = dates.to_numpy().astype("datetime64[D]")
+    return days[~np.isnat(days)].view(np.int64)
+
+
+def _period_keys(days: np.ndarray, period: str) -> np.ndarray:
+    """Integer period key of each day number; keys sort like their labels."""
+    if period == "week":
+        # ISO weeks belong to the year of their Thursday
+        thursday = days - (days + 3) % 7 + 3
+        year_start = thursday.astype("datetime64[D]").astype("datetime64[Y]")
+        week = (thursday - year_start.astype("datetime64[D]").view(np.int64)) // 7 + 1
+        return (year_start.view(np.int64) + 1970) * 100 + week
+
+    months = days.astype("datetime64[D]").astype("datetime64[M]").view(np.int64)
+    year, month = months // 12 + 1970, months % 12 + 1
+    if period == "month":
+        return year * 100 + month
+    return year * 10 + (month - 1) // 3 + 1
+
+
+def _period_labels(keys: np.ndarray, period: str) -> list:
+    if period == "week":
+        return [f"{k // 100}-W{k % 100:02d}" for k in keys]
+    if period == "month":
+        return [f"{k // 100}-{k % 100:02d}" for k in keys]
+    return [f"{k // 10}-Q{k % 10}" for k in keys]
+
+
+def _period_counts(days: np.ndarray, period: str, weights=None) -> pd.DataFrame:
+    """[<period>_label, trip_count] frame from day numbers (optionally weighted)."""
+    if period not in CALENDAR_PERIODS:
+        raise ValueError(f"Unknown period: {period!r}. Choose from {list(CALENDAR_PERIODS)}.")
+
+    label_col = f"{period}_label"
+    if len(days) == 0:
+        return pd.DataFrame({label_col: pd.Series([], dtype=str), "trip_count": pd.Series([], dtype=np.int64)})
+
+    first = days.min()
+    per_day = np.bincount(days - first, weights=weights)
+    keys = _period_keys(first + np.arange(len(per_day)), period)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    totals = np.bincount(inverse, weights=per_day).astype(np.int64)
+
+    observed = totals > 0
+    return pd.DataFrame(
+        {
+            label_col: _period_labels(unique_keys[observed], period),
+            "trip_count": totals[observed],
+        }
+    )
+
+
+@instrument()
+def period_trip_counts(df: pd.DataFrame, period: str = "week") -> pd.DataFrame:
+    """
+    Compute the number of trips per calendar period.
+
+    Args:
+        period: "week" (ISO, labels like 2024-W31), "month" (2024-07) or
+            "quarter" (2024-Q3).
+
+    Returns:
+            - <period>_label (str), in chronological order
+            - trip_count (int)
+
+    Raises:
+        ValueError: If TRIP_DATE_COL is missing or the period is unknown.
+    """
+
     if TRIP_DATE_COL not in df.columns:
         raise ValueError(f"{TRIP_DATE_COL} not found. Did you run parse_and_enrich_datetime()?")
 
-    temp = df.copy()
-    temp["week_label"] = temp[TRIP_DATE_COL].dt.strftime("%G-W%V")
+    return _period_counts(_day_numbers(df[TRIP_DATE_COL]), period)
 
-    grouped = (
-        temp.groupby("week_label")
-        .size()
-        .reset_index(name="trip_count")
-        .sort_values("week_label")
-    )
-    return grouped
+
+@instrument()
+def period_from_daily_counts(daily: pd.DataFrame, period: str = "week") -> pd.DataFrame:
+    """
+    Roll the output of daily_trip_counts() up to calendar periods.
+
+    Gives the same frame as period_trip_counts() on the underlying trips.
+    """
+
+    days = _day_numbers(daily[TRIP_DATE_COL])
+    counts = daily["trip_count"].to_numpy(dtype=np.float64)[daily[TRIP_DATE_COL].notna().to_numpy()]
+    return _period_counts(days, period, weights=counts)
 
 
+def weekly_from_daily_counts(daily: pd.DataFrame) -> pd.DataFrame:
+    """Roll the output of daily_trip_counts() up to ISO weeks."""
+    return period_from_daily_counts(daily, period="week")
+
+
+@instrument()
 def popular_stations(
     df: pd.DataFrame,
     top_n: int = 10,
     by: Literal["start", "end"] = "start",
 ) -> pd.DataFrame:
     
- """
+    """
     Compute the top N most frequently used stations.
 
     Args:
@@ -146,6 +228,9 @@ def popular_stations(
             - station_name (str)
             - trip_count (int)
 
+    Stations are ordered by trip count, ties by name. Only the top_n
+    stations are sorted (see top_n_counts()).
+
     Raises:
         ValueError: If the `by` argument is not "start" or "end".
     """
@@ -157,17 +242,76 @@ def popular_stations(
     else:
         raise ValueError("Parameter 'by' must be 'start' or 'end'.")
 
-    grouped = (
-        df.groupby(col)
-        .size()
-        .reset_index(name="trip_count")
-        .sort_values("trip_count", ascending=False)
-        .head(top_n)
+    codes, labels = _encode(df[col])
+    counts = _bincount(codes, labels)
+    counts.index.name = "station_name"
+    return _top_counts_frame(counts[counts > 0], top_n)
+
+
+@instrument()
+def station_id_counts(
+    df: pd.DataFrame,
+    by: Literal["start", "end"] = "start",
+) -> pd.DataFrame:
+    """
+    Count trips per station id (one row per station, for map joins).
+
+    Returns:
+            - station_id (int), sorted
+            - trip_count (int)
+
+    Raises:
+        ValueError: If the `by` argument is not "start" or "end".
+    """
+
+    if by == "start":
+        col = "Start Station Id"
+    elif by == "end":
+        col = "End Station Id"
+    else:
+        raise ValueError("Parameter 'by' must be 'start' or 'end'.")
+
+    codes, labels = _encode(df[col])
+    counts = _bincount(codes, labels)
+    counts = counts[counts > 0]
+    return pd.DataFrame(
+        {
+            "station_id": counts.index.to_numpy().astype(np.int64),
+            "trip_count": counts.to_numpy().astype(np.int64),
+        }
     )
-    grouped = grouped.rename(columns={col: "station_name"})
-    return grouped
 
 
+def top_n_counts(counts: pd.Series, top_n: int) -> pd.Series:
+    """
+    The top_n largest counts, ordered by count (descending) then key.
+
+    Uses a partial selection (np.partition) to find the cut-off count, so
+    only the keys at or above it are sorted.
+    """
+
+    values = counts.to_numpy()
+    n = len(values)
+    if top_n <= 0:
+        return counts.iloc[:0]
+    if top_n < n:
+        kth = np.partition(values, n - top_n)[n - top_n]
+        counts = counts[values >= kth]
+        values = counts.to_numpy()
+
+    key_rank = np.empty(len(counts), dtype=np.intp)
+    key_rank[counts.index.argsort()] = np.arange(len(counts))
+    order = np.lexsort((key_rank, -values))
+    return counts.iloc[order[:top_n]]
+
+
+def _top_counts_frame(counts: pd.Series, top_n: int) -> pd.DataFrame:
+    """[key columns..., trip_count] frame of the top_n counts."""
+    top = top_n_counts(counts, top_n).astype(np.int64)
+    return top.reset_index(name="trip_count")
+
+
+@instrument()
 def user_type_summary(df: pd.DataFrame) -> pd.DataFrame:
     """
     Summarize trips by user type.
@@ -184,19 +328,29 @@ def user_type_summary(df: pd.DataFrame) -> pd.DataFrame:
     if TRIP_DURATION_MIN_COL not in df.columns:
         raise ValueError(f"{TRIP_DURATION_MIN_COL} not found. Did you run parse_and_enrich_datetime()?")
 
-    grouped = (
-        df.groupby("User Type")
-        .agg(
-            trip_count=("Trip Id", "count"),
-            avg_duration_min=(TRIP_DURATION_MIN_COL, "mean"),
-        )
-        .reset_index()
-        .sort_values("trip_count", ascending=False)
+    # Durations are stored as float32; average them in float64
+    user_types = df["User Type"]
+    grouped = pd.DataFrame(
+        {
+            "trip_count": df["Trip Id"].groupby(user_types, observed=True).count(),
+            "avg_duration_min": df[TRIP_DURATION_MIN_COL]
+            .astype("float64")
+            .groupby(user_types, observed=True)
+            .mean(),
+        }
     )
+    grouped.index = _plain_values(grouped.index)
+    grouped = grouped.reset_index().sort_values("trip_count", ascending=False)
     return grouped
     
 
-def trip_duration_summary(df: pd.DataFrame, quantiles=None) -> Dict[str, float]:
+@instrument()
+def trip_duration_summary(
+    df: pd.DataFrame,
+    quantiles=None,
+    approximate: bool = False,
+    relative_accuracy: float = 0.01,
+) -> Dict[str, float]:
     """
     Summary statistics for trip duration (in minutes).
 
@@ -207,6 +361,13 @@ def trip_duration_summary(df: pd.DataFrame, quantiles=None) -> Dict[str, float]:
     ----------
     quantiles : list[float] or None
                 Percentiles to compute, example: [0.25, 0.75].
+    approximate : bool
+                If True, median and percentiles come from a DurationSketch
+                (one bincount pass, no sort) and are within
+                `relative_accuracy` of the exact values; mean, min and max
+                stay exact. See sketches.py for the full error bound.
+    relative_accuracy : float
+                Relative error bound of the approximate mode.
     """
     
     if quantiles is None:
@@ -215,7 +376,12 @@ def trip_duration_summary(df: pd.DataFrame, quantiles=None) -> Dict[str, float]:
     if TRIP_DURATION_MIN_COL not in df.columns:
         raise ValueError(f"{TRIP_DURATION_MIN_COL} not found. Did you run parse_and_enrich_datetime()?")
 
-    series = df[TRIP_DURATION_MIN_COL].dropna()
+    if approximate:
+        sketch = DurationSketch(relative_accuracy=relative_accuracy)
+        return sketch.add(df[TRIP_DURATION_MIN_COL].to_numpy()).summary(quantiles)
+
+    # Durations are stored as float32; compute statistics in float64
+    series = df[TRIP_DURATION_MIN_COL].dropna().astype("float64")
     if series.empty:
         return {}
 
@@ -232,3 +398,418 @@ def trip_duration_summary(df: pd.DataFrame, quantiles=None) -> Dict[str, float]:
         result[key] = float(value)
 
     return result
+
+
+# =======================================================================
+#                     SINGLE-PASS AGGREGATION ENGINE
+# =======================================================================
+#
+# Every function above scans the frame on its own. The engine below encodes
+# each key column to integer codes once (categorical codes are used as-is)
+# and reduces them with np.bincount into small count/sum Series ("partial
+# aggregates"). Partials are mergeable, so the same engine serves a single
+# in-memory frame (compute_aggregates) and a stream of chunks
+# (stream_trip_summary). finalize_trip_aggregates() shapes them into the
+# exact frames the analytics functions return.
+
+# Aggregates that compute_aggregates() / finalize_trip_aggregates() can return
+AGGREGATES = (
+    "hourly",
+    "daily",
+    "weekly",
+    "popular_start",
+    "popular_end",
+    "user_type",
+    "duration",
+    "popular_od",
+)
+
+# Partial aggregates needed by each output
+_PARTIALS_FOR = {
+    "hourly": ("hourly",),
+    "daily": ("daily",),
+    "weekly": ("daily",),
+    "popular_start": ("start_station",),
+    "popular_end": ("end_station",),
+    "user_type": ("user_type_trips", "user_type_duration_sum", "user_type_duration_count"),
+    "duration": ("duration",),
+    "popular_od": ("od_pairs",),
+}
+
+
+def _encode(series: pd.Series):
+    """
+    Integer codes (-1 = missing) and key labels of a column.
+
+    Categorical columns reuse their codes, small-range integer columns
+    (start_hour) are offset from their minimum, and anything else is
+    factorized in sorted order, matching groupby key order.
+    """
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), _plain_values(series.cat.categories)
+
+    if pd.api.types.is_integer_dtype(series.dtype) and len(series):
+        values = series.to_numpy()
+        low, high = values.min(), values.max()
+        if high - low < 1_000_000:
+            labels = np.arange(low, high + 1).astype(series.dtype)
+            return values.astype(np.intp) - low, pd.Index(labels)
+
+    codes, uniques = pd.factorize(series, sort=True, use_na_sentinel=True)
+    return codes, _plain_values(pd.Index(uniques))
+
+
+def _encode_days(series: pd.Series):
+    """Codes and labels for TRIP_DATE_COL (days since the first trip date)."""
+    if not pd.api.types.is_datetime64_any_dtype(series.dtype) or series.isna().any() or series.empty:
+        return _encode(series)
+    days = series.to_numpy().astype("datetime64[D]")
+    first = days.min()
+    codes = (days - first).astype(np.intp)
+    labels = (first + np.arange(codes.max() + 1)).astype(series.dtype)
+    return codes, pd.Index(labels)
+
+
+def _bincount(codes: np.ndarray, labels: pd.Index, weights=None) -> pd.Series:
+    """Sum of `weights` (or row count) per code, as a Series indexed by label."""
+    valid = codes >= 0
+    if not valid.all():
+        codes = codes[valid]
+        weights = None if weights is None else weights[valid]
+    totals = np.bincount(codes, weights=weights, minlength=len(labels))
+    return pd.Series(totals, index=labels)
+
+
+def _observed(series: pd.Series, rows: pd.Series) -> pd.Series:
+    """Keep only keys that occur in the data (groupby observed semantics)."""
+    return series[rows.to_numpy() > 0]
+
+
+def _od_pair_counts(df: pd.DataFrame) -> pd.Series:
+    """Trips per (start station, end station) pair, counted on integer pair codes."""
+    start_codes, start_labels = _encode(df["Start Station Name"])
+    end_codes, end_labels = _encode(df["End Station Name"])
+    valid = (start_codes >= 0) & (end_codes >= 0)
+    pairs = start_codes[valid].astype(np.int64) * len(end_labels) + end_codes[valid]
+    counts = pd.Series(pairs).value_counts(sort=False)
+    pair_codes = counts.index.to_numpy()
+    index = pd.MultiIndex.from_arrays(
+        [start_labels[pair_codes // len(end_labels)], end_labels[pair_codes % len(end_labels)]],
+        names=["start_station", "end_station"],
+    )
+    return pd.Series(counts.to_numpy(dtype=np.int64), index=index)
+
+
+@instrument()
+def partial_trip_aggregates(
+    df: pd.DataFrame,
+    keys=None,
+    approximate: bool = False,
+    capacity: int = DEFAULT_HEAVY_HITTER_CAPACITY,
+) -> Dict[str, object]:
+    """
+    Reduce one enriched frame (or chunk) to mergeable partial aggregates.
+
+    Returns a dictionary of count/sum Series keyed by:
+    - hourly, daily                  → trips per start hour / trip date
+    - start_station, end_station     → trips per station name
+    - user_type_trips                → non-null Trip Id count per user type
+    - user_type_duration_sum/_count  → duration totals per user type
+    - duration                       → exact histogram of trip_duration_min,
+                                       or a DurationSketch if approximate
+    - od_pairs                       → trips per (start, end) station pair,
+                                       or a HeavyHitters summary if approximate
+
+    Parameters
+    ----------
+    keys : iterable of str or None
+           Only compute these partials. Defaults to all of them.
+    approximate : bool
+           Summarize durations with a fixed-size DurationSketch and station
+           pairs with a HeavyHitters summary instead of exact counts.
+    capacity : int
+           Number of station pairs a HeavyHitters summary keeps.
+
+    The exact duration histogram stays small because durations are whole
+    seconds, so the number of distinct values is bounded regardless of row
+    count; the sketch is bounded by construction.
+
+    Raises:
+        ValueError: If the chunk has not been through parse_and_enrich_datetime().
+    """
+
+    keys = set(keys) if keys is not None else {k for ks in _PARTIALS_FOR.values() for k in ks}
+    for col in (START_HOUR_COL, TRIP_DATE_COL, TRIP_DURATION_MIN_COL):
+        if col not in df.columns:
+            raise ValueError(f"{col} not found. Did you run parse_and_enrich_datetime()?")
+
+    partial: Dict[str, pd.Series] = {}
+
+    if "hourly" in keys:
+        counts = _bincount(*_encode(df[START_HOUR_COL]))
+        partial["hourly"] = counts[counts > 0]
+
+    if "daily" in keys:
+        counts = _bincount(*_encode_days(df[TRIP_DATE_COL]))
+        partial["daily"] = counts[counts > 0]
+
+    for key, col in (("start_station", "Start Station Name"), ("end_station", "End Station Name")):
+        if key in keys:
+            counts = _bincount(*_encode(df[col]))
+            partial[key] = counts[counts > 0]
+
+    durations = df[TRIP_DURATION_MIN_COL].to_numpy(dtype=np.float64)
+    if keys & {"user_type_trips", "user_type_duration_sum", "user_type_duration_count"}:
+        codes, labels = _encode(df["User Type"])
+        rows = _bincount(codes, labels)
+        has_id = df["Trip Id"].notna().to_numpy().astype(np.float64)
+        has_duration = ~np.isnan(durations)
+        partial["user_type_trips"] = _observed(_bincount(codes, labels, has_id), rows).astype(np.int64)
+        partial["user_type_duration_sum"] = _observed(
+            _bincount(codes, labels, np.where(has_duration, durations, 0.0)), rows
+        )
+        partial["user_type_duration_count"] = _observed(
+            _bincount(codes, labels, has_duration.astype(np.float64)), rows
+        ).astype(np.int64)
+
+    if "duration" in keys:
+        if approximate:
+            partial["duration"] = DurationSketch().add(durations)
+        else:
+            partial["duration"] = pd.Series(durations).value_counts()
+
+    if "od_pairs" in keys:
+        pairs = _od_pair_counts(df)
+        partial["od_pairs"] = HeavyHitters(capacity).add_counts(pairs) if approximate else pairs
+
+    return {key: partial[key] for key in partial if key in keys}
+
+
+@instrument()
+def merge_trip_aggregates(partials: Iterable[Dict[str, object]]) -> Dict[str, object]:
+    """
+    Merge partial aggregates produced by partial_trip_aggregates().
+
+    Partials are combined by summing values that share the same key (and by
+    merging sketches), so the result does not depend on how the data was
+    split into chunks. The input partials are not modified.
+    """
+
+    merged: Dict[str, object] = {}
+    for partial in partials:
+        for key, value in partial.items():
+            mergeable = isinstance(value, (DurationSketch, HeavyHitters))
+            if key not in merged:
+                merged[key] = value.copy() if mergeable else value
+            elif mergeable:
+                merged[key].merge(value)
+            else:
+                combined = pd.concat([merged[key], value])
+                merged[key] = combined.groupby(level=list(range(combined.index.nlevels))).sum()
+    return merged
+
+
+def _counts_frame(counts: pd.Series, key_col: str) -> pd.DataFrame:
+    """Turn a Series of counts indexed by key into a [key_col, trip_count] frame."""
+    counts = counts.sort_index().astype(np.int64)
+    counts.index.name = key_col
+    return counts.reset_index(name="trip_count")
+
+
+def _top_stations_frame(counts: pd.Series, top_n: int) -> pd.DataFrame:
+    """Same output as popular_stations() built from station counts."""
+    counts = counts.copy()
+    counts.index.name = "station_name"
+    return _top_counts_frame(counts, top_n)
+
+
+def _histogram_quantile(values, cum_counts, q: float) -> float:
+    """Linear-interpolated quantile (as Series.quantile) of a value histogram."""
+    position = (cum_counts[-1] - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, cum_counts[-1] - 1)
+    v_lower = values[cum_counts.searchsorted(lower, side="right")]
+    v_upper = values[cum_counts.searchsorted(upper, side="right")]
+    return float(v_lower + (v_upper - v_lower) * (position - lower))
+
+
+@instrument()
+def finalize_trip_aggregates(
+    merged: Dict[str, pd.Series],
+    top_n: int = 10,
+    quantiles=None,
+    aggregates=AGGREGATES,
+) -> Dict[str, object]:
+    """
+    Turn merged partial aggregates into the outputs of the analytics functions.
+
+    Returns a dictionary with the requested keys among:
+    - hourly        → same as hourly_trip_counts()
+    - daily         → same as daily_trip_counts()
+    - weekly        → same as weekly_trip_counts()
+    - popular_start → same as popular_stations(by="start", top_n=top_n)
+    - popular_end   → same as popular_stations(by="end", top_n=top_n)
+    - user_type     → same as user_type_summary()
+    - duration      → same keys as trip_duration_summary(quantiles=quantiles)
+    - popular_od    → top_n (start_station, end_station, trip_count) pairs;
+                      from a HeavyHitters summary, trip_count is a lower
+                      bound and `max_error` the largest possible undercount
+    """
+
+    if quantiles is None:
+        quantiles = [0.25, 0.5, 0.75]
+
+    result: Dict[str, object] = {}
+
+    if "hourly" in aggregates:
+        result["hourly"] = _counts_frame(merged["hourly"], START_HOUR_COL)
+
+    if "daily" in aggregates or "weekly" in aggregates:
+        daily = _counts_frame(merged["daily"], TRIP_DATE_COL)
+        if "daily" in aggregates:
+            result["daily"] = daily
+        if "weekly" in aggregates:
+            # Weekly counts are derived from the (small) daily counts
+            result["weekly"] = weekly_from_daily_counts(daily)
+
+    if "popular_start" in aggregates:
+        result["popular_start"] = _top_stations_frame(merged["start_station"], top_n)
+    if "popular_end" in aggregates:
+        result["popular_end"] = _top_stations_frame(merged["end_station"], top_n)
+
+    if "user_type" in aggregates:
+        user_types = pd.DataFrame(
+            {
+                "trip_count": merged["user_type_trips"],
+                "avg_duration_min": merged["user_type_duration_sum"]
+                / merged["user_type_duration_count"].replace(0, float("nan")),
+            }
+        ).sort_index()
+        user_types.index.name = "User Type"
+        result["user_type"] = user_types.reset_index().sort_values("trip_count", ascending=False)
+
+    if "duration" in aggregates and isinstance(merged["duration"], DurationSketch):
+        result["duration"] = merged["duration"].summary(quantiles)
+    elif "duration" in aggregates:
+        # Duration statistics from the exact value histogram
+        hist = merged["duration"].sort_index()
+        duration: Dict[str, float] = {}
+        if not hist.empty:
+            values = hist.index.to_numpy(dtype=float)
+            counts = hist.to_numpy()
+            cum_counts = counts.cumsum()
+            duration = {
+                "mean": float((values * counts).sum() / cum_counts[-1]),
+                "median": _histogram_quantile(values, cum_counts, 0.5),
+                "min": float(values[0]),
+                "max": float(values[-1]),
+            }
+            for q in quantiles:
+                duration[f"q{int(q*100)}"] = _histogram_quantile(values, cum_counts, q)
+        result["duration"] = duration
+
+    if "popular_od" in aggregates and isinstance(merged["od_pairs"], HeavyHitters):
+        hitters = merged["od_pairs"]
+        result["popular_od"] = _top_counts_frame(hitters.counters, top_n)
+        result["popular_od"]["max_error"] = np.int64(hitters.error)
+    elif "popular_od" in aggregates:
+        result["popular_od"] = _top_counts_frame(merged["od_pairs"], top_n)
+
+    return result
+
+
+def partials_for(aggregates) -> set:
+    """Names of the partial aggregates needed to finalize `aggregates`."""
+    unknown = [a for a in aggregates if a not in _PARTIALS_FOR]
+    if unknown:
+        raise ValueError(f"Unknown aggregates: {unknown}. Choose from {list(AGGREGATES)}.")
+    return {key for a in aggregates for key in _PARTIALS_FOR[a]}
+
+
+@instrument()
+def compute_aggregates(
+    df: pd.DataFrame,
+    aggregates=AGGREGATES,
+    top_n: int = 10,
+    quantiles=None,
+    approximate: bool = False,
+    capacity: int = DEFAULT_HEAVY_HITTER_CAPACITY,
+) -> Dict[str, object]:
+    """
+    Compute several analytics summaries in one pass over the frame.
+
+    Each key column is encoded once and reduced with np.bincount, instead of
+    one groupby per function. The returned frames are the same ones the
+    individual functions return.
+
+    Example:
+        result = compute_aggregates(df, ["hourly", "popular_start"], top_n=1)
+        result["hourly"]                 # == hourly_trip_counts(df)
+        result["popular_start"]          # == popular_stations(df, top_n=1)
+
+    Parameters
+    ----------
+    aggregates : iterable of str
+                 Any of AGGREGATES. Defaults to all of them.
+    top_n : int
+            Number of stations (or station pairs) for popular_start /
+            popular_end / popular_od.
+    quantiles : list[float] or None
+                Percentiles for the duration summary.
+    approximate : bool
+                Use a DurationSketch for the duration percentiles and a
+                HeavyHitters summary for popular_od.
+    capacity : int
+               Number of station pairs the HeavyHitters summary keeps; keep
+               it well above top_n for accurate popular_od counts.
+
+    Raises:
+        ValueError: If an unknown aggregate is requested, or the frame has not
+            been through parse_and_enrich_datetime().
+    """
+
+    aggregates = list(aggregates)
+    partial = partial_trip_aggregates(
+        df, keys=partials_for(aggregates), approximate=approximate, capacity=capacity
+    )
+    return finalize_trip_aggregates(partial, top_n=top_n, quantiles=quantiles, aggregates=aggregates)
+
+
+@instrument()
+def stream_trip_summary(
+    chunks: Iterable[pd.DataFrame],
+    top_n: int = 10,
+    quantiles=None,
+    aggregates=AGGREGATES,
+    approximate: bool = False,
+    capacity: int = DEFAULT_HEAVY_HITTER_CAPACITY,
+) -> Dict[str, object]:
+    """
+    Compute analytics summaries over a stream of enriched chunks.
+
+    Memory use is bounded by one chunk plus the partial aggregates, which
+    are proportional to the number of distinct hours, dates, stations,
+    station pairs and durations — not to the number of trips. With
+    approximate=True the duration partial is a fixed-size DurationSketch
+    and station pairs are tracked by a HeavyHitters summary of `capacity`
+    counters, whose counts are exact to within total_trips / (capacity + 1).
+
+    Example:
+        chunks = clean_chunks(iter_raw_data_chunks(monthly_csv_paths))
+        summary = stream_trip_summary(chunks)
+        summary["hourly"]  # same frame as hourly_trip_counts(full_df)
+
+    Returns:
+        The dictionary described in finalize_trip_aggregates().
+    """
+
+    aggregates = list(aggregates)
+    keys = partials_for(aggregates)
+    merged = merge_trip_aggregates(
+        partial_trip_aggregates(chunk, keys=keys, approximate=approximate, capacity=capacity)
+        for chunk in chunks
+    )
+    if not merged:
+        raise ValueError("No trips found in the input stream.")
+    return finalize_trip_aggregates(merged, top_n=top_n, quantiles=quantiles, aggregates=aggregates)
@@ -0,0 +1,448 @@
+
+import datetime
+import errno
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_loading import DATA_DIR, DEFAULT_TRIP_CSV, load_raw_data
+from .data_cleaning import PIPELINE_VERSION, full_clean_pipeline
+
+# Default location of the on-disk cache (one sub-directory per cache key)
+DEFAULT_CACHE_DIR = DATA_DIR / ".cache"
+
+# Version of the column store layout written by write_column_store()
+# 2: dictionary codes use pandas' own code width (int8 / int16 / int32)
+STORE_FORMAT_VERSION = 2
+
+META_FILE = "meta.json"
+
+# Attempts to open a freshly published entry that concurrent workers replace
+_OPEN_RETRIES = 3
+
+
+# =======================================================================
+#                             COLUMN STORE
+# =======================================================================
+#
+# Dictionary codes are written with the integer width pandas itself uses
+# for that many categories, so open_column_store() can wrap the memory-
+# mapped code files in Categoricals without converting (copying) them.
+
+
+def _codes_dtype(n_categories: int) -> np.dtype:
+    """Code dtype pandas uses for a Categorical with n categories."""
+    return pd.Categorical.from_codes([], categories=pd.RangeIndex(n_categories)).codes.dtype
+
+
+def _is_date_column(values: np.ndarray) -> bool:
+    """True when an object array holds only datetime.date values (and NaN)."""
+    sample = pd.Series(values).dropna()
+    if sample.empty:
+        return False
+    return all(
+        isinstance(v, datetime.date) and not isinstance(v, datetime.datetime)
+        for v in sample.unique()
+    )
+
+
+def write_column_store(df: pd.DataFrame, directory: Path) -> None:
+    """
+    Write a DataFrame as a directory of one `.npy` file per column.
+
+    Column encoding:
+    - numeric / bool columns    → stored as-is with their fixed dtype
+    - datetime64 columns        → stored as int64 ticks plus the dtype name
+    - categorical columns       → integer codes + categories
+    - string / object columns   → dictionary-encoded (integer codes + categories)
+
+    Nothing is pickled, so every file can later be opened with `np.load`
+    (optionally memory-mapped).
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+         Frame to persist. The index is not stored.
+    directory : Path
+         Target directory. It is created if needed.
+    """
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        stem = f"c{i:03d}"
+        entry = {"name": name, "dtype": str(series.dtype), "file": stem}
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            cats = series.cat.categories
+            entry["kind"] = "category"
+            entry["ordered"] = bool(series.cat.ordered)
+            entry["categories_dtype"] = str(cats.dtype)
+            codes = series.cat.codes.to_numpy().astype(_codes_dtype(len(cats)))
+            np.save(directory / f"{stem}.codes.npy", codes)
+            cat_values = cats.to_numpy()
+            if cat_values.dtype == object:
+                cat_values = cat_values.astype(str)
+            np.save(directory / f"{stem}.cats.npy", cat_values)
+
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype):
+            entry["kind"] = "datetime"
+            np.save(directory / f"{stem}.npy", series.to_numpy().view(np.int64))
+
+        elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            entry["kind"] = "numeric"
+            np.save(directory / f"{stem}.npy", series.to_numpy())
+
+        else:
+            # Object / string column: dictionary-encode it
+            values = series.to_numpy(dtype=object)
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+            if _is_date_column(values):
+                entry["kind"] = "date"
+                cat_values = np.asarray(uniques, dtype="datetime64[D]")
+            else:
+                entry["kind"] = "dictionary"
+                cat_values = np.asarray([str(v) for v in uniques], dtype=str)
+            np.save(directory / f"{stem}.codes.npy", codes.astype(_codes_dtype(len(uniques))))
+            np.save(directory / f"{stem}.cats.npy", cat_values)
+
+        columns.append(entry)
+
+    meta = {
+        "format_version": STORE_FORMAT_VERSION,
+        "n_rows": int(len(df)),
+        "columns": columns,
+    }
+    with open(directory / META_FILE, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, indent=2)
+
+
+def _decode_dictionary(codes: np.ndarray, cats: np.ndarray) -> np.ndarray:
+    """Expand dictionary codes back into an object array (code -1 → NaN)."""
+    lookup = np.empty(len(cats) + 1, dtype=object)
+    lookup[:-1] = cats
+    lookup[-1] = np.nan
+    # code -1 indexes the trailing NaN slot
+    return lookup[codes]
+
+
+def _read_store_meta(directory: Path) -> dict:
+    """Parsed meta.json of a column store (checks that it exists and its version)."""
+    meta_path = directory / META_FILE
+    if not meta_path.exists():
+        raise FileNotFoundError(f"No column store found at: {directory}")
+
+    with open(meta_path, encoding="utf-8") as fh:
+        meta = json.load(fh)
+    if meta.get("format_version") != STORE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported column store format: {meta.get('format_version')}")
+    return meta
+
+
+def read_column_store(directory: Path, mmap_mode: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a directory written by `write_column_store` back into a DataFrame.
+
+    Parameters
+    ----------
+    directory : Path
+         Store directory.
+    mmap_mode : str or None
+         Passed to `np.load`; use "r" to memory-map the column files.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+         Frame with the same columns and dtypes that were written.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the directory does not contain a column store.
+    ValueError
+        If the store was written with an unsupported format version.
+    """
+
+    directory = Path(directory)
+    meta = _read_store_meta(directory)
+
+    data = {}
+    for entry in meta["columns"]:
+        stem = entry["file"]
+        kind = entry["kind"]
+
+        if kind == "numeric":
+            data[entry["name"]] = np.load(directory / f"{stem}.npy", mmap_mode=mmap_mode)
+
+        elif kind == "datetime":
+            ticks = np.load(directory / f"{stem}.npy", mmap_mode=mmap_mode)
+            data[entry["name"]] = ticks.view(np.dtype(entry["dtype"]))
+
+        elif kind == "category":
+            codes = np.load(directory / f"{stem}.codes.npy", mmap_mode=mmap_mode)
+            cats = pd.Index(np.load(directory / f"{stem}.cats.npy"))
+            cats = cats.astype(entry["categories_dtype"])
+            data[entry["name"]] = pd.Categorical.from_codes(
+                codes, categories=cats, ordered=entry["ordered"]
+            )
+
+        else:
+            codes = np.load(directory / f"{stem}.codes.npy", mmap_mode=mmap_mode)
+            cats = np.load(directory / f"{stem}.cats.npy")
+            if kind == "date":
+                cats = pd.DatetimeIndex(cats).date
+            values = _decode_dictionary(codes, cats.astype(object))
+            if entry["dtype"] != "object":
+                values = pd.Series(values).astype(entry["dtype"]).array
+            data[entry["name"]] = values
+
+    df = pd.DataFrame(data, columns=[c["name"] for c in meta["columns"]])
+    return df
+
+
+def open_column_store(directory: Path) -> pd.DataFrame:
+    """
+    Open a column store zero-copy and read-only.
+
+    Every column file is memory-mapped and wrapped without conversion:
+    numeric and datetime columns are views of the mapped files, and
+    categorical, string and date columns are Categoricals over the mapped
+    dictionary codes (strings are not expanded into per-process object
+    arrays). Opening reads only the small category files, and every process
+    that opens the same store shares one physical copy of the columns
+    through the OS page cache.
+
+    The frame is read-only: writing into its columns raises ValueError, so
+    copy a column before modifying it.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the directory does not contain a column store.
+    ValueError
+        If the store was written with an unsupported format version.
+    """
+
+    directory = Path(directory)
+    meta = _read_store_meta(directory)
+
+    def mapped(path: Path) -> np.ndarray:
+        # Plain ndarray view of the read-only mapping (np.memmap is a subclass)
+        return np.load(path, mmap_mode="r").view(np.ndarray)
+
+    data = {}
+    for entry in meta["columns"]:
+        stem = entry["file"]
+        kind = entry["kind"]
+
+        if kind == "numeric":
+            data[entry["name"]] = mapped(directory / f"{stem}.npy")
+
+        elif kind == "datetime":
+            ticks = mapped(directory / f"{stem}.npy")
+            data[entry["name"]] = ticks.view(np.dtype(entry["dtype"]))
+
+        else:
+            codes = mapped(directory / f"{stem}.codes.npy")
+            cats = np.load(directory / f"{stem}.cats.npy")
+            if kind == "category":
+                cats = pd.Index(cats).astype(entry["categories_dtype"])
+            elif kind == "date":
+                cats = pd.DatetimeIndex(cats)
+            else:
+                cats = pd.Index(cats.astype(object))
+            # Codes were validated when written; skipping the scan keeps opening O(1)
+            data[entry["name"]] = pd.Categorical.from_codes(
+                codes, categories=cats, ordered=entry.get("ordered", False), validate=False
+            )
+
+    return pd.DataFrame(data, columns=[c["name"] for c in meta["columns"]], copy=False)
+
+
+def export_column_store(df: pd.DataFrame, directory: Path, replace: bool = False) -> Path:
+    """
+    Publish a column store atomically, so readers never see a partial store.
+
+    The store is written to a uniquely named temporary sibling directory and
+    renamed into place. A published store is never deleted in place:
+
+    - If a complete store already exists at `directory` (e.g. a concurrent
+      process published the same entry first) it is kept and the new copy
+      is discarded, unless `replace` is True.
+    - To replace a store, it is first renamed aside under a unique name and
+      only then removed. Processes that already opened it keep reading
+      their (unlinked) files until they reopen the path. A reader opening
+      the path during the swap may mix files of both stores, so replace
+      only with the same content (e.g. a rebuilt cache entry) while
+      readers may be active.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+         Frame to persist.
+    directory : Path
+         Store directory.
+    replace : bool
+         Replace an existing complete store instead of keeping it.
+
+    Returns:
+        The store directory.
+    """
+
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".tmp-{directory.name}-", dir=directory.parent))
+    try:
+        write_column_store(df, tmp_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    retired = []
+    try:
+        while True:
+            try:
+                # Renaming onto an existing non-empty directory fails
+                os.rename(tmp_dir, directory)
+                break
+            except OSError as exc:
+                if exc.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                    raise
+            if not replace and (directory / META_FILE).exists():
+                # Already published (by another process): keep it
+                break
+            try:
+                retired.append(_rename_aside(directory))
+            except FileNotFoundError:
+                # Moved away concurrently: try to publish again
+                continue
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        for old in retired:
+            shutil.rmtree(old, ignore_errors=True)
+    return directory
+
+
+def _rename_aside(directory: Path) -> Path:
+    """Rename a store to a unique hidden sibling (to be deleted) and return it."""
+    aside = directory.parent / f".old-{directory.name}-{uuid.uuid4().hex}"
+    os.rename(directory, aside)
+    return aside
+
+
+# =======================================================================
+#                       CACHED CLEAN DATASET
+# =======================================================================
+
+
+def cache_key(csv_path: Path) -> str:
+    """
+    Build the cache key for a source CSV.
+
+    The key covers the resolved path, file size, modification time and
+    PIPELINE_VERSION, so editing the CSV or changing the cleaning rules
+    both invalidate the cache.
+    """
+
+    path = Path(csv_path).resolve()
+    stat = path.stat()
+    raw = f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{PIPELINE_VERSION}|{STORE_FORMAT_VERSION}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _entry_prefix(csv_path: Path) -> str:
+    """Directory prefix shared by every cache entry of one source file."""
+    path = Path(csv_path).resolve()
+    digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:8]
+    return f"{path.stem}-{digest}-"
+
+
+def load_clean_data(
+    csv_path: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    refresh: bool = False,
+    shared: bool = False,
+) -> pd.DataFrame:
+    """
+    Return the cleaned, feature-enriched trip dataset, using an on-disk cache.
+
+    On a cold start (or whenever the source CSV / pipeline version changed)
+    this runs `load_raw_data` + `full_clean_pipeline` and writes the result to
+    a column store. Later calls read the column store directly, skipping CSV
+    and datetime parsing.
+
+    Parameters
+    ----------
+    csv_path : str or None
+            Source trip CSV. Defaults to `DEFAULT_TRIP_CSV`.
+    cache_dir : str or None
+            Cache root directory. Defaults to `DEFAULT_CACHE_DIR`.
+    refresh : bool
+            If True, ignore any existing cache entry and rebuild it.
+    shared : bool
+            If True, return the cache entry opened with open_column_store():
+            a read-only, memory-mapped frame whose pages are shared by every
+            process opening the same entry. String columns are categoricals.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+         Same frame `full_clean_pipeline(load_raw_data(csv_path))` returns
+         (same values, read-only, when shared=True).
+
+    Raises
+    ------
+    FileNotFoundError
+        If the CSV file does not exist.
+    """
+
+    path = Path(csv_path) if csv_path is not None else DEFAULT_TRIP_CSV
+    if not path.exists():
+        raise FileNotFoundError(f"Trip CSV not found at: {path}")
+
+    root = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+    prefix = _entry_prefix(path)
+    entry_dir = root / f"{prefix}{cache_key(path)}"
+
+    replace = refresh
+    if entry_dir.exists() and not refresh:
+        try:
+            return open_column_store(entry_dir) if shared else read_column_store(entry_dir)
+        except (OSError, ValueError, KeyError):
+            # Corrupt or outdated entry: fall through and rebuild it
+            replace = True
+
+    df = full_clean_pipeline(load_raw_data(str(path)))
+    export_column_store(df, entry_dir, replace=replace)
+
+    # Retire stale entries for the same source file. Each one is renamed
+    # aside before it is deleted, so processes that opened it keep their
+    # files, and an entry another worker removes first is simply skipped.
+    for old in root.glob(f"{prefix}*"):
+        if old != entry_dir and old.is_dir():
+            try:
+                shutil.rmtree(_rename_aside(old), ignore_errors=True)
+            except OSError:
+                pass
+
+    if shared:
+        for _ in range(_OPEN_RETRIES):
+            try:
+                return open_column_store(entry_dir)
+            except (OSError, ValueError, KeyError):
+                # Republished or removed by a concurrent worker
+                continue
+        # Same data as the published entry, only not shared
+        return df
+    return df
@@ -0,0 +1,415 @@
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_cleaning import TRIP_DATE_COL, START_HOUR_COL, TRIP_DURATION_MIN_COL
+from .analytics import period_from_daily_counts, top_n_counts, weekly_from_daily_counts
+from .instrumentation import instrument
+from .sketches import DurationSketch
+
+# =======================================================================
+#                         PRE-AGGREGATED TRIP CUBE
+# =======================================================================
+#
+# build_trip_cube() scans the trip rows once and stores dense count / sum
+# arrays over the dashboard filter dimensions (trip date, user type, bike
+# model). A sidebar selection is then answered by slicing and summing
+# those arrays, so its cost depends on the number of days, stations and
+# categories, not on the number of trips.
+#
+# Dimensions:
+#   date   → days since the first trip date (contiguous range)
+#   hour   → start hour (0–23)
+#   user   → User Type (sorted)
+#   model  → Model (sorted)
+#   start / end station → shared, sorted station name index
+#
+# Durations are summarized per (date, hour, user, model) cell with count,
+# sum, sum of squares, min and max, plus DurationSketch bucket counts per
+# (date, user, model) used for approximate quantiles.
+
+# Duration histograms use the DurationSketch bucket layout, so a slice of
+# cube cells sums into a regular, mergeable sketch (see sketches.py).
+DURATION_SKETCH_ACCURACY = 0.02
+
+HOURS_PER_DAY = 24
+
+
+def _empty_duration_sketch() -> DurationSketch:
+    return DurationSketch(relative_accuracy=DURATION_SKETCH_ACCURACY)
+
+
+def _factorize_sorted(values) -> tuple:
+    """Sorted factorization that keeps missing values as their own (last) code."""
+    codes, uniques = pd.factorize(values, sort=True, use_na_sentinel=False)
+    return codes.astype(np.intp), np.asarray(uniques, dtype=object)
+
+
+@dataclass
+class TripCube:
+    """
+    Dense pre-aggregates of a cleaned trip frame (see build_trip_cube).
+
+    `station_ids` holds the station id of each station name (-1 if unknown).
+
+    Array shapes (D dates, U user types, M models, S stations, B buckets):
+    - trip_count, duration_count/sum/sumsq/min/max : (D, 24, U, M)
+    - start_station_count, end_station_count       : (D, U, M, S)
+    - duration_histogram                           : (D, U, M, B)
+
+    Origin-destination queries are served by od_matrix.py instead.
+    """
+
+    first_date: np.datetime64
+    user_types: np.ndarray
+    models: np.ndarray
+    stations: np.ndarray
+    station_ids: np.ndarray
+    trip_count: np.ndarray
+    duration_count: np.ndarray
+    duration_sum: np.ndarray
+    duration_sumsq: np.ndarray
+    duration_min: np.ndarray
+    duration_max: np.ndarray
+    start_station_count: np.ndarray
+    end_station_count: np.ndarray
+    duration_histogram: np.ndarray
+
+    @property
+    def n_dates(self) -> int:
+        return self.trip_count.shape[0]
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Every calendar day covered by the cube (datetime64[D])."""
+        return self.first_date + np.arange(self.n_dates)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory footprint of the cube."""
+        arrays = [
+            self.trip_count, self.duration_count, self.duration_sum, self.duration_sumsq,
+            self.duration_min, self.duration_max, self.start_station_count,
+            self.end_station_count, self.duration_histogram,
+        ]
+        return sum(a.nbytes for a in arrays)
+
+    @instrument()
+    def select(
+        self,
+        start_date=None,
+        end_date=None,
+        user_types: Optional[Iterable[str]] = None,
+        models: Optional[Iterable[str]] = None,
+    ) -> "CubeSelection":
+        """
+        Restrict the cube to a dashboard filter state.
+
+        Parameters
+        ----------
+        start_date, end_date : date-like or None
+                Inclusive trip date range. None means unbounded.
+        user_types, models : iterable of str or None
+                Selected categories. None selects every category.
+
+        Returns
+        -------
+        selection : CubeSelection
+        """
+
+        lo, hi = 0, self.n_dates
+        if start_date is not None:
+            lo = int((np.datetime64(pd.Timestamp(start_date).date(), "D") - self.first_date).astype(int))
+        if end_date is not None:
+            hi = int((np.datetime64(pd.Timestamp(end_date).date(), "D") - self.first_date).astype(int)) + 1
+        lo, hi = max(lo, 0), min(hi, self.n_dates)
+        hi = max(hi, lo)
+
+        user_idx = _category_positions(self.user_types, user_types)
+        model_idx = _category_positions(self.models, models)
+        return CubeSelection(self, lo, hi, user_idx, model_idx)
+
+
+def _category_positions(names: np.ndarray, selected: Optional[Iterable[str]]) -> np.ndarray:
+    """Positions of the selected category names (all positions if None)."""
+    if selected is None:
+        return np.arange(len(names))
+    return np.flatnonzero(np.isin(names, np.asarray(list(selected), dtype=object)))
+
+
+@dataclass
+class CubeSelection:
+    """
+    A filtered view of a TripCube.
+
+    The query methods mirror analytics.py and return the same frames, except
+    that duration quantiles come from a DurationSketch (relative error at
+    most DURATION_SKETCH_ACCURACY).
+    """
+
+    cube: TripCube
+    date_lo: int
+    date_hi: int
+    user_idx: np.ndarray
+    model_idx: np.ndarray
+
+    def _time_cells(self, array: np.ndarray) -> np.ndarray:
+        """Slice a (D, 24, U, M) array to the selection."""
+        return array[self.date_lo:self.date_hi][:, :, self.user_idx][:, :, :, self.model_idx]
+
+    def _category_cells(self, array: np.ndarray) -> np.ndarray:
+        """Slice a (D, U, M, ...) array to the selection."""
+        return array[self.date_lo:self.date_hi][:, self.user_idx][:, :, self.model_idx]
+
+    # ------------------------------------------------------------------
+    # Key metrics
+    # ------------------------------------------------------------------
+
+    def total_trips(self) -> int:
+        return int(self._time_cells(self.cube.trip_count).sum())
+
+    def top_station(self, by: Literal["start", "end"] = "start") -> Optional[str]:
+        """Most used station name, or None for an empty selection."""
+        top = self.popular_stations(top_n=1, by=by)
+        return None if top.empty else top.iloc[0]["station_name"]
+
+    # ------------------------------------------------------------------
+    # Counterparts of the analytics functions
+    # ------------------------------------------------------------------
+
+    def hourly_trip_counts(self) -> pd.DataFrame:
+        counts = self._time_cells(self.cube.trip_count).sum(axis=(0, 2, 3))
+        hours = np.flatnonzero(counts)
+        return pd.DataFrame(
+            {
+                START_HOUR_COL: hours.astype(np.int16),
+                "trip_count": counts[hours].astype(np.int64),
+            }
+        )
+
+    def daily_trip_counts(self) -> pd.DataFrame:
+        counts = self._time_cells(self.cube.trip_count).sum(axis=(1, 2, 3))
+        days = np.flatnonzero(counts)
+        dates = self.cube.first_date + self.date_lo + days
+        return pd.DataFrame(
+            {
+                TRIP_DATE_COL: dates.astype("datetime64[s]"),
+                "trip_count": counts[days].astype(np.int64),
+            }
+        )
+
+    def weekly_trip_counts(self) -> pd.DataFrame:
+        return weekly_from_daily_counts(self.daily_trip_counts())
+
+    def period_trip_counts(self, period: str = "week") -> pd.DataFrame:
+        return period_from_daily_counts(self.daily_trip_counts(), period)
+
+    def _station_totals(self, by: Literal["start", "end"]) -> np.ndarray:
+        """Selected trips per station position."""
+        if by == "start":
+            array = self.cube.start_station_count
+        elif by == "end":
+            array = self.cube.end_station_count
+        else:
+            raise ValueError("Parameter 'by' must be 'start' or 'end'.")
+        return self._category_cells(array).sum(axis=(0, 1, 2))
+
+    def station_counts(self, by: Literal["start", "end"] = "start") -> pd.Series:
+        """Trips per station name (stations without trips are omitted)."""
+        counts = self._station_totals(by)
+        keep = (counts > 0) & pd.notna(self.cube.stations)
+        return pd.Series(
+            counts[keep].astype(np.int64),
+            index=pd.Index(self.cube.stations[keep].astype(str), name="station_name"),
+            name="trip_count",
+        )
+
+    def station_id_counts(self, by: Literal["start", "end"] = "start") -> pd.DataFrame:
+        """Same frame as analytics.station_id_counts() on the selected trips."""
+        counts = self._station_totals(by)
+        keep = (counts > 0) & (self.cube.station_ids >= 0)
+        # A renamed station keeps its id, so several names can share one
+        ids, inverse = np.unique(self.cube.station_ids[keep], return_inverse=True)
+        return pd.DataFrame(
+            {
+                "station_id": ids,
+                "trip_count": np.bincount(inverse, weights=counts[keep]).astype(np.int64),
+            }
+        )
+
+    def popular_stations(
+        self,
+        top_n: int = 10,
+        by: Literal["start", "end"] = "start",
+    ) -> pd.DataFrame:
+        top = top_n_counts(self.station_counts(by), top_n)
+        return top.reset_index()
+
+    def user_type_summary(self) -> pd.DataFrame:
+        trips = self._time_cells(self.cube.trip_count).sum(axis=(0, 1, 3))
+        dur_count = self._time_cells(self.cube.duration_count).sum(axis=(0, 1, 3))
+        dur_sum = self._time_cells(self.cube.duration_sum).sum(axis=(0, 1, 3))
+        names = self.cube.user_types[self.user_idx]
+
+        keep = (trips > 0) & pd.notna(names)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg = np.where(dur_count > 0, dur_sum / np.maximum(dur_count, 1), np.nan)
+        grouped = pd.DataFrame(
+            {
+                "User Type": names[keep].astype(str),
+                "trip_count": trips[keep].astype(np.int64),
+                "avg_duration_min": avg[keep],
+            }
+        ).sort_values("trip_count", ascending=False)
+        return grouped
+
+    def duration_sketch(self) -> DurationSketch:
+        """Mergeable duration sketch of the selected trips."""
+        counts = self._category_cells(self.cube.duration_histogram).sum(axis=(0, 1, 2))
+        return DurationSketch.from_counts(
+            counts,
+            total=self._time_cells(self.cube.duration_sum).sum(),
+            min_value=self._time_cells(self.cube.duration_min).min(initial=np.inf),
+            max_value=self._time_cells(self.cube.duration_max).max(initial=-np.inf),
+            relative_accuracy=DURATION_SKETCH_ACCURACY,
+        )
+
+    def duration_histogram(self) -> pd.DataFrame:
+        """
+        Trip counts per log duration bucket.
+
+        Returns columns:
+                        - bin_start (float): bucket lower edge (minutes)
+                        - bin_end (float): bucket upper edge (minutes)
+                        - trip_count (int)
+        """
+        sketch = self.duration_sketch()
+        edges = sketch.bucket_edges()
+        return pd.DataFrame(
+            {"bin_start": edges[:-1], "bin_end": edges[1:], "trip_count": sketch.counts}
+        )
+
+    def trip_duration_summary(self, quantiles=None) -> Dict[str, float]:
+        """
+        Same keys as analytics.trip_duration_summary().
+
+        mean, min and max are exact; median and quantiles are read from the
+        duration sketch.
+        """
+        return self.duration_sketch().summary(quantiles)
+
+    def duration_std(self) -> float:
+        """Standard deviation of trip duration (minutes), from sum of squares."""
+        n = self._time_cells(self.cube.duration_count).sum()
+        if n < 2:
+            return float("nan")
+        total = self._time_cells(self.cube.duration_sum).sum()
+        total_sq = self._time_cells(self.cube.duration_sumsq).sum()
+        variance = (total_sq - total * total / n) / (n - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+
+def build_trip_cube(df: pd.DataFrame) -> TripCube:
+    """
+    Pre-aggregate a cleaned, enriched trip frame into a TripCube.
+
+    Runs once per dataset (one pass of np.bincount per measure); afterwards
+    every dashboard filter combination is answered from the cube.
+
+    Raises:
+        ValueError: If the frame is empty or was not enriched.
+    """
+
+    for col in (TRIP_DATE_COL, START_HOUR_COL, TRIP_DURATION_MIN_COL):
+        if col not in df.columns:
+            raise ValueError(f"{col} not found. Did you run parse_and_enrich_datetime()?")
+    if df.empty:
+        raise ValueError("Cannot build a trip cube from an empty frame.")
+
+    days = df[TRIP_DATE_COL].to_numpy().astype("datetime64[D]")
+    first_date = days.min()
+    date_code = (days - first_date).astype(np.intp)
+    n_dates = int(date_code.max()) + 1
+
+    hour = df[START_HOUR_COL].to_numpy().astype(np.intp)
+    user_code, user_types = _factorize_sorted(df["User Type"])
+    model_code, models = _factorize_sorted(df["Model"])
+
+    # One shared station index for start and end stations
+    start_names = df["Start Station Name"].astype(object)
+    end_names = df["End Station Name"].astype(object)
+    station_code, stations = _factorize_sorted(
+        pd.concat([start_names, end_names], ignore_index=True)
+    )
+    start_code, end_code = station_code[:len(df)], station_code[len(df):]
+    station_ids = _station_ids(df, station_code, len(stations))
+
+    n_users, n_models, n_stations = len(user_types), len(models), len(stations)
+
+    # Duration measures per (date, hour, user, model)
+    time_shape = (n_dates, HOURS_PER_DAY, n_users, n_models)
+    time_cell = np.ravel_multi_index((date_code, hour, user_code, model_code), time_shape)
+    size = int(np.prod(time_shape))
+
+    minutes = df[TRIP_DURATION_MIN_COL].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(minutes)
+    valid_cell, valid_minutes = time_cell[valid], minutes[valid]
+
+    duration_min = np.full(size, np.inf)
+    duration_max = np.full(size, -np.inf)
+    np.minimum.at(duration_min, valid_cell, valid_minutes)
+    np.maximum.at(duration_max, valid_cell, valid_minutes)
+
+    # Station counts and duration histogram per (date, user, model, ...)
+    def category_counts(last_code, last_size):
+        shape = (n_dates, n_users, n_models, last_size)
+        cell = np.ravel_multi_index((date_code, user_code, model_code, last_code), shape)
+        return np.bincount(cell, minlength=int(np.prod(shape))).reshape(shape).astype(np.int32)
+
+    sketch = _empty_duration_sketch()
+    bucket = sketch.bucket_index(np.where(valid, minutes, 0.0))
+    hist_shape = (n_dates, n_users, n_models, sketch.n_buckets)
+    hist_cell = np.ravel_multi_index(
+        (date_code[valid], user_code[valid], model_code[valid], bucket[valid]), hist_shape
+    )
+
+    return TripCube(
+        first_date=first_date,
+        user_types=user_types,
+        models=models,
+        stations=stations,
+        station_ids=station_ids,
+        trip_count=np.bincount(time_cell, minlength=size).reshape(time_shape).astype(np.int32),
+        duration_count=np.bincount(valid_cell, minlength=size).reshape(time_shape).astype(np.int32),
+        duration_sum=np.bincount(valid_cell, weights=valid_minutes, minlength=size).reshape(time_shape),
+        duration_sumsq=np.bincount(
+            valid_cell, weights=valid_minutes * valid_minutes, minlength=size
+        ).reshape(time_shape),
+        duration_min=duration_min.reshape(time_shape),
+        duration_max=duration_max.reshape(time_shape),
+        start_station_count=category_counts(start_code, n_stations),
+        end_station_count=category_counts(end_code, n_stations),
+        duration_histogram=np.bincount(hist_cell, minlength=int(np.prod(hist_shape)))
+        .reshape(hist_shape)
+        .astype(np.int32),
+    )
+
+
+def _station_ids(df: pd.DataFrame, station_code: np.ndarray, n_stations: int) -> np.ndarray:
+    """Station id first seen with each station name (-1 if never known)."""
+    ids = np.full(n_stations, -1, dtype=np.int64)
+    if "Start Station Id" not in df.columns or "End Station Id" not in df.columns:
+        return ids
+    all_ids = np.concatenate(
+        [
+            df["Start Station Id"].to_numpy(dtype=np.float64, na_value=np.nan),
+            df["End Station Id"].to_numpy(dtype=np.float64, na_value=np.nan),
+        ]
+    )
+    known = np.flatnonzero(~np.isnan(all_ids))
+    codes, first = np.unique(station_code[known], return_index=True)
+    ids[codes] = all_ids[known[first]].astype(np.int64)
+    return ids
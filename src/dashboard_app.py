@@ -1,37 +1,202 @@
+from typing import Optional
+
 import streamlit as st
 import pandas as pd
 
-from .data_loading import load_raw_data
-from .data_cleaning import full_clean_pipeline, TRIP_DATE_COL
-from .analytics import (
-    hourly_trip_counts,
-    daily_trip_counts,
-    weekly_trip_counts,
-    user_type_summary,
-    trip_duration_summary,
-)
+from .cube import TripCube, build_trip_cube
+from .data_loading import load_station_coordinates
+from .figure_cache import FigureCache
+from .instrumentation import PROFILER, PROFILING_ENV_VAR
 from .plots import (
-    plot_hourly_usage,
-    plot_daily_trends,
-    plot_weekly_trends,
-    plot_popular_stations,
-    plot_duration_histogram,
-    plot_user_type_comparison,
-    plot_monthly_trends,
-    build_station_map_figure,
+    plot_hourly_counts,
+    plot_daily_counts,
+    plot_weekly_counts,
+    plot_station_counts,
+    plot_duration_distribution,
+    plot_user_type_counts,
+    plot_station_map,
 )
+from .result_cache import ResultCache
+from .shared_data import shared_dataset
+from .stations import StationIndex, build_station_index
+
+# Memory limit of the per-filter result cache shared by all sessions
+RESULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
 
 
-@st.cache_data
 def load_and_prepare_data() -> pd.DataFrame:
+    """
+    A view of the cleaned dataset, memory-mapped read-only from the on-disk cache.
+
+    The dataset is opened once per process (see shared_data.py) and every
+    session gets a shallow Copy-on-Write view of it: no per-session or
+    per-rerun copy, and changes made through a view stay in that view. N
+    workers share one physical copy through the OS page cache.
+    """
+
+    return shared_dataset().view()
 
+
+@st.cache_resource
+def load_trip_cube() -> TripCube:
     """
-    Load the raw dataset and apply the full cleaning process
+    Pre-aggregate the cleaned dataset once per process. Every filter change
+    is answered by slicing this cube instead of re-scanning the trip rows.
     """
-    
-    df_raw = load_raw_data()
-    df_clean = full_clean_pipeline(df_raw)
-    return df_clean
+
+    return build_trip_cube(load_and_prepare_data())
+
+
+@st.cache_resource
+def dataset_version() -> str:
+    """Version of the loaded dataset, part of every cached result's key."""
+    return shared_dataset().version
+
+
+@st.cache_resource
+def load_figure_cache() -> FigureCache:
+    """Rendered chart images shared by every session of this process."""
+    return FigureCache()
+
+
+@st.cache_resource
+def load_result_cache() -> ResultCache:
+    """Derived per-filter results shared by every session of this process."""
+    return ResultCache(max_bytes=RESULT_CACHE_MAX_BYTES)
+
+
+def cached_result(name: str, signature: tuple, compute):
+    """`compute()` for one filter state, from the shared result cache if possible."""
+    return load_result_cache().get_or_compute((name, signature, dataset_version()), compute)
+
+
+def show_figure(renderer, signature: tuple, data, **kwargs) -> None:
+    """Display a plots.py chart, rendering it only on a figure cache miss."""
+    image = load_figure_cache().render(renderer, signature, dataset_version(), data, **kwargs)
+    st.image(image, use_container_width=True)
+
+
+@st.cache_resource
+def load_station_index() -> Optional[StationIndex]:
+    """Station coordinates and spatial index, or None without a coordinates file."""
+    coords = load_station_coordinates()
+    return None if coords is None else build_station_index(coords)
+
+
+def station_map_figure(selection, signature: tuple):
+    """
+    Station map for one filter state.
+
+    Built from the cube's per-station counts (cached per filter state), so
+    the figure holds one point per station regardless of how many trips
+    the selection covers.
+    """
+
+    stations = load_station_index()
+    if stations is None:
+        return None
+    counts = cached_result("station_id_counts", signature, lambda: selection.station_id_counts(by="start"))
+    return plot_station_map(counts, stations)
+
+
+# --------------------------------------------------------------------------
+# Analysis sections: each one queries the cube only when it is displayed
+# --------------------------------------------------------------------------
+
+def show_hourly_usage(selection, signature: tuple) -> None:
+    st.subheader("Trips per Hour")
+    show_figure(plot_hourly_counts, signature, selection.hourly_trip_counts)
+
+
+def show_daily_weekly(selection, signature: tuple) -> None:
+    st.subheader("Daily & Weekly Ridership")
+    show_figure(plot_daily_counts, signature, selection.daily_trip_counts)
+
+    st.markdown("---")
+    st.subheader("Weekly Ridership")
+    show_figure(plot_weekly_counts, signature, selection.weekly_trip_counts)
+
+
+def show_popular_stations(selection, signature: tuple) -> None:
+    st.subheader("Popular Start Stations")
+    show_figure(
+        plot_station_counts,
+        signature,
+        lambda: selection.popular_stations(top_n=10, by="start"),
+        by="start",
+    )
+
+    st.markdown("---")
+    st.subheader("Popular End Stations")
+    show_figure(
+        plot_station_counts,
+        signature,
+        lambda: selection.popular_stations(top_n=10, by="end"),
+        by="end",
+    )
+
+
+def show_duration_distribution(selection, signature: tuple) -> None:
+    st.subheader("Trip Duration Distribution")
+    show_figure(plot_duration_distribution, signature, selection.duration_histogram)
+
+
+def show_user_types(selection, signature: tuple) -> None:
+    st.subheader("User Type Comparison")
+    show_figure(plot_user_type_counts, signature, selection.user_type_summary)
+
+
+def show_station_map(selection, signature: tuple) -> None:
+    st.subheader("Station Usage Map (Start Stations)")
+    map_fig = station_map_figure(selection, signature)
+    if map_fig is None:
+        st.info(
+            "No station coordinates found. Add latitude/longitude values to "
+            "'stations_coordinates.csv' in the data folder to enable the map."
+        )
+    else:
+        st.plotly_chart(map_fig, use_container_width=True)
+
+
+SECTIONS = {
+    "Hourly Usage": show_hourly_usage,
+    "Daily & Weekly Trends": show_daily_weekly,
+    "Popular Stations": show_popular_stations,
+    "Duration Distribution": show_duration_distribution,
+    "User Type Comparison": show_user_types,
+    "Map (Optional)": show_station_map,
+}
+
+
+def show_diagnostics_panel() -> None:
+    """Per-stage timings recorded by the instrumentation hooks, plus cache stats."""
+    st.markdown("---")
+    st.subheader("Diagnostics")
+    metrics = PROFILER.metrics()
+    if not metrics:
+        st.info(
+            f"No stage timings recorded. Profiling is off when {PROFILING_ENV_VAR}=0."
+            if not PROFILER.enabled
+            else "No stage timings recorded yet."
+        )
+    else:
+        stages = pd.DataFrame.from_dict(metrics, orient="index").rename_axis("stage").reset_index()
+        stages["max_mem_delta_mb"] = pd.to_numeric(stages.pop("max_mem_delta_bytes")) / 1e6
+        st.dataframe(
+            stages.sort_values("total_s", ascending=False),
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.download_button(
+            "Download recent calls (JSON lines)",
+            PROFILER.to_json_lines(),
+            file_name="stage_records.jsonl",
+            mime="application/json",
+        )
+    st.caption("Figure cache")
+    st.json(load_figure_cache().stats())
+    st.caption("Result cache")
+    st.json(load_result_cache().stats())
 
 
 def main():
@@ -43,7 +208,7 @@ def main():
         """
     )
 
-    df = load_and_prepare_data()
+    cube = load_trip_cube()
 
     # ----------------------------------------------------------------------
     # Sidebar Filters
@@ -51,9 +216,9 @@ def main():
     
     st.sidebar.header("Filters")
     
-    # Date filter based on TRIP_DATE_COL
-    min_date = df[TRIP_DATE_COL].min()
-    max_date = df[TRIP_DATE_COL].max()
+    # Date filter based on the days covered by the cube
+    min_date = pd.Timestamp(cube.dates[0]).date()
+    max_date = pd.Timestamp(cube.dates[-1]).date()
     date_range = st.sidebar.date_input(
         "Trip Date Range",
         value=(min_date, max_date),
@@ -61,7 +226,7 @@ def main():
         max_value=max_date,
     )
     # User type filter (Casual Member, Annual Member)
-    user_types = sorted(df["User Type"].unique())
+    user_types = [u for u in cube.user_types if pd.notna(u)]
     selected_user_types = st.sidebar.multiselect(
         "User Types",
         options=user_types,
@@ -69,23 +234,30 @@ def main():
     )
     
     # Bike model filter
-    models = sorted(df["Model"].unique())
+    models = [m for m in cube.models if pd.notna(m)]
     selected_models = st.sidebar.multiselect(
         "Bike Model",
         options=models,
         default=models,
     )
 
+    show_diagnostics = st.sidebar.checkbox("Show diagnostics", value=False)
+
     # ----------------------------------------------------------------------
-    # Apply filters to the dataset
+    # Apply filters to the pre-aggregated cube
     # ----------------------------------------------------------------------
-    
-    filtered = df[
-        (df[TRIP_DATE_COL] >= date_range[0])
-        & (df[TRIP_DATE_COL] <= date_range[1])
-        & (df["User Type"].isin(selected_user_types))
-        & (df["Model"].isin(selected_models))
-    ]
+
+    # While the user is picking a range, date_input returns a single date
+    start_date = date_range[0]
+    end_date = date_range[1] if len(date_range) > 1 else date_range[0]
+    selection = cube.select(
+        start_date=start_date,
+        end_date=end_date,
+        user_types=selected_user_types,
+        models=selected_models,
+    )
+    # Filter signature: key of every chart rendered for this selection
+    signature = (start_date, end_date, tuple(selected_user_types), tuple(selected_models))
 
     # ----------------------------------------------------------------------
     # Summary Metrics Section
@@ -94,16 +266,11 @@ def main():
     st.subheader("Key Metrics")
     col1, col2, col3 = st.columns(3)
 
-    total_trips = len(filtered)
-    duration_stats = trip_duration_summary(filtered)
+    total_trips = cached_result("total_trips", signature, selection.total_trips)
+    duration_stats = cached_result("duration_summary", signature, selection.trip_duration_summary)
     # Top start station
-    top_start_station = (
-        filtered["Start Station Name"]
-        .value_counts()
-        .idxmax()
-        if not filtered.empty
-        else "N/A"
-    )
+    top_start_station = cached_result("top_start_station", signature, lambda: selection.top_station(by="start"))
+    top_start_station = top_start_station or "N/A"
 
     col1.metric("Total Trips", f"{total_trips:,}")
     col2.metric(
@@ -113,69 +280,20 @@ def main():
     col3.metric("Top Start Station", top_start_station)
 
     # ----------------------------------------------------------------------
-    # Tab layout for different analysis sections
+    # Analysis sections
     # ----------------------------------------------------------------------
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
-        [
-            "Hourly Usage",
-            "Daily & Weekly Trends",
-            "Popular Stations",
-            "Duration Distribution",
-            "User Type Comparison",
-            "Map (Optional)",
-        ]
+    # Unlike st.tabs, which runs the body of every tab on each rerun, only
+    # the chosen section is computed and rendered.
+    section = st.radio(
+        "Analysis Section",
+        options=list(SECTIONS),
+        horizontal=True,
+        key="analysis_section",
     )
-    # Tab 1: Hourly Usage
-    with tab1:
-        st.subheader("Trips per Hour")
-        fig_hour = plot_hourly_usage(filtered)
-        st.pyplot(fig_hour)
-        
-    # Tab 2: Daily & Weekly Ridership
-    with tab2:
-        st.subheader("Daily & Weekly Ridership")
-        fig_daily = plot_daily_trends(filtered)
-        st.pyplot(fig_daily)
-
-        st.markdown("---")
-        st.subheader("Weekly Ridership")
-        fig_weekly = plot_weekly_trends(filtered)
-        st.pyplot(fig_weekly)
-
-    # Tab 3: Popular Stations
-    with tab3:
-        st.subheader("Popular Start Stations")
-        fig_start = plot_popular_stations(filtered, top_n=10, by="start")
-        st.pyplot(fig_start)
-
-        st.markdown("---")
-        st.subheader("Popular End Stations")
-        fig_end = plot_popular_stations(filtered, top_n=10, by="end")
-        st.pyplot(fig_end)
-
-    # Tab 4: Duration Distribution
-    with tab4:
-        st.subheader("Trip Duration Distribution")
-        fig_dur = plot_duration_histogram(filtered)
-        st.pyplot(fig_dur)
-
-    # Tab 5: User Type Comparison
-    with tab5:
-        st.subheader("User Type Comparison")
-        fig_ut = plot_user_type_comparison(filtered)
-        st.pyplot(fig_ut)
-
-    # Tab 6: Map Visualization
-    with tab6:
-        st.subheader("Station Usage Map (Start Stations)")
-        map_fig = build_station_map_figure(filtered)
-        if map_fig is None:
-            st.info(
-                "No station coordinates found. Add 'stations_coordinates.csv' "
-                "to the data folder to enable the map."
-            )
-        else:
-            st.plotly_chart(map_fig, use_container_width=True)
+    SECTIONS[section](selection, signature)
+
+    if show_diagnostics:
+        show_diagnostics_panel()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,21 @@
-from typing import Tuple
+from typing import Iterable, Iterator, Tuple
 
 import numpy as np
 import pandas as pd
 
+from .instrumentation import instrument
+from .schema import MONTH_DTYPE, WEEKDAY_DTYPE, apply_trip_schema
+
 # Raw dataset column names
 TRIP_DURATION_COL = "Trip  Duration"
 START_TIME_COL = "Start Time"
 END_TIME_COL = "End Time"
 USER_TYPE_COL = "User Type"
 
+# Bump whenever the cleaning rules or derived columns change, so that
+# cached copies of the cleaned dataset are rebuilt.
+PIPELINE_VERSION = "2"
+
 # New feature columns
 TRIP_DATE_COL = "trip_date"
 START_HOUR_COL = "start_hour"
@@ -16,7 +23,12 @@ START_WEEKDAY_COL = "start_weekday"
 START_MONTH_COL = "start_month"
 TRIP_DURATION_MIN_COL = "trip_duration_min"
 
+# Timestamp format used by the raw trip CSV
+DATETIME_FORMAT = "%m/%d/%Y %H:%M"
+
+
 
+@instrument()
 def clean_basic(df: pd.DataFrame) -> pd.DataFrame:
     """
     Basic cleaning:
@@ -28,11 +40,10 @@ def clean_basic(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: A cleaned DataFrame with only valid rows remaining.
 
     Notes:
-        To avoid unexpected changes in the original dataset, the function creates a copy and performs all cleaning steps on that copy.
+        The original dataset is never modified: dropping rows already returns
+        a new DataFrame, so no up-front copy of the whole frame is made.
         
     """
-    
-    df = df.copy()
 
     # Drop rows with missing key columns
     df = df.dropna(subset=[START_TIME_COL, END_TIME_COL, USER_TYPE_COL])
@@ -45,36 +56,47 @@ def clean_basic(df: pd.DataFrame) -> pd.DataFrame:
     df = df.reset_index(drop=True)
     return df
 
-def parse_and_enrich_datetime(df: pd.DataFrame) -> pd.DataFrame:
+@instrument()
+def parse_and_enrich_datetime(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
     """
     Convert timestamps into real datetime values and create useful time features for analysis:
     
-    - trip_date        → date of trip (year-month-day)
-    - start_hour       → hour of day (0–23)
-    - start_weekday    → weekday name (Monday, Tuesday, ...)
-    - start_month      → month name (January, August, ...)
-    - trip_duration_min → trip duration converted from seconds to minutes
+    - trip_date        → date of trip (datetime64 at midnight)
+    - start_hour       → hour of day (0–23, int16)
+    - start_weekday    → weekday name (Monday, Tuesday, ...; categorical)
+    - start_month      → month name (January, August, ...; categorical)
+    - trip_duration_min → trip duration converted from seconds to minutes (float32)
+
+    All columns are returned with the dtypes declared in schema.py.
 
     Parameters
     ----------
     df : pandas.DataFrame
          Cleaned DataFrame.
+    copy : bool
+         If False, columns are added to `df` itself instead of a copy. Use it
+         only when the caller owns `df` (e.g. a chunk fresh from clean_basic).
 
     Returns:
     A DataFrame containing parsed datetime fields and newly derived features
     """
     
-    df = df.copy()
+    if copy:
+        df = df.copy()
 
     # Parse datetimes (format: MM/DD/YYYY HH:MM)
-    df[START_TIME_COL] = pd.to_datetime(df[START_TIME_COL], format="%m/%d/%Y %H:%M")
-    df[END_TIME_COL] = pd.to_datetime(df[END_TIME_COL], format="%m/%d/%Y %H:%M")
+    df[START_TIME_COL] = parse_timestamps(df[START_TIME_COL])
+    df[END_TIME_COL] = parse_timestamps(df[END_TIME_COL])
 
     # Derive features
-    df[TRIP_DATE_COL] = df[START_TIME_COL].dt.date
-    df[START_HOUR_COL] = df[START_TIME_COL].dt.hour
-    df[START_WEEKDAY_COL] = df[START_TIME_COL].dt.day_name()
-    df[START_MONTH_COL] = df[START_TIME_COL].dt.strftime("%B")
+    if df[START_TIME_COL].isna().any():
+        # Rows with missing start times: keep pandas' NaT/NaN semantics
+        df[TRIP_DATE_COL] = df[START_TIME_COL].dt.date
+        df[START_HOUR_COL] = df[START_TIME_COL].dt.hour
+        df[START_WEEKDAY_COL] = df[START_TIME_COL].dt.day_name()
+        df[START_MONTH_COL] = df[START_TIME_COL].dt.strftime("%B")
+    else:
+        _add_start_time_features(df)
 
     # Duration in minutes
     if TRIP_DURATION_COL in df.columns:
@@ -82,9 +104,56 @@ def parse_and_enrich_datetime(df: pd.DataFrame) -> pd.DataFrame:
     else:
         df[TRIP_DURATION_MIN_COL] = np.nan
 
-    return df
+    # The frame is already ours (copied above or owned by the caller)
+    return apply_trip_schema(df, copy=False)
+
+
+def parse_timestamps(series: pd.Series) -> pd.Series:
+    """
+    Parse a column of "MM/DD/YYYY HH:MM" strings into datetime64 values.
+
+    Trip timestamps have minute resolution, so a month of trips contains only
+    tens of thousands of distinct strings across millions of rows. Each
+    distinct string is parsed once and the result is broadcast back to every
+    row through its factorized code.
+
+    Columns that are already datetime64 are returned unchanged.
+    """
+
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series
 
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    parsed = pd.to_datetime(pd.Index(uniques), format=DATETIME_FORMAT)
+    # Missing values get code -1, which indexes the trailing NaT slot
+    values = parsed.append(pd.DatetimeIndex([pd.NaT], dtype=parsed.dtype)).to_numpy()
+    return pd.Series(values[codes], index=series.index, name=series.name)
 
+
+def _add_start_time_features(df: pd.DataFrame) -> None:
+    """
+    Add trip_date, start_hour, start_weekday and start_month to `df`.
+
+    Features come from integer arithmetic on the parsed datetime64 values
+    (day / hour / month numbers since the epoch). Weekday and month names
+    are built as categoricals straight from those integer codes.
+    """
+
+    start = df[START_TIME_COL].to_numpy()
+    days = start.astype("datetime64[D]")
+    hours = start.astype("datetime64[h]").view(np.int64)
+    months = start.astype("datetime64[M]").view(np.int64)
+
+    df[TRIP_DATE_COL] = days.astype("datetime64[s]")
+    df[START_HOUR_COL] = (hours % 24).astype(np.int16)
+    # 1970-01-01 was a Thursday (code 3 with Monday = 0)
+    df[START_WEEKDAY_COL] = pd.Categorical.from_codes(
+        (days.view(np.int64) + 3) % 7, dtype=WEEKDAY_DTYPE
+    )
+    df[START_MONTH_COL] = pd.Categorical.from_codes(months % 12, dtype=MONTH_DTYPE)
+
+
+@instrument()
 def full_clean_pipeline(df_raw: pd.DataFrame) -> pd.DataFrame:
     """
     Convenience function used in notebooks and dashboard.
@@ -96,5 +165,25 @@ def full_clean_pipeline(df_raw: pd.DataFrame) -> pd.DataFrame:
     Returns a fully cleaned and feature-enriched DataFrame.
     """
     df = clean_basic(df_raw)
-    df = parse_and_enrich_datetime(df)
+    # clean_basic() returns a new frame, so it can be enriched in place
+    df = parse_and_enrich_datetime(df, copy=False)
     return df
+
+
+def clean_chunks(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Streaming counterpart of full_clean_pipeline().
+
+    Applies clean_basic() and parse_and_enrich_datetime() to each raw chunk
+    (e.g. from data_loading.iter_raw_data_chunks) and yields the cleaned,
+    feature-enriched chunks. Chunks that end up empty are skipped.
+
+    Each chunk is enriched in place (copy=False) since clean_basic() already
+    returns a frame that no one else references, so peak memory stays at
+    roughly one chunk.
+    """
+    for chunk in chunks:
+        cleaned = clean_basic(chunk)
+        if cleaned.empty:
+            continue
+        yield parse_and_enrich_datetime(cleaned, copy=False)
@@ -1,8 +1,12 @@
+import glob
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional, Union
 
 import pandas as pd
 
+from .instrumentation import instrument
+from .schema import RAW_READ_DTYPES, apply_trip_schema
+
 # Column name constants
 TRIP_ID_COL = "Trip Id"
 START_TIME_COL = "Start Time"
@@ -15,6 +19,12 @@ DATA_DIR = PROJECT_ROOT / "data"
 DEFAULT_TRIP_CSV = DATA_DIR / "financial_transactions_toronto_bike.csv"
 DEFAULT_STATION_COORDS_CSV = DATA_DIR / "stations_coordinates.csv"
 
+# Alternative headers accepted by load_station_coordinates
+COORDINATE_ALIASES = {"latitude": "lat", "longitude": "lon"}
+
+# Rows per chunk used by the streaming loader
+DEFAULT_CHUNKSIZE = 250_000
+
 # Expected columns in the trip CSV (from the provided file)
 EXPECTED_TRIP_COLUMNS = [
     "Trip Id",
@@ -31,6 +41,7 @@ EXPECTED_TRIP_COLUMNS = [
 ]
 
 
+@instrument()
 def load_raw_data(csv_path: Optional[str] = None) -> pd.DataFrame:
     """
     Load the raw Toronto bike-sharing CSV into a pandas DataFrame.
@@ -44,7 +55,8 @@ def load_raw_data(csv_path: Optional[str] = None) -> pd.DataFrame:
     Returns
     -------
     df : pandas.DataFrame
-         A DataFrame containing all required trip fields.
+         A DataFrame containing all required trip fields, with the compact
+         dtypes declared in schema.py.
 
     Raises
     ------
@@ -55,7 +67,8 @@ def load_raw_data(csv_path: Optional[str] = None) -> pd.DataFrame:
 
 
     Notes:
-        - This function does not alter the data; it only loads and validates it.
+        - This function does not alter the data; it only loads and validates it
+          (values are unchanged, only stored with compact dtypes).
         - The returned DataFrame should be passed into the cleaning pipeline.    
     """
 
@@ -65,16 +78,128 @@ def load_raw_data(csv_path: Optional[str] = None) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"Trip CSV not found at: {path}")
 
-    df = pd.read_csv(path)
+    # String columns are parsed straight into categoricals (see schema.py)
+    df = pd.read_csv(path, dtype=RAW_READ_DTYPES)
     
     # Confirm that the dataset includes all required fields
-    missing = [col for col in EXPECTED_TRIP_COLUMNS if col not in df.columns]
+    _validate_trip_columns(df.columns)
+
+    return apply_trip_schema(df, copy=False)
+
+
+def _validate_trip_columns(columns) -> None:
+    """Raise ValueError if any of EXPECTED_TRIP_COLUMNS is missing."""
+    missing = [col for col in EXPECTED_TRIP_COLUMNS if col not in columns]
     if missing:
         raise ValueError(f"Trip CSV missing expected columns: {missing}")
 
-    return df
 
+TripCsvSource = Union[str, Path, Iterable[Union[str, Path]], None]
+
+
+def resolve_trip_csvs(source: TripCsvSource = None) -> List[Path]:
+    """
+    Expand a trip CSV source into a list of files.
+
+    Parameters
+    ----------
+    source : str, Path, iterable of those, or None
+            - None                → [DEFAULT_TRIP_CSV]
+            - a directory         → every *.csv file in it, sorted by name
+            - a glob pattern      → matching files, sorted by name
+              (e.g. "data/trips/2024-*.csv")
+            - a file path         → that file
+            - an iterable of paths → those files, in order
+
+    Raises
+    ------
+    FileNotFoundError
+        If a listed file does not exist, or a directory / pattern matches
+        no CSV file.
+    """
+
+    if source is None:
+        return [DEFAULT_TRIP_CSV]
+    if not isinstance(source, (str, Path)):
+        return [Path(p) for p in source]
+
+    path = Path(source)
+    if path.is_dir():
+        paths = sorted(path.glob("*.csv"))
+    elif glob.has_magic(str(source)):
+        paths = sorted(Path(p) for p in glob.glob(str(source)))
+    else:
+        return [path]
+
+    if not paths:
+        raise FileNotFoundError(f"No trip CSV files found at: {source}")
+    return paths
+
+
+def check_trip_csv(path: Path) -> None:
+    """
+    Check that a trip CSV exists and has every expected column (header only).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If required columns are missing.
+    """
+    if not Path(path).exists():
+        raise FileNotFoundError(f"Trip CSV not found at: {path}")
+    header = pd.read_csv(path, nrows=0)
+    _validate_trip_columns(header.columns)
+
+
+def iter_raw_data_chunks(
+    csv_paths: TripCsvSource = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream one or many trip CSVs as DataFrame chunks of at most `chunksize` rows.
+
+    Streaming variant of `load_raw_data` for datasets that do not fit in
+    memory (e.g. one CSV per month for a full year). Only one chunk is held
+    in memory at a time.
+
+    Parameters
+    ----------
+    csv_paths : str, Path, iterable of those, or None
+            File(s), directory or glob pattern to read (see
+            `resolve_trip_csvs`). Defaults to `DEFAULT_TRIP_CSV`.
+    chunksize : int
+            Maximum number of rows per yielded chunk.
+
+    Yields
+    ------
+    chunk : pandas.DataFrame
+         Raw rows, with the same columns `load_raw_data` returns.
+
+    Raises
+    ------
+    FileNotFoundError
+        If one of the CSV files does not exist.
+    ValueError
+        If a file is missing required columns, or chunksize is not positive.
+
+    Notes:
+        Every file is checked (existence and header) before any rows are
+        yielded, so a bad file fails fast instead of halfway through a run.
+    """
 
+    if chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer.")
+
+    paths = resolve_trip_csvs(csv_paths)
+    for path in paths:
+        check_trip_csv(path)
+
+    for path in paths:
+        with pd.read_csv(path, chunksize=chunksize, dtype=RAW_READ_DTYPES) as reader:
+            for chunk in reader:
+                yield apply_trip_schema(chunk, copy=False)
+
+
+@instrument()
 def load_station_coordinates(csv_path: Optional[str] = None) -> Optional[pd.DataFrame]:
     """
     Load the optional station coordinates file used for map visualizations
@@ -82,10 +207,12 @@ def load_station_coordinates(csv_path: Optional[str] = None) -> Optional[pd.Data
     Expected columns:
     - station_id
     - station_name
-    - lat
-    - lon
+    - lat (or latitude)
+    - lon (or longitude)
 
     If the file does not exist, returns None (map plot will be skipped).
+    `latitude` / `longitude` headers (as in the shipped file) are renamed to
+    `lat` / `lon`.
 
     Parameters
     ----------
@@ -110,7 +237,8 @@ def load_station_coordinates(csv_path: Optional[str] = None) -> Optional[pd.Data
         return None
 
     df = pd.read_csv(path)
-    
+    df = df.rename(columns={k: v for k, v in COORDINATE_ALIASES.items() if v not in df.columns})
+
     # Validate that the coordinate file contains all required fields
     required_cols = {"station_id", "station_name", "lat", "lon"}
     missing = required_cols.difference(df.columns)
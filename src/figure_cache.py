@@ -0,0 +1,101 @@
+
+import io
+from typing import Callable, Hashable
+
+from .result_cache import ResultCache
+
+# =======================================================================
+#                        RENDERED FIGURE CACHE
+# =======================================================================
+#
+# FigureCache memoizes the output of the plots.py renderers as encoded
+# image bytes (PNG or SVG), keyed by (renderer, filter signature, data
+# version, renderer keyword arguments). A miss computes the renderer input,
+# draws the Matplotlib figure, encodes it and closes it, so no figure
+# outlives the call. Entries are evicted least recently used first once
+# either the entry count or the total byte size exceeds its limit (see
+# ResultCache).
+
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+FIGURE_FORMATS = ("png", "svg")
+
+
+def figure_to_bytes(fig, fmt: str = "png", dpi: int = 100) -> bytes:
+    """Encode a Matplotlib figure as PNG / SVG bytes and close it."""
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureCache(ResultCache):
+    """
+    Bounded LRU cache of rendered figures.
+
+    Example:
+        cache = FigureCache(max_bytes=32 * 1024 * 1024)
+        png = cache.render(
+            plot_hourly_counts,
+            signature=(start_date, end_date, user_types, models),
+            data_version=dataset_key,
+            data=selection.hourly_trip_counts,   # only called on a miss
+        )
+        cache.stats()   # {"hits": ..., "misses": ..., "evictions": ..., ...}
+
+    Safe to share between threads (e.g. Streamlit sessions).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes)
+
+    @staticmethod
+    def key(
+        renderer: Callable, signature: Hashable, data_version: Hashable, fmt: str, dpi: int, kwargs: dict
+    ) -> tuple:
+        name = f"{renderer.__module__}.{renderer.__qualname__}"
+        return (name, signature, data_version, fmt, dpi, tuple(sorted(kwargs.items())))
+
+    def render(
+        self,
+        renderer: Callable,
+        signature: Hashable,
+        data_version: Hashable,
+        data: Callable[[], object],
+        fmt: str = "png",
+        dpi: int = 100,
+        **kwargs,
+    ) -> bytes:
+        """
+        Rendered bytes of `renderer(data(), **kwargs)`, from cache if possible.
+
+        Parameters
+        ----------
+        renderer : callable
+                   A plots.py renderer returning a Matplotlib figure.
+        signature : hashable
+                   The filter state the data was selected with.
+        data_version : hashable
+                   Identifies the dataset (e.g. the clean-data cache key), so
+                   reloading new data never serves stale images.
+        data : callable
+                   Returns the renderer's input; only called on a miss.
+        fmt : "png" or "svg"
+        dpi : int
+                   Resolution of the encoded image (part of the key).
+        **kwargs :
+                   Extra renderer arguments (part of the key).
+        """
+
+        if fmt not in FIGURE_FORMATS:
+            raise ValueError(f"Unknown figure format: {fmt!r}. Choose from {list(FIGURE_FORMATS)}.")
+
+        key = self.key(renderer, signature, data_version, fmt, dpi, kwargs)
+        return self.get_or_compute(
+            key, lambda: figure_to_bytes(renderer(data(), **kwargs), fmt=fmt, dpi=dpi)
+        )
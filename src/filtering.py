@@ -0,0 +1,139 @@
+
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .data_cleaning import TRIP_DATE_COL
+
+# =======================================================================
+#                        INDEXED TRIP FILTERING
+# =======================================================================
+#
+# The dashboard filters trips by an inclusive date range plus sets of user
+# types and bike models. build_filter_index() sorts the frame by trip date
+# once and stores integer category codes, so a filter becomes:
+#   1. two binary searches on the sorted day numbers (date range → slice)
+#   2. a code → allowed lookup over that slice only (user type / model)
+# The cost depends on the number of rows in the date range, and when every
+# category is selected the result is a plain slice of the sorted frame.
+
+FILTER_COLUMNS = ["User Type", "Model"]
+
+
+@dataclass
+class TripFilterIndex:
+    """
+    Date-sorted trip frame plus the arrays used to filter it.
+
+    Attributes:
+        frame: the trips sorted by trip date (stable, index reset)
+        days: int64 day numbers of `frame[TRIP_DATE_COL]` (sorted)
+        codes: per filter column, int codes into `categories` (-1 = missing)
+        categories: per filter column, the category values
+    """
+
+    frame: pd.DataFrame
+    days: np.ndarray
+    codes: dict
+    categories: dict
+
+    def _allowed(self, col: str, selected: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        """Boolean lookup over the codes of `col`, or None if all are selected."""
+        if selected is None:
+            return None
+        cats = self.categories[col]
+        allowed = np.isin(cats, np.asarray(list(selected), dtype=object))
+        if allowed.all():
+            return None
+        # Trailing slot for code -1 (missing value): never selected
+        return np.append(allowed, False)
+
+    def positions(
+        self,
+        start_date=None,
+        end_date=None,
+        user_types: Optional[Iterable[str]] = None,
+        models: Optional[Iterable[str]] = None,
+    ) -> Union[slice, np.ndarray]:
+        """
+        Row positions (in `frame`) matching a filter state.
+
+        Parameters
+        ----------
+        start_date, end_date : date-like or None
+                Inclusive trip date range. None means unbounded.
+        user_types, models : iterable of str or None
+                Selected categories. None selects every category.
+
+        Returns
+        -------
+        positions : slice or numpy.ndarray
+             A slice when only the date range applies, else sorted int64
+             positions.
+        """
+
+        lo, hi = 0, len(self.days)
+        if start_date is not None:
+            lo = int(np.searchsorted(self.days, _day_number(start_date), side="left"))
+        if end_date is not None:
+            hi = int(np.searchsorted(self.days, _day_number(end_date), side="right"))
+        hi = max(hi, lo)
+
+        keep = None
+        for col, selected in zip(FILTER_COLUMNS, (user_types, models)):
+            allowed = self._allowed(col, selected)
+            if allowed is None:
+                continue
+            matches = allowed[self.codes[col][lo:hi]]
+            keep = matches if keep is None else keep & matches
+
+        if keep is None:
+            return slice(lo, hi)
+        return lo + np.flatnonzero(keep)
+
+    def select(self, *args, **kwargs) -> pd.DataFrame:
+        """
+        Rows of `frame` matching a filter state (same arguments as positions()).
+
+        A date-range-only filter returns a slice of `frame` without copying
+        the data; category filters take only the selected rows.
+        """
+        pos = self.positions(*args, **kwargs)
+        return self.frame.iloc[pos]
+
+
+def _day_number(value) -> int:
+    """Days since the epoch of a date-like value."""
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+def build_filter_index(df: pd.DataFrame) -> TripFilterIndex:
+    """
+    Sort a cleaned trip frame by trip date and build its filter index.
+
+    Frames that are already in date order are not re-sorted.
+
+    Raises:
+        ValueError: If TRIP_DATE_COL is missing.
+    """
+
+    if TRIP_DATE_COL not in df.columns:
+        raise ValueError(f"{TRIP_DATE_COL} not found. Did you run parse_and_enrich_datetime()?")
+
+    days = df[TRIP_DATE_COL].to_numpy().astype("datetime64[D]").view(np.int64)
+    if not np.all(days[1:] >= days[:-1]):
+        order = np.argsort(days, kind="stable")
+        df = df.take(order).reset_index(drop=True)
+        days = days[order]
+    elif not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+        df = df.reset_index(drop=True)
+
+    codes, categories = {}, {}
+    for col in FILTER_COLUMNS:
+        col_codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+        codes[col] = col_codes.astype(np.int16 if len(uniques) < 2**15 else np.int32)
+        categories[col] = np.asarray(uniques, dtype=object)
+
+    return TripFilterIndex(frame=df, days=days, codes=codes, categories=categories)
@@ -0,0 +1,223 @@
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .data_cleaning import END_TIME_COL, START_TIME_COL, TRIP_DURATION_COL, parse_timestamps
+
+# =======================================================================
+#                    BIKE-LEVEL TRIP CHAINS
+# =======================================================================
+#
+# build_bike_chains() sorts the trips by (Bike Id, Start Time) once and
+# keeps the sorted columns as arrays. Consecutive rows of the same bike
+# form its trip chain, so every per-bike measure is a vectorized diff
+# between row i and row i+1 (masked where the bike changes), reduced per
+# bike with np.bincount over the bike codes. No per-bike Python loop.
+#
+# - busy time:   sum of trip durations
+# - idle gap:    next trip's Start Time - this trip's End Time
+# - relocation:  next trip starts at a different station than this one
+#                ended at (the bike was moved by staff in between)
+
+BIKE_ID_COL = "Bike Id"
+START_ID_COL = "Start Station Id"
+END_ID_COL = "End Station Id"
+
+_NS_PER_MIN = 60 * 10**9
+
+
+@dataclass
+class BikeChains:
+    """
+    Trips sorted by (bike, start time), as arrays (see build_bike_chains).
+
+    Attributes:
+        bike_ids: distinct bike ids (sorted)
+        bike_code: per trip, index into bike_ids
+        start_ns, end_ns: Start / End Time as int64 nanoseconds
+        start_station, end_station: station ids (-1 = missing)
+        busy_min: trip duration in minutes
+    """
+
+    bike_ids: np.ndarray
+    bike_code: np.ndarray
+    start_ns: np.ndarray
+    end_ns: np.ndarray
+    start_station: np.ndarray
+    end_station: np.ndarray
+    busy_min: np.ndarray
+
+    @property
+    def n_trips(self) -> int:
+        return len(self.bike_code)
+
+    def _links(self):
+        """Positions i where trip i+1 continues the chain of trip i."""
+        return np.flatnonzero(self.bike_code[1:] == self.bike_code[:-1])
+
+    def _gaps_min(self, links: np.ndarray) -> np.ndarray:
+        return (self.start_ns[links + 1] - self.end_ns[links]) / _NS_PER_MIN
+
+    def _moved(self, links: np.ndarray) -> np.ndarray:
+        ended, started = self.end_station[links], self.start_station[links + 1]
+        return (ended != started) & (ended >= 0) & (started >= 0)
+
+    def utilization(self) -> pd.DataFrame:
+        """
+        Per-bike fleet utilization.
+
+        Returns columns (one row per bike, by bike id):
+                        - bike_id (int)
+                        - trip_count (int)
+                        - busy_min (float): total riding time
+                        - idle_min (float): total time between trips
+                        - max_idle_min (float): longest gap between trips
+                        - relocations (int): chain breaks between stations
+                        - overlaps (int): next trip starts before this one
+                          ends (data errors; counted as zero idle time)
+                        - first_start, last_end (datetime64)
+                        - utilization (float): busy_min / (last_end - first_start)
+        """
+
+        n = len(self.bike_ids)
+        links = self._links()
+        link_bike = self.bike_code[links]
+        gaps = self._gaps_min(links)
+        idle = np.maximum(gaps, 0.0)
+
+        max_idle = np.zeros(n)
+        np.maximum.at(max_idle, link_bike, idle)
+
+        # Trips are sorted by start time within a bike, so the first row of a
+        # bike holds its first start; its last end is the max over its rows
+        first_row = np.searchsorted(self.bike_code, np.arange(n), side="left")
+        last_end = np.full(n, np.iinfo(np.int64).min)
+        np.maximum.at(last_end, self.bike_code, self.end_ns)
+        first_start = self.start_ns[first_row]
+
+        busy = np.bincount(self.bike_code, weights=self.busy_min, minlength=n)
+        span_min = (last_end - first_start) / _NS_PER_MIN
+        with np.errstate(invalid="ignore", divide="ignore"):
+            utilization = np.where(span_min > 0, busy / span_min, np.nan)
+
+        return pd.DataFrame(
+            {
+                "bike_id": self.bike_ids,
+                "trip_count": np.bincount(self.bike_code, minlength=n),
+                "busy_min": busy,
+                "idle_min": np.bincount(link_bike, weights=idle, minlength=n),
+                "max_idle_min": max_idle,
+                "relocations": np.bincount(link_bike[self._moved(links)], minlength=n),
+                "overlaps": np.bincount(link_bike[gaps < 0], minlength=n),
+                "first_start": first_start.view("datetime64[ns]"),
+                "last_end": last_end.view("datetime64[ns]"),
+                "utilization": utilization,
+            }
+        )
+
+    def relocations(self) -> pd.DataFrame:
+        """
+        Every chain break: a bike's next trip starts at another station.
+
+        Returns columns (by bike id, then time):
+                        - bike_id (int)
+                        - from_station_id (int): where the previous trip ended
+                        - to_station_id (int): where the next trip started
+                        - dropped_at, picked_up_at (datetime64)
+                        - gap_min (float)
+        """
+
+        links = self._links()
+        links = links[self._moved(links)]
+        return pd.DataFrame(
+            {
+                "bike_id": self.bike_ids[self.bike_code[links]],
+                "from_station_id": self.end_station[links],
+                "to_station_id": self.start_station[links + 1],
+                "dropped_at": self.end_ns[links].view("datetime64[ns]"),
+                "picked_up_at": self.start_ns[links + 1].view("datetime64[ns]"),
+                "gap_min": self._gaps_min(links),
+            }
+        )
+
+    def relocation_flows(self) -> pd.DataFrame:
+        """
+        Relocations counted per (from, to) station pair, most frequent first.
+
+        Returns columns:
+                        - from_station_id, to_station_id (int)
+                        - relocations (int)
+        """
+
+        links = self._links()
+        links = links[self._moved(links)]
+        ended, started = self.end_station[links], self.start_station[links + 1]
+        # One int64 code per station pair instead of grouping two columns
+        base = int(max(ended.max(initial=0), started.max(initial=0))) + 1
+        pairs, counts = np.unique(ended * base + started, return_counts=True)
+        order = np.lexsort((pairs, -counts))
+        return pd.DataFrame(
+            {
+                "from_station_id": pairs[order] // base,
+                "to_station_id": pairs[order] % base,
+                "relocations": counts[order],
+            }
+        )
+
+
+def _ids(series: pd.Series) -> np.ndarray:
+    """Integer station ids with -1 for missing values."""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isnan(values), -1, values).astype(np.int64)
+
+
+def build_bike_chains(df: pd.DataFrame) -> BikeChains:
+    """
+    Sort trips by (Bike Id, Start Time) once and keep them as chain arrays.
+
+    Trips missing a bike id, Start Time or End Time are skipped. Busy time
+    comes from `Trip  Duration` (seconds) when present, else from
+    End Time - Start Time.
+
+    Raises:
+        ValueError: If Bike Id, Start Time or End Time is missing.
+    """
+
+    missing = [c for c in (BIKE_ID_COL, START_TIME_COL, END_TIME_COL) if c not in df.columns]
+    if missing:
+        raise ValueError(f"Trip frame missing columns: {missing}")
+
+    bikes = df[BIKE_ID_COL].to_numpy(dtype=np.float64, na_value=np.nan)
+    start = parse_timestamps(df[START_TIME_COL]).to_numpy().astype("datetime64[ns]")
+    end = parse_timestamps(df[END_TIME_COL]).to_numpy().astype("datetime64[ns]")
+    valid = ~np.isnan(bikes) & ~np.isnat(start) & ~np.isnat(end)
+
+    bikes = bikes[valid].astype(np.int64)
+    start_ns = start[valid].view(np.int64)
+    end_ns = end[valid].view(np.int64)
+    if TRIP_DURATION_COL in df.columns:
+        busy = df[TRIP_DURATION_COL].to_numpy(dtype=np.float64, na_value=np.nan)[valid] / 60.0
+        busy = np.where(np.isnan(busy), (end_ns - start_ns) / _NS_PER_MIN, busy)
+    else:
+        busy = (end_ns - start_ns) / _NS_PER_MIN
+
+    order = np.lexsort((start_ns, bikes))
+    sorted_bikes = bikes[order]
+    new_bike = np.ones(len(sorted_bikes), dtype=bool)
+    new_bike[1:] = sorted_bikes[1:] != sorted_bikes[:-1]
+    bike_ids = sorted_bikes[new_bike]
+    bike_code = np.cumsum(new_bike) - 1
+    start_station = _ids(df[START_ID_COL])[valid] if START_ID_COL in df.columns else np.full(len(bikes), -1)
+    end_station = _ids(df[END_ID_COL])[valid] if END_ID_COL in df.columns else np.full(len(bikes), -1)
+
+    return BikeChains(
+        bike_ids=bike_ids,
+        bike_code=bike_code.astype(np.int64),
+        start_ns=start_ns[order],
+        end_ns=end_ns[order],
+        start_station=start_station[order],
+        end_station=end_station[order],
+        busy_min=busy[order],
+    )
@@ -0,0 +1,145 @@
+
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+# =======================================================================
+#                      TRIP ID HASH INDEX
+# =======================================================================
+#
+# TripIdIndex is an open-addressing hash set of int64 ids stored in one
+# flat numpy table (EMPTY marks free slots). Slots come from Fibonacci
+# hashing and collisions are resolved by linear probing. Lookups and
+# inserts are vectorized: every round probes one slot for all unresolved
+# keys at once, and at a load factor of at most 1/2 a few rounds resolve
+# nearly every key. The table is a plain array, so it is saved as one .npy
+# file and can be memory-mapped when only lookups are needed.
+
+EMPTY = np.iinfo(np.int64).min
+MAX_LOAD = 0.5
+MIN_SLOTS = 1024
+
+_FIBONACCI = np.uint64(0x9E3779B97F4A7C15)
+
+
+class TripIdIndex:
+    """
+    Hash set of trip ids.
+
+    Example:
+        index = TripIdIndex()
+        index.add(np.array([10, 11, 12]))     # → 3 new ids
+        index.contains(np.array([11, 99]))    # → [True, False]
+        index.save(path); TripIdIndex.load(path)
+    """
+
+    def __init__(self, capacity: int = 0):
+        bits = _bits_for(capacity)
+        self._table = np.full(1 << bits, EMPTY, dtype=np.int64)
+        self._bits = bits
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def n_slots(self) -> int:
+        return len(self._table)
+
+    def _slots(self, keys: np.ndarray) -> np.ndarray:
+        hashed = keys.astype(np.uint64) * _FIBONACCI
+        return (hashed >> np.uint64(64 - self._bits)).astype(np.int64)
+
+    def _find(self, keys: np.ndarray):
+        """Per key: whether it is present, and its slot (or the free slot ending its probe)."""
+        slot = self._slots(keys)
+        found = np.zeros(len(keys), dtype=bool)
+        pending = np.arange(len(keys))
+        mask = self.n_slots - 1
+        while len(pending):
+            held = self._table[slot[pending]]
+            hit = held == keys[pending]
+            found[pending[hit]] = True
+            # Stop at a hit or at a free slot (the key cannot be further along)
+            pending = pending[~hit & (held != EMPTY)]
+            slot[pending] = (slot[pending] + 1) & mask
+        return found, slot
+
+    def contains(self, ids) -> np.ndarray:
+        """Boolean mask: which ids are in the index."""
+        keys = _as_keys(ids)
+        if self._size == 0:
+            return np.zeros(len(keys), dtype=bool)
+        return self._find(keys)[0]
+
+    def add(self, ids) -> int:
+        """Insert ids (duplicates and known ids are ignored). Returns how many were new."""
+        keys = np.sort(_as_keys(ids))
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+        keys = keys[~self.contains(keys)]
+        if len(keys) == 0:
+            return 0
+        if (self._size + len(keys)) > MAX_LOAD * self.n_slots:
+            self._resize(self._size + len(keys))
+
+        _, slot = self._find(keys)
+        mask = self.n_slots - 1
+        pending = np.arange(len(keys))
+        while len(pending):
+            # Several keys may probe the same free slot: write them all (one
+            # write per slot survives), then read back which key won it
+            targets = slot[pending]
+            free = self._table[targets] == EMPTY
+            self._table[targets[free]] = keys[pending[free]]
+            winners = free & (self._table[targets] == keys[pending])
+            pending = pending[~winners]
+            slot[pending] = (slot[pending] + 1) & mask
+
+        self._size += len(keys)
+        return len(keys)
+
+    def _resize(self, n_keys: int) -> None:
+        keys = self.ids()
+        self._bits = _bits_for(n_keys)
+        self._table = np.full(1 << self._bits, EMPTY, dtype=np.int64)
+        self._size = 0
+        if len(keys):
+            self.add(keys)
+
+    def ids(self) -> np.ndarray:
+        """Every id in the index (table order)."""
+        return self._table[self._table != EMPTY]
+
+    def save(self, path: Union[str, Path]) -> None:
+        np.save(path, self._table)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap_mode=None) -> "TripIdIndex":
+        """Load a saved index; mmap_mode="r" maps it read-only (lookups only)."""
+        table = np.load(path, mmap_mode=mmap_mode)
+        n_slots = len(table)
+        if n_slots & (n_slots - 1) or table.dtype != np.int64:
+            raise ValueError(f"Not a TripIdIndex table: {path}")
+        index = cls.__new__(cls)
+        index._table = table
+        index._bits = n_slots.bit_length() - 1
+        index._size = int(np.count_nonzero(table != EMPTY))
+        return index
+
+
+def _as_keys(ids) -> np.ndarray:
+    keys = np.asarray(ids)
+    if keys.dtype.kind == "f":
+        if np.isnan(keys).any():
+            raise ValueError("Trip ids must not be missing.")
+    keys = keys.astype(np.int64)
+    if (keys == EMPTY).any():
+        raise ValueError(f"Trip id {EMPTY} is reserved.")
+    return keys
+
+
+def _bits_for(n_keys: int) -> int:
+    """Table size (log2) keeping n_keys at or below MAX_LOAD."""
+    slots = max(MIN_SLOTS, int(np.ceil(n_keys / MAX_LOAD)))
+    return int(slots - 1).bit_length()
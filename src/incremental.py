@@ -0,0 +1,543 @@
+
+import copy
+import hashlib
+import io
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .analytics import AGGREGATES, finalize_trip_aggregates, merge_trip_aggregates, partial_trip_aggregates
+from .cache import export_column_store, open_column_store, read_column_store
+from .data_cleaning import PIPELINE_VERSION, START_TIME_COL, full_clean_pipeline
+from .data_loading import TRIP_ID_COL, TripCsvSource, check_trip_csv, resolve_trip_csvs
+from .hash_index import TripIdIndex
+from .schema import RAW_READ_DTYPES, apply_trip_schema, concat_trip_frames
+from .sketches import DEFAULT_HEAVY_HITTER_CAPACITY, DurationSketch, HeavyHitters
+
+# =======================================================================
+#                   INCREMENTAL APPEND INGESTION
+# =======================================================================
+#
+# IncrementalTripStore keeps a cleaned trip dataset on disk and grows it
+# as new trip files (or new rows at the end of a known file) arrive:
+#
+#   state.json              watermark, file fingerprints, segment list
+#   segments/00001/ ...     one column store (cache.py) per ingestion
+#   trip_ids-00001.npy      TripIdIndex of every Trip Id seen so far
+#   aggregates-00001/       merged partial aggregates (analytics.py) with
+#                           a DurationSketch and HeavyHitters station pairs,
+#                           as .npy arrays plus meta.json (nothing pickled)
+#
+# Each ingest() reads only what changed. Files whose size and mtime match
+# their fingerprint are skipped. A file that only grew (same SHA-1 over the
+# previously read bytes) is read from the old end onwards, and any other
+# changed file is read again. New rows are then deduplicated by Trip Id:
+# rows repeated within the batch, or whose id is already in the hash index,
+# are dropped. Only ids at or below the Trip Id watermark need an index
+# lookup. The surviving rows are cleaned and enriched, written as a new
+# segment, and reduced to partial aggregates that are merged into the
+# stored ones.
+#
+# Every ingestion writes its files under a new generation number and
+# commits by atomically replacing state.json, so a crash mid-ingestion
+# leaves the previous state intact. One writer at a time is assumed.
+#
+# Readers may run in other processes. A commit deletes the files of older
+# generations, so a store opened on an older state.json can find its
+# files gone: the read methods (trip_index, aggregates, summary, frame)
+# then re-read state.json and retry on the current generation. Frames
+# already returned by frame(shared=True) stay readable, as a memory map
+# outlives the deletion of its file.
+
+STATE_FILE = "state.json"
+SEGMENTS_DIR = "segments"
+# 2: aggregates stored as .npy + JSON instead of a pickle
+INCREMENTAL_FORMAT_VERSION = 2
+
+_HASH_BLOCK = 1 << 20
+
+# Times a read is retried after a concurrent commit removed its files
+_READ_RETRIES = 3
+
+
+@dataclass
+class IngestReport:
+    """
+    Outcome of one IncrementalTripStore.ingest() call.
+
+    Attributes:
+        files_read: files (or file tails) that were read
+        files_skipped: files unchanged since the last ingestion
+        rows_read: raw rows read
+        rows_duplicate: rows already ingested, or repeated within the batch
+        rows_missing_id: rows without a Trip Id (cannot be deduplicated; dropped)
+        rows_late: new rows whose Trip Id is at or below the previous watermark
+        rows_dropped: new rows removed by the cleaning pipeline
+        rows_added: cleaned rows appended to the store
+        segment: name of the new segment, or None if nothing was added
+    """
+
+    files_read: List[str] = field(default_factory=list)
+    files_skipped: List[str] = field(default_factory=list)
+    rows_read: int = 0
+    rows_duplicate: int = 0
+    rows_missing_id: int = 0
+    rows_late: int = 0
+    rows_dropped: int = 0
+    rows_added: int = 0
+    segment: Optional[str] = None
+
+
+def _file_digests(path: Path, prefix_size: Optional[int]) -> Tuple[Optional[str], str]:
+    """SHA-1 of the first prefix_size bytes (None if not requested) and of the whole file."""
+    digest = hashlib.sha1()
+    prefix_digest = None
+    remaining = prefix_size
+    with open(path, "rb") as fh:
+        while True:
+            size = _HASH_BLOCK if remaining is None or remaining <= 0 else min(_HASH_BLOCK, remaining)
+            block = fh.read(size)
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None and remaining > 0:
+                remaining -= len(block)
+                if remaining == 0:
+                    prefix_digest = digest.hexdigest()
+    return prefix_digest, digest.hexdigest()
+
+
+def _read_csv_from(path: Path, offset: int) -> pd.DataFrame:
+    """Raw rows of a trip CSV starting at byte `offset` (0 = whole file)."""
+    if offset == 0:
+        return apply_trip_schema(pd.read_csv(path, dtype=RAW_READ_DTYPES), copy=False)
+    with open(path, "rb") as fh:
+        header = fh.readline()
+        fh.seek(offset)
+        tail = fh.read()
+    return apply_trip_schema(pd.read_csv(io.BytesIO(header + tail), dtype=RAW_READ_DTYPES), copy=False)
+
+
+def _ends_line(path: Path, offset: int) -> bool:
+    """True when byte offset-1 of the file is a newline (a whole-row boundary)."""
+    if offset <= 0:
+        return False
+    with open(path, "rb") as fh:
+        fh.seek(offset - 1)
+        return fh.read(1) == b"\n"
+
+
+# -----------------------------------------------------------------------
+# Stored aggregates
+# -----------------------------------------------------------------------
+#
+# Series are written as one .npy file per index level plus one for the
+# values; the sketch states are a bucket-count array (DurationSketch) or a
+# counter Series (HeavyHitters) plus their scalar fields in meta.json.
+
+
+def _save_series(directory: Path, stem: str, series: pd.Series) -> dict:
+    index = series.index
+    levels = []
+    for i in range(index.nlevels):
+        values = index.get_level_values(i).to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)
+        np.save(directory / f"{stem}.index{i}.npy", values)
+        levels.append(str(index.get_level_values(i).dtype))
+    np.save(directory / f"{stem}.values.npy", series.to_numpy())
+    return {"stem": stem, "names": list(index.names), "levels": levels}
+
+
+def _load_series(directory: Path, entry: dict) -> pd.Series:
+    stem = entry["stem"]
+    levels = [
+        np.load(directory / f"{stem}.index{i}.npy").astype(dtype)
+        for i, dtype in enumerate(entry["levels"])
+    ]
+    if len(levels) == 1:
+        index = pd.Index(levels[0], name=entry["names"][0])
+    else:
+        index = pd.MultiIndex.from_arrays(levels, names=entry["names"])
+    return pd.Series(np.load(directory / f"{stem}.values.npy"), index=index)
+
+
+def write_aggregates(aggregates: Dict[str, object], directory: Path) -> None:
+    """Write merged partial aggregates as .npy files plus meta.json."""
+    directory.mkdir(parents=True, exist_ok=True)
+    entries = {}
+    for i, (key, value) in enumerate(aggregates.items()):
+        stem = f"a{i:02d}"
+        if isinstance(value, DurationSketch):
+            np.save(directory / f"{stem}.counts.npy", value.counts)
+            entries[key] = {
+                "kind": "duration_sketch",
+                "stem": stem,
+                "params": list(value.params),
+                "sum": value.sum,
+                "min": value.min,
+                "max": value.max,
+            }
+        elif isinstance(value, HeavyHitters):
+            entries[key] = {
+                "kind": "heavy_hitters",
+                "capacity": value.capacity,
+                "total": value.total,
+                "error": value.error,
+                "counters": _save_series(directory, stem, value.counters),
+            }
+        else:
+            entries[key] = {"kind": "series", **_save_series(directory, stem, value)}
+    with open(directory / "meta.json", "w", encoding="utf-8") as fh:
+        json.dump(entries, fh, indent=2)
+
+
+def read_aggregates(directory: Path) -> Dict[str, object]:
+    """Read aggregates written by write_aggregates()."""
+    with open(directory / "meta.json", encoding="utf-8") as fh:
+        entries = json.load(fh)
+    aggregates = {}
+    for key, entry in entries.items():
+        if entry["kind"] == "duration_sketch":
+            accuracy, range_min, range_max = entry["params"]
+            aggregates[key] = DurationSketch.from_counts(
+                np.load(directory / f"{entry['stem']}.counts.npy"),
+                total=entry["sum"],
+                min_value=entry["min"],
+                max_value=entry["max"],
+                relative_accuracy=accuracy,
+                range_min=range_min,
+                range_max=range_max,
+            )
+        elif entry["kind"] == "heavy_hitters":
+            hitters = HeavyHitters(entry["capacity"])
+            hitters.counters = _load_series(directory, entry["counters"])
+            hitters.total = entry["total"]
+            hitters.error = entry["error"]
+            aggregates[key] = hitters
+        else:
+            aggregates[key] = _load_series(directory, entry)
+    return aggregates
+
+
+class IncrementalTripStore:
+    """
+    Cleaned trip store that grows by incremental ingestion.
+
+    Example:
+        store = IncrementalTripStore("data/trips_store")
+        report = store.ingest("data/trips/")      # first run: everything
+        report = store.ingest("data/trips/")      # later: only new rows
+        store.watermark                            # {"max_trip_id": ..., ...}
+        store.summary()["daily"]                   # from stored aggregates
+        df = store.frame()                         # every cleaned trip
+
+    Raises (on open):
+        ValueError: If the store was written by another pipeline version or
+            store format; rebuild it into a new directory.
+    """
+
+    def __init__(self, directory, capacity: int = DEFAULT_HEAVY_HITTER_CAPACITY):
+        self.directory = Path(directory)
+        self._state = self._load_state()
+        if self._state is None:
+            self._state = {
+                "format_version": INCREMENTAL_FORMAT_VERSION,
+                "pipeline_version": PIPELINE_VERSION,
+                "generation": 0,
+                "capacity": capacity,
+                "n_rows": 0,
+                "watermark": {"max_trip_id": None, "max_start_time": None},
+                "files": {},
+                "segments": [],
+            }
+
+    def _load_state(self) -> Optional[dict]:
+        """The committed state.json, or None for a new store."""
+        try:
+            with open(self.directory / STATE_FILE, encoding="utf-8") as fh:
+                state = json.load(fh)
+        except FileNotFoundError:
+            return None
+        if state.get("format_version") != INCREMENTAL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported incremental store format: {state.get('format_version')}")
+        if state.get("pipeline_version") != PIPELINE_VERSION:
+            raise ValueError(
+                f"Store was cleaned with pipeline version {state.get('pipeline_version')}, "
+                f"current version is {PIPELINE_VERSION}; rebuild it into a new directory."
+            )
+        return state
+
+    def _read_current(self, read):
+        """
+        Call read(); if a commit by another process removed this state's
+        files meanwhile, switch to the newly committed state and retry.
+        """
+        for _ in range(_READ_RETRIES):
+            try:
+                return read()
+            except FileNotFoundError:
+                state = self._load_state()
+                if state is None or state["generation"] == self._state["generation"]:
+                    raise
+                self._state = state
+        return read()
+
+    # ------------------------------------------------------------------
+    # Read side
+    # ------------------------------------------------------------------
+
+    @property
+    def watermark(self) -> Dict[str, object]:
+        """Highest Trip Id and Start Time ingested so far (None when empty)."""
+        return dict(self._state["watermark"])
+
+    @property
+    def n_rows(self) -> int:
+        return self._state["n_rows"]
+
+    @property
+    def segments(self) -> List[str]:
+        return list(self._state["segments"])
+
+    @property
+    def files(self) -> Dict[str, dict]:
+        """Fingerprint (size, mtime_ns, sha1) of every ingested file, by path."""
+        return {path: dict(fp) for path, fp in self._state["files"].items()}
+
+    def _generation_file(self, stem: str, suffix: str, generation: Optional[int] = None) -> Path:
+        generation = self._state["generation"] if generation is None else generation
+        return self.directory / f"{stem}-{generation:05d}{suffix}"
+
+    def trip_index(self) -> TripIdIndex:
+        def read():
+            if not self._state["generation"]:
+                return TripIdIndex()
+            return TripIdIndex.load(self._generation_file("trip_ids", ".npy"))
+
+        return self._read_current(read)
+
+    def aggregates(self) -> Dict[str, object]:
+        """The stored (merged) partial aggregates."""
+        def read():
+            if not self._state["generation"]:
+                return {}
+            return read_aggregates(self._generation_file("aggregates", ""))
+
+        return self._read_current(read)
+
+    def summary(self, top_n: int = 10, quantiles=None, aggregates=AGGREGATES) -> Dict[str, object]:
+        """
+        Analytics outputs from the stored aggregates, without reading any trip
+        rows (see finalize_trip_aggregates). Duration percentiles and
+        popular_od are approximate.
+        """
+        merged = self.aggregates()
+        if not merged:
+            return {}
+        return finalize_trip_aggregates(merged, top_n=top_n, quantiles=quantiles, aggregates=aggregates)
+
+    def frame(self, shared: bool = False) -> pd.DataFrame:
+        """
+        Every cleaned trip, in ingestion order.
+
+        With shared=True the segments are opened memory-mapped (see
+        cache.open_column_store); a single segment is returned zero-copy,
+        several are concatenated (compact() merges them into one).
+        """
+        def read():
+            return [
+                (open_column_store if shared else read_column_store)(self.directory / SEGMENTS_DIR / name)
+                for name in self._state["segments"]
+            ]
+
+        frames = self._read_current(read)
+        if not frames:
+            return pd.DataFrame()
+        if len(frames) == 1:
+            return frames[0]
+        return concat_trip_frames(frames)
+
+    # ------------------------------------------------------------------
+    # Write side
+    # ------------------------------------------------------------------
+
+    def _changed_rows(self, path: Path, report: IngestReport) -> Optional[Tuple[pd.DataFrame, dict]]:
+        """New raw rows of a file plus its new fingerprint, or None if unchanged."""
+        key = str(path.resolve())
+        stat = path.stat()
+        known = self._state["files"].get(key)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            report.files_skipped.append(str(path))
+            return None
+
+        check_trip_csv(path)
+        grown = known is not None and stat.st_size > known["size"]
+        prefix_sha1, sha1 = _file_digests(path, known["size"] if grown else None)
+        fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": sha1}
+        if known and sha1 == known["sha1"]:
+            # Touched but not modified
+            report.files_skipped.append(str(path))
+            return pd.DataFrame(), fingerprint
+
+        offset = 0
+        if grown and prefix_sha1 == known["sha1"] and _ends_line(path, known["size"]):
+            offset = known["size"]
+        report.files_read.append(str(path) if offset == 0 else f"{path} (from byte {offset})")
+        return _read_csv_from(path, offset), fingerprint
+
+    def ingest(self, source: TripCsvSource = None) -> IngestReport:
+        """
+        Ingest the new rows of one or many trip CSVs (see resolve_trip_csvs).
+
+        Raises:
+            FileNotFoundError: If a listed file does not exist.
+            ValueError: If a changed file is missing required columns.
+        """
+
+        report = IngestReport()
+        raw_frames = []
+        fingerprints = {}
+        for path in resolve_trip_csvs(source):
+            changed = self._changed_rows(Path(path), report)
+            if changed is None:
+                continue
+            rows, fingerprint = changed
+            fingerprints[str(Path(path).resolve())] = fingerprint
+            if len(rows):
+                raw_frames.append(rows)
+
+        raw = concat_trip_frames(raw_frames) if raw_frames else pd.DataFrame()
+        report.rows_read = len(raw)
+
+        # Changes go into a copy; self._state only moves on once committed
+        state = copy.deepcopy(self._state)
+        index = self.trip_index()
+        watermark = state["watermark"]
+        new_raw = raw
+        if len(raw):
+            ids = raw[TRIP_ID_COL].to_numpy(dtype=np.float64, na_value=np.nan)
+            missing = np.isnan(ids)
+            report.rows_missing_id = int(missing.sum())
+            ids = np.where(missing, 0, ids).astype(np.int64)
+
+            repeated = pd.Series(ids).duplicated().to_numpy() & ~missing
+            # Ids above the watermark are new by construction: only the rest
+            # need a hash index lookup
+            below = ~missing & ~repeated
+            if watermark["max_trip_id"] is not None:
+                below &= ids <= watermark["max_trip_id"]
+            else:
+                below[:] = False
+            seen = np.zeros(len(ids), dtype=bool)
+            seen[below] = index.contains(ids[below])
+
+            keep = ~missing & ~repeated & ~seen
+            report.rows_duplicate = int((repeated | seen).sum())
+            report.rows_late = int((below & keep).sum())
+            new_raw = raw[keep].reset_index(drop=True)
+            new_ids = ids[keep]
+
+        if len(new_raw) == 0:
+            if fingerprints:
+                # Record the new fingerprints so the files are skipped next time
+                state["files"].update(fingerprints)
+                self._commit(state, index=None, merged=None, clean=None)
+            return report
+
+        clean = full_clean_pipeline(new_raw)
+        report.rows_dropped = len(new_raw) - len(clean)
+        report.rows_added = len(clean)
+
+        # Rejected rows are recorded too, so they are not re-read as new
+        index.add(new_ids)
+        previous_max = watermark["max_trip_id"]
+        watermark["max_trip_id"] = int(new_ids.max() if previous_max is None else max(new_ids.max(), previous_max))
+        if len(clean):
+            latest = pd.Timestamp(clean[START_TIME_COL].max())
+            if watermark["max_start_time"] is None or latest > pd.Timestamp(watermark["max_start_time"]):
+                watermark["max_start_time"] = latest.isoformat()
+
+        merged = None
+        if len(clean):
+            partial = partial_trip_aggregates(clean, approximate=True, capacity=state["capacity"])
+            merged = merge_trip_aggregates([p for p in (self.aggregates(), partial) if p])
+
+        state["files"].update(fingerprints)
+        state["n_rows"] += len(clean)
+        report.segment = self._commit(state, index=index, merged=merged, clean=clean if len(clean) else None)
+        return report
+
+    def _commit(self, state: dict, index, merged, clean) -> Optional[str]:
+        """
+        Write the next generation's files, then atomically switch state.json
+        to them. Returns the new segment's name (None without `clean` rows).
+
+        `state` is the next state (a copy, edited by the caller). It becomes
+        self._state only once state.json is replaced: if any step fails,
+        the object still describes the last committed state.
+        """
+        generation = self._state["generation"] + 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        segment = None
+        if clean is not None:
+            segment = f"{generation:05d}"
+            # Replace leftovers of an uncommitted attempt at this generation
+            export_column_store(clean, self.directory / SEGMENTS_DIR / segment, replace=True)
+            state["segments"].append(segment)
+
+        # Carry unchanged files over to the new generation
+        index_path = self._generation_file("trip_ids", ".npy", generation)
+        aggregates_dir = self._generation_file("aggregates", "", generation)
+        if index is None:
+            index = self.trip_index()
+        index.save(index_path)
+        if merged is None:
+            merged = self.aggregates()
+        write_aggregates(merged, aggregates_dir)
+
+        state["generation"] = generation
+        tmp_path = self.directory / f".{STATE_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(state, fh, indent=2)
+        os.replace(tmp_path, self.directory / STATE_FILE)
+        self._state = state
+
+        self._remove_stale_files()
+        return segment
+
+    def _remove_stale_files(self) -> None:
+        """Delete files of older generations and segments state.json does not list."""
+        current = {
+            self._generation_file("trip_ids", ".npy").name,
+            self._generation_file("aggregates", "").name,
+        }
+        for pattern in ("trip_ids-*.npy", "aggregates-*"):
+            for path in self.directory.glob(pattern):
+                if path.name in current:
+                    continue
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink(missing_ok=True)
+        segments_dir = self.directory / SEGMENTS_DIR
+        if segments_dir.exists():
+            for path in segments_dir.iterdir():
+                if path.name not in self._state["segments"]:
+                    shutil.rmtree(path, ignore_errors=True)
+
+    def compact(self) -> None:
+        """Merge every segment into one (so frame(shared=True) is zero-copy)."""
+        if len(self._state["segments"]) <= 1:
+            return
+        frame = self.frame()
+        state = copy.deepcopy(self._state)
+        state["segments"] = []
+        self._commit(state, index=None, merged=None, clean=frame)
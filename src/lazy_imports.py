@@ -0,0 +1,62 @@
+
+import importlib
+import threading
+from types import ModuleType
+
+# =======================================================================
+#                           LAZY IMPORTS
+# =======================================================================
+#
+# The plotting stack (matplotlib, plotly) takes longer to import than the
+# whole data pipeline. Modules that only need it inside functions bind it
+# with lazy_import() instead: the name behaves like the module, but the
+# import runs on the first attribute access, i.e. on the first plot. Batch
+# jobs that import src.data_loading / src.analytics never pay for it.
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Module `name`, imported on first use.
+
+    Example:
+        plt = lazy_import("matplotlib.pyplot")   # nothing imported yet
+        fig, ax = plt.subplots()                  # imports matplotlib.pyplot
+    """
+
+    return LazyModule(name)
@@ -0,0 +1,230 @@
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_cleaning import END_TIME_COL, START_TIME_COL, parse_timestamps
+
+# =======================================================================
+#                  PER-STATION HOURLY NET FLOW
+# =======================================================================
+#
+# StationFlow keeps two dense (station x hour) count arrays: departures
+# (trips leaving a station, by Start Time) and arrivals (trips reaching it,
+# by End Time). Hours are whole clock hours, stored as hours since the
+# epoch relative to `first_hour`. New trips are scattered into the arrays
+# with np.bincount over flat (station, hour) codes, restricted to the hour
+# range they touch, so appending a month of trips only grows the arrays at
+# the edges. Net flow is departures - arrivals: positive values mean the
+# station is losing bikes.
+
+START_ID_COL = "Start Station Id"
+END_ID_COL = "End Station Id"
+
+
+def _hours_and_ids(times: pd.Series, ids: pd.Series):
+    """Hour numbers and station ids of the rows where both are known."""
+    times = parse_timestamps(times).to_numpy().astype("datetime64[h]")
+    ids = ids.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnat(times) & ~np.isnan(ids)
+    return times[valid].view(np.int64), ids[valid].astype(np.int64)
+
+
+@dataclass
+class StationFlow:
+    """
+    Dense departures / arrivals per station and hour (see build_station_flow).
+
+    Attributes:
+        station_ids: station id of each row (sorted)
+        first_hour: clock hour of the first column (datetime64[h])
+        departures, arrivals: int32 arrays of shape (stations, hours)
+    """
+
+    station_ids: np.ndarray
+    first_hour: np.datetime64
+    departures: np.ndarray
+    arrivals: np.ndarray
+
+    @property
+    def n_hours(self) -> int:
+        return self.departures.shape[1]
+
+    @property
+    def hours(self) -> np.ndarray:
+        """Clock hour of every column (datetime64[h])."""
+        return self.first_hour + np.arange(self.n_hours)
+
+    @property
+    def net_flow(self) -> np.ndarray:
+        """departures - arrivals, shape (stations, hours)."""
+        return self.departures.astype(np.int64) - self.arrivals
+
+    def _grow(self, station_ids: np.ndarray, first: int, last: int) -> None:
+        """Extend the arrays to cover `station_ids` and hours first..last."""
+        old_first = int(self.first_hour.astype(np.int64)) if self.n_hours else first
+        new_first = min(first, old_first)
+        new_last = max(last, old_first + self.n_hours - 1)
+        all_ids = np.union1d(self.station_ids, station_ids)
+
+        n_hours = new_last - new_first + 1
+        if len(all_ids) == len(self.station_ids) and new_first == old_first and n_hours == self.n_hours:
+            return
+
+        shape = (len(all_ids), n_hours)
+        rows = np.searchsorted(all_ids, self.station_ids)
+        cols = slice(old_first - new_first, old_first - new_first + self.n_hours)
+        for name in ("departures", "arrivals"):
+            grown = np.zeros(shape, dtype=np.int32)
+            grown[rows, cols] = getattr(self, name)
+            setattr(self, name, grown)
+        self.station_ids = all_ids
+        self.first_hour = np.datetime64(new_first, "h")
+
+    def update(self, df: pd.DataFrame) -> "StationFlow":
+        """
+        Add the departures and arrivals of new trips. Returns self.
+
+        Stations and hours not seen before extend the arrays. Rows missing a
+        station id or timestamp are skipped on that side (a trip with no End
+        Time still counts as a departure).
+
+        Raises:
+            ValueError: If a station id or time column is missing.
+        """
+
+        missing = [c for c in (START_ID_COL, END_ID_COL, START_TIME_COL, END_TIME_COL) if c not in df.columns]
+        if missing:
+            raise ValueError(f"Trip frame missing columns: {missing}")
+
+        dep_hours, dep_ids = _hours_and_ids(df[START_TIME_COL], df[START_ID_COL])
+        arr_hours, arr_ids = _hours_and_ids(df[END_TIME_COL], df[END_ID_COL])
+        hours = np.concatenate([dep_hours, arr_hours])
+        if len(hours) == 0:
+            return self
+
+        first, last = int(hours.min()), int(hours.max())
+        self._grow(np.union1d(dep_ids, arr_ids), first, last)
+
+        # Scatter-add over the touched hour range only
+        offset = first - int(self.first_hour.astype(np.int64))
+        width = last - first + 1
+        size = len(self.station_ids) * width
+        for name, ids, event_hours in (("departures", dep_ids, dep_hours), ("arrivals", arr_ids, arr_hours)):
+            flat = np.searchsorted(self.station_ids, ids) * width + (event_hours - first)
+            counts = np.bincount(flat, minlength=size).reshape(len(self.station_ids), width)
+            getattr(self, name)[:, offset:offset + width] += counts.astype(np.int32)
+        return self
+
+    def _window(self, start=None, end=None) -> slice:
+        """Columns of the clock hours in [start, end] (inclusive, None = unbounded)."""
+        lo, hi = 0, self.n_hours
+        first = int(self.first_hour.astype(np.int64)) if self.n_hours else 0
+        if start is not None:
+            lo = max(_hour_number(start) - first, 0)
+        if end is not None:
+            hi = min(_hour_number(end) - first + 1, self.n_hours)
+        return slice(lo, max(hi, lo))
+
+    def station_series(self, station_id: int, start=None, end=None) -> pd.DataFrame:
+        """
+        Hourly flow of one station.
+
+        Returns columns:
+                        - hour (datetime64[h])
+                        - departures, arrivals, net_flow (int)
+
+        Raises:
+            KeyError: If the station has no trips.
+        """
+
+        row = int(np.searchsorted(self.station_ids, station_id))
+        if row == len(self.station_ids) or self.station_ids[row] != station_id:
+            raise KeyError(f"Unknown station id: {station_id}")
+        window = self._window(start, end)
+        departures = self.departures[row, window].astype(np.int64)
+        arrivals = self.arrivals[row, window].astype(np.int64)
+        return pd.DataFrame(
+            {
+                "hour": self.hours[window],
+                "departures": departures,
+                "arrivals": arrivals,
+                "net_flow": departures - arrivals,
+            }
+        )
+
+    def largest_deficits(self, top_n: int = 10, start=None, end=None) -> pd.DataFrame:
+        """
+        Stations that would run out of bikes first over a window of hours.
+
+        Each station's running balance is the cumulative sum of
+        arrivals - departures from the start of the window; its deficit is
+        the lowest point of that balance, i.e. the number of bikes it must
+        hold at the start of the window to never run empty.
+
+        Returns columns (largest deficit first, ties by station id):
+                        - station_id (int)
+                        - max_deficit (int): bikes short at the worst hour
+                        - deficit_hour (datetime64[h]): that worst hour
+                        - net_flow (int): departures - arrivals over the window
+        """
+
+        window = self._window(start, end)
+        if window.stop == window.start or len(self.station_ids) == 0:
+            return pd.DataFrame(
+                {
+                    "station_id": np.array([], dtype=np.int64),
+                    "max_deficit": np.array([], dtype=np.int64),
+                    "deficit_hour": np.array([], dtype="datetime64[h]"),
+                    "net_flow": np.array([], dtype=np.int64),
+                }
+            )
+
+        balance = np.cumsum(self.arrivals[:, window].astype(np.int64) - self.departures[:, window], axis=1)
+        worst_col = balance.argmin(axis=1)
+        deficit = np.maximum(-balance[np.arange(len(balance)), worst_col], 0)
+        order = np.lexsort((self.station_ids, -deficit))
+        order = order[deficit[order] > 0][: max(top_n, 0)]
+
+        return pd.DataFrame(
+            {
+                "station_id": self.station_ids[order],
+                "max_deficit": deficit[order],
+                "deficit_hour": self.hours[window][worst_col[order]],
+                "net_flow": -balance[order, -1],
+            }
+        )
+
+
+def _hour_number(value) -> int:
+    """Hours since the epoch of a datetime-like value (floored)."""
+    return int(np.datetime64(pd.Timestamp(value).floor("h"), "h").astype(np.int64))
+
+
+def build_station_flow(df: Optional[pd.DataFrame] = None) -> StationFlow:
+    """
+    Build the station x hour flow arrays of a trip frame.
+
+    Example:
+        flow = build_station_flow(january)
+        flow.update(february)                 # incremental
+        flow.largest_deficits(5, start="2024-02-01 07:00", end="2024-02-01 10:00")
+
+    Parameters
+    ----------
+    df : pandas.DataFrame or None
+         Trips with Start/End Time and Start/End Station Id (raw or cleaned).
+         None gives an empty StationFlow to feed with update().
+    """
+
+    flow = StationFlow(
+        station_ids=np.array([], dtype=np.int64),
+        first_hour=np.datetime64(0, "h"),
+        departures=np.zeros((0, 0), dtype=np.int32),
+        arrivals=np.zeros((0, 0), dtype=np.int32),
+    )
+    if df is not None:
+        flow.update(df)
+    return flow
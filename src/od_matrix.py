@@ -0,0 +1,288 @@
+
+from dataclasses import dataclass
+from typing import Iterable, Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_cleaning import START_HOUR_COL, TRIP_DURATION_MIN_COL
+
+# =======================================================================
+#                  ORIGIN-DESTINATION (OD) MATRIX ENGINE
+# =======================================================================
+#
+# Station ids are encoded once to dense integers 0..S-1, and every trip
+# becomes a pair code (origin * S + destination), optionally prefixed by a
+# slice code (start hour or user type). Trips are reduced to the observed
+# (slice, origin, destination) entries with a hash factorization plus
+# np.bincount — the sparse matrix is kept in coordinate form, sorted by
+# (slice, origin, destination). Queries only touch those entries, whose
+# number is bounded by the observed station pairs, not by trips.
+
+OD_SLICES = {
+    "hour": START_HOUR_COL,
+    "user_type": "User Type",
+}
+
+START_ID_COL = "Start Station Id"
+END_ID_COL = "End Station Id"
+
+
+def _sum_by_key(keys: np.ndarray, *weights: np.ndarray):
+    """Sorted unique keys plus the row count and weight sums per key."""
+    codes, uniques = pd.factorize(keys, sort=True)
+    counts = np.bincount(codes, minlength=len(uniques)).astype(np.int64)
+    sums = [np.bincount(codes, weights=w, minlength=len(uniques)) for w in weights]
+    return uniques, counts, sums
+
+
+@dataclass
+class ODMatrix:
+    """
+    Sparse origin-destination trip matrix over dense station codes.
+
+    Attributes:
+        station_ids: station id of each dense code (sorted)
+        station_names: a station name for each code (first one seen)
+        slice_by: None, "hour" or "user_type"
+        slice_labels: label of each slice code (None when not sliced)
+        slice_code, origin, destination: coordinates of the observed entries
+        trip_count: trips per entry
+        duration_sum: total trip minutes per entry (NaN durations count as 0)
+        duration_count: trips with a known duration per entry
+    """
+
+    station_ids: np.ndarray
+    station_names: np.ndarray
+    slice_by: Optional[str]
+    slice_labels: Optional[pd.Index]
+    slice_code: np.ndarray
+    origin: np.ndarray
+    destination: np.ndarray
+    trip_count: np.ndarray
+    duration_sum: np.ndarray
+    duration_count: np.ndarray
+
+    @property
+    def n_stations(self) -> int:
+        return len(self.station_ids)
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored (slice, origin, destination) entries."""
+        return len(self.trip_count)
+
+    def _entries(self, slices: Optional[Iterable] = None) -> np.ndarray:
+        """Boolean mask of the entries in the selected slices (None = all)."""
+        if slices is None:
+            return np.ones(self.nnz, dtype=bool)
+        if self.slice_by is None:
+            raise ValueError("This matrix is not sliced; build it with `by=` to filter slices.")
+        wanted = self.slice_labels.get_indexer(list(slices))
+        return np.isin(self.slice_code, wanted[wanted >= 0])
+
+    def pairs(self, slices: Optional[Iterable] = None) -> pd.DataFrame:
+        """
+        Trips per observed station pair, summed over the selected slices.
+
+        Parameters
+        ----------
+        slices : iterable or None
+                 Slice labels to keep (start hours or user types).
+                 None keeps every trip.
+
+        Returns columns:
+                        - origin, destination (int): dense station codes
+                        - trip_count (int)
+                        - duration_sum (float), duration_count (int)
+        """
+
+        keep = self._entries(slices)
+        pair = self.origin[keep].astype(np.int64) * self.n_stations + self.destination[keep]
+        keys, _, (trips, minutes, timed) = _sum_by_key(
+            pair,
+            self.trip_count[keep].astype(np.float64),
+            self.duration_sum[keep],
+            self.duration_count[keep].astype(np.float64),
+        )
+        keys = np.asarray(keys, dtype=np.int64)
+        return pd.DataFrame(
+            {
+                "origin": keys // self.n_stations,
+                "destination": keys % self.n_stations,
+                "trip_count": trips.astype(np.int64),
+                "duration_sum": minutes,
+                "duration_count": timed.astype(np.int64),
+            }
+        )
+
+    def to_dense(self, slices: Optional[Iterable] = None) -> np.ndarray:
+        """(S, S) trip count matrix; only sensible for a few thousand stations."""
+        pairs = self.pairs(slices)
+        dense = np.zeros((self.n_stations, self.n_stations), dtype=np.int64)
+        dense[pairs["origin"].to_numpy(), pairs["destination"].to_numpy()] = pairs["trip_count"].to_numpy()
+        return dense
+
+    def top_flows(self, top_n: int = 10, slices: Optional[Iterable] = None) -> pd.DataFrame:
+        """
+        The top_n station pairs by trip count (ties by origin, destination).
+
+        Returns columns:
+                        - start_station_id, end_station_id (int)
+                        - start_station, end_station (str)
+                        - trip_count (int)
+                        - avg_duration_min (float)
+        """
+
+        pairs = self.pairs(slices)
+        counts = pairs["trip_count"].to_numpy()
+        if 0 < top_n < len(pairs):
+            kth = np.partition(counts, len(counts) - top_n)[len(counts) - top_n]
+            pairs = pairs[counts >= kth]
+        # pairs are sorted by (origin, destination), so a stable sort breaks ties
+        top = pairs.sort_values("trip_count", ascending=False, kind="stable").head(max(top_n, 0))
+
+        origin, destination = top["origin"].to_numpy(), top["destination"].to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg = top["duration_sum"].to_numpy() / top["duration_count"].to_numpy()
+        return pd.DataFrame(
+            {
+                "start_station_id": self.station_ids[origin],
+                "end_station_id": self.station_ids[destination],
+                "start_station": self.station_names[origin],
+                "end_station": self.station_names[destination],
+                "trip_count": top["trip_count"].to_numpy(),
+                "avg_duration_min": avg,
+            }
+        )
+
+    def station_degrees(self, slices: Optional[Iterable] = None) -> pd.DataFrame:
+        """
+        Per-station flow summary.
+
+        Returns columns (one row per station, in station id order):
+                        - station_id (int), station_name (str)
+                        - out_trips / in_trips (int): trips leaving / arriving
+                        - out_degree / in_degree (int): distinct destinations /
+                          origins
+                        - round_trips (int): trips ending where they started
+        """
+
+        pairs = self.pairs(slices)
+        origin = pairs["origin"].to_numpy()
+        destination = pairs["destination"].to_numpy()
+        trips = pairs["trip_count"].to_numpy()
+        loops = origin == destination
+        n = self.n_stations
+        return pd.DataFrame(
+            {
+                "station_id": self.station_ids,
+                "station_name": self.station_names,
+                "out_trips": np.bincount(origin, weights=trips, minlength=n).astype(np.int64),
+                "in_trips": np.bincount(destination, weights=trips, minlength=n).astype(np.int64),
+                "out_degree": np.bincount(origin, minlength=n).astype(np.int64),
+                "in_degree": np.bincount(destination, minlength=n).astype(np.int64),
+                "round_trips": np.bincount(
+                    origin[loops], weights=trips[loops], minlength=n
+                ).astype(np.int64),
+            }
+        )
+
+    def round_trip_share(self, slices: Optional[Iterable] = None) -> float:
+        """Share of trips that end at their start station (NaN if no trips)."""
+        keep = self._entries(slices)
+        trips = self.trip_count[keep]
+        total = trips.sum()
+        if total == 0:
+            return float("nan")
+        loops = self.origin[keep] == self.destination[keep]
+        return float(trips[loops].sum() / total)
+
+
+def build_od_matrix(
+    df: pd.DataFrame,
+    by: Optional[Literal["hour", "user_type"]] = None,
+) -> ODMatrix:
+    """
+    Build the sparse origin-destination matrix of a cleaned trip frame.
+
+    Trips with a missing station id (or a missing slice value) are skipped.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+         Cleaned trips with Start/End Station Id and Name columns (and
+         trip_duration_min / start_hour when used).
+    by : "hour", "user_type" or None
+         Keep a slice dimension so queries can be restricted to some start
+         hours or user types.
+
+    Raises:
+        ValueError: If `by` is unknown or a required column is missing.
+    """
+
+    if by is not None and by not in OD_SLICES:
+        raise ValueError(f"Parameter 'by' must be one of {list(OD_SLICES)} or None.")
+    required = [START_ID_COL, END_ID_COL, "Start Station Name", "End Station Name"]
+    if by is not None:
+        required.append(OD_SLICES[by])
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"Trip frame missing columns: {missing}")
+
+    start_ids = df[START_ID_COL].to_numpy(dtype=np.float64, na_value=np.nan)
+    end_ids = df[END_ID_COL].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~(np.isnan(start_ids) | np.isnan(end_ids))
+
+    slice_labels = None
+    slice_codes = np.zeros(len(df), dtype=np.int64)
+    if by is not None:
+        codes, uniques = pd.factorize(df[OD_SLICES[by]], sort=True, use_na_sentinel=True)
+        valid &= codes >= 0
+        slice_codes = codes.astype(np.int64)
+        slice_labels = pd.Index(uniques)
+        if isinstance(slice_labels.dtype, pd.CategoricalDtype):
+            slice_labels = slice_labels.astype(slice_labels.dtype.categories.dtype)
+
+    start_ids = start_ids[valid].astype(np.int64)
+    end_ids = end_ids[valid].astype(np.int64)
+    slice_codes = slice_codes[valid]
+
+    # Dense station codes shared by origins and destinations
+    station_ids, dense = np.unique(np.concatenate([start_ids, end_ids]), return_inverse=True)
+    n = len(station_ids)
+    origin, destination = dense[: len(start_ids)], dense[len(start_ids):]
+
+    names = np.concatenate(
+        [
+            df["Start Station Name"].to_numpy(dtype=object)[valid],
+            df["End Station Name"].to_numpy(dtype=object)[valid],
+        ]
+    )
+    _, first_seen = np.unique(dense, return_index=True)
+    station_names = names[first_seen]
+
+    if TRIP_DURATION_MIN_COL in df.columns:
+        minutes = df[TRIP_DURATION_MIN_COL].to_numpy(dtype=np.float64)[valid]
+    else:
+        minutes = np.full(len(origin), np.nan)
+    timed = ~np.isnan(minutes)
+
+    key = (slice_codes * n + origin) * n + destination
+    keys, counts, (duration_sum, duration_count) = _sum_by_key(
+        key, np.where(timed, minutes, 0.0), timed.astype(np.float64)
+    )
+    keys = np.asarray(keys, dtype=np.int64)
+
+    return ODMatrix(
+        station_ids=station_ids,
+        station_names=station_names,
+        slice_by=by,
+        slice_labels=slice_labels,
+        slice_code=(keys // (n * n)).astype(np.int32),
+        origin=((keys // n) % n).astype(np.int32),
+        destination=(keys % n).astype(np.int32),
+        trip_count=counts,
+        duration_sum=duration_sum,
+        duration_count=duration_count.astype(np.int64),
+    )
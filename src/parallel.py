@@ -0,0 +1,142 @@
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .analytics import (
+    AGGREGATES,
+    finalize_trip_aggregates,
+    merge_trip_aggregates,
+    partial_trip_aggregates,
+    partials_for,
+)
+from .data_cleaning import full_clean_pipeline
+from .data_loading import TripCsvSource, check_trip_csv, load_raw_data, resolve_trip_csvs
+from .schema import concat_trip_frames
+from .sketches import DEFAULT_HEAVY_HITTER_CAPACITY
+
+# =======================================================================
+#                    PARALLEL MULTI-FILE INGESTION
+# =======================================================================
+#
+# Trip data arrives as one CSV per month. ingest_trip_files() hands each
+# file to a worker process, which loads, validates and cleans it and
+# reduces it to partial aggregates (analytics.partial_trip_aggregates).
+# Only those small partials travel back to the parent, where they are
+# merged and finalized. The cleaned rows are sent back (and concatenated)
+# only when keep_rows=True.
+#
+# Work is split per file, so the speed-up is bounded by the number of
+# files: a year of monthly files keeps up to 12 cores busy.
+
+
+@dataclass
+class IngestResult:
+    """
+    Output of ingest_trip_files().
+
+    Attributes:
+        summary: the dictionary described in finalize_trip_aggregates()
+        files: the CSV files that were ingested, in order
+        rows_per_file: cleaned trips per file
+        frame: every cleaned trip (file order), or None unless keep_rows
+    """
+
+    summary: Dict[str, object]
+    files: List[Path]
+    rows_per_file: List[int] = field(default_factory=list)
+    frame: Optional[pd.DataFrame] = None
+
+
+def _ingest_file(
+    path: Path,
+    keys: set,
+    approximate: bool,
+    capacity: int,
+    keep_rows: bool,
+) -> Tuple[Dict[str, object], int, Optional[pd.DataFrame]]:
+    """Worker: load + clean one CSV and reduce it to partial aggregates."""
+    df = full_clean_pipeline(load_raw_data(str(path)))
+    partial = partial_trip_aggregates(df, keys=keys, approximate=approximate, capacity=capacity)
+    return partial, len(df), (df if keep_rows else None)
+
+
+def ingest_trip_files(
+    source: TripCsvSource = None,
+    aggregates=AGGREGATES,
+    top_n: int = 10,
+    quantiles=None,
+    approximate: bool = False,
+    capacity: int = DEFAULT_HEAVY_HITTER_CAPACITY,
+    keep_rows: bool = False,
+    max_workers: Optional[int] = None,
+) -> IngestResult:
+    """
+    Load, clean and summarize many trip CSVs in parallel.
+
+    Example:
+        result = ingest_trip_files("data/trips/2024-*.csv", max_workers=12)
+        result.summary["weekly"]     # same as weekly_trip_counts(full year)
+
+    Parameters
+    ----------
+    source : str, Path, iterable of those, or None
+             Directory, glob pattern or list of CSVs (see resolve_trip_csvs).
+    aggregates, top_n, quantiles, approximate, capacity :
+             As in analytics.stream_trip_summary().
+    keep_rows : bool
+             Also return the concatenated cleaned frame. Off by default, as
+             shipping every row back to the parent dominates the run time.
+    max_workers : int or None
+             Worker processes. Defaults to one per file, up to the CPU count.
+             With a single worker everything runs in the calling process.
+
+    Returns
+    -------
+    IngestResult
+        The summary is identical to stream_trip_summary() over the same files.
+
+    Raises
+    ------
+    FileNotFoundError
+        If a file is missing (checked before any worker starts).
+    ValueError
+        If a file lacks required columns, an aggregate is unknown, or no
+        trips are left after cleaning.
+    """
+
+    files = resolve_trip_csvs(source)
+    for path in files:
+        check_trip_csv(path)
+
+    aggregates = list(aggregates)
+    keys = partials_for(aggregates)
+    if max_workers is None:
+        max_workers = min(len(files), os.cpu_count() or 1)
+
+    args = (keys, approximate, capacity, keep_rows)
+    if max_workers <= 1:
+        outputs = [_ingest_file(path, *args) for path in files]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            # map() keeps file order, so the concatenated frame is deterministic
+            outputs = list(pool.map(_ingest_file, files, *[[a] * len(files) for a in args]))
+
+    merged = merge_trip_aggregates(partial for partial, n_rows, _ in outputs if n_rows)
+    if not merged:
+        raise ValueError("No trips found in the input files.")
+
+    frame = None
+    if keep_rows:
+        frame = concat_trip_frames(df for _, _, df in outputs)
+
+    return IngestResult(
+        summary=finalize_trip_aggregates(merged, top_n=top_n, quantiles=quantiles, aggregates=aggregates),
+        files=files,
+        rows_per_file=[n_rows for _, n_rows, _ in outputs],
+        frame=frame,
+    )
@@ -1,22 +1,30 @@
-from typing import Dict, Literal
-import matplotlib.pyplot as plt
+from typing import Dict, Literal, Optional
 import numpy as np
 import pandas as pd
-import plotly.express as px
 
-from data_cleaning import (
+from .data_cleaning import (
     TRIP_DATE_COL,
     START_HOUR_COL,
+    START_MONTH_COL,
     TRIP_DURATION_MIN_COL,
 )
 
-from analytics import (
+from .analytics import (
     hourly_trip_counts,
     daily_trip_counts,
     weekly_trip_counts,
     popular_stations,
+    station_id_counts,
     user_type_summary,
 )
+from .data_loading import load_station_coordinates
+from .instrumentation import instrument
+from .lazy_imports import lazy_import
+from .stations import StationIndex, build_station_index
+
+# The plotting libraries are imported on the first plot, not with this module
+plt = lazy_import("matplotlib.pyplot")
+px = lazy_import("plotly.express")
 
 
 # We use the raw column name here so we don't depend on other modules for this constant
@@ -67,6 +75,7 @@ def daily_trip_counts(df: pd.DataFrame) -> pd.DataFrame:
     return grouped
 
 
+@instrument()
 def plot_hour_weekday_heatmap(df: pd.DataFrame):
     """
     Heatmap Hour vs Weekday
@@ -102,6 +111,7 @@ def plot_hour_weekday_heatmap(df: pd.DataFrame):
     plt.show()
     
 
+@instrument()
 def plot_trip_duration_hist(df: pd.DataFrame):
     """
     Histogram of Trip Duration (minutes)
@@ -123,6 +133,7 @@ def plot_trip_duration_hist(df: pd.DataFrame):
     plt.show()
 
 
+@instrument()
 def plot_avg_trip_duration_daily(df: pd.DataFrame):
     """
     Plot the average trip duration per day.
@@ -147,8 +158,19 @@ def plot_avg_trip_duration_daily(df: pd.DataFrame):
     plt.tight_layout()
     plt.show()
 
-def plot_user_type_comparison(df: pd.DataFrame):
-    summary = user_type_summary(df)
+# -----------------------------------------------------------------------
+# Dashboard figures
+#
+# The plot_*_counts / plot_duration_distribution renderers draw already
+# aggregated frames (from analytics.py or a cube.CubeSelection), so the
+# dashboard never has to touch trip rows to redraw a chart. The plot_*
+# functions taking a trip frame aggregate it first and then delegate.
+# -----------------------------------------------------------------------
+
+
+@instrument()
+def plot_user_type_counts(summary: pd.DataFrame):
+    """Bar chart of a user_type_summary() frame."""
     fig, ax = plt.subplots(figsize=(8, 4))
     ax.bar(summary["User Type"], summary["trip_count"])
     ax.set_xlabel("User Type")
@@ -158,8 +180,14 @@ def plot_user_type_comparison(df: pd.DataFrame):
     return fig
 
 
-def plot_hourly_usage(df: pd.DataFrame):
-    hourly_df = hourly_trip_counts(df)
+@instrument()
+def plot_user_type_comparison(df: pd.DataFrame):
+    return plot_user_type_counts(user_type_summary(df))
+
+
+@instrument()
+def plot_hourly_counts(hourly_df: pd.DataFrame):
+    """Bar chart of an hourly_trip_counts() frame."""
     fig, ax = plt.subplots(figsize=(8, 4))
     ax.bar(hourly_df["start_hour"], hourly_df["trip_count"])
     ax.set_xlabel("Hour of Day")
@@ -168,3 +196,170 @@ def plot_hourly_usage(df: pd.DataFrame):
     ax.set_xticks(range(0, 24))
     fig.tight_layout()
     return fig
+
+
+@instrument()
+def plot_hourly_usage(df: pd.DataFrame):
+    return plot_hourly_counts(hourly_trip_counts(df))
+
+
+@instrument()
+def plot_daily_counts(daily_df: pd.DataFrame):
+    """Line chart of a daily_trip_counts() frame."""
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.plot(daily_df[TRIP_DATE_COL], daily_df["trip_count"], marker="o")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Number of Trips")
+    ax.set_title("Trips per Day")
+    ax.tick_params(axis="x", rotation=45)
+    fig.tight_layout()
+    return fig
+
+
+@instrument()
+def plot_daily_trends(df: pd.DataFrame):
+    return plot_daily_counts(daily_trip_counts(df))
+
+
+@instrument()
+def plot_weekly_counts(weekly_df: pd.DataFrame):
+    """Bar chart of a weekly_trip_counts() frame."""
+    fig, ax = plt.subplots(figsize=(8, 4))
+    ax.bar(weekly_df["week_label"], weekly_df["trip_count"])
+    ax.set_xlabel("ISO Week")
+    ax.set_ylabel("Number of Trips")
+    ax.set_title("Trips per Week")
+    ax.tick_params(axis="x", rotation=45)
+    fig.tight_layout()
+    return fig
+
+
+@instrument()
+def plot_weekly_trends(df: pd.DataFrame):
+    return plot_weekly_counts(weekly_trip_counts(df))
+
+
+@instrument()
+def plot_station_counts(stations_df: pd.DataFrame, by: Literal["start", "end"] = "start"):
+    """Horizontal bar chart of a popular_stations() frame."""
+    fig, ax = plt.subplots(figsize=(8, 5))
+    # Largest bar on top
+    ax.barh(stations_df["station_name"][::-1], stations_df["trip_count"][::-1])
+    ax.set_xlabel("Number of Trips")
+    ax.set_ylabel(f"{by.capitalize()} Station")
+    ax.set_title(f"Most Popular {by.capitalize()} Stations")
+    fig.tight_layout()
+    return fig
+
+
+@instrument()
+def plot_popular_stations(
+    df: pd.DataFrame,
+    top_n: int = 10,
+    by: Literal["start", "end"] = "start",
+):
+    return plot_station_counts(popular_stations(df, top_n=top_n, by=by), by=by)
+
+
+@instrument()
+def plot_station_map(station_counts: pd.DataFrame, stations: StationIndex, by: Literal["start", "end"] = "start"):
+    """
+    Plotly map of a station_id_counts() frame: one marker per station, sized
+    by trip count, joined to the coordinates on station id.
+
+    Returns None when none of the stations has coordinates.
+    """
+    pos = stations.positions(station_counts["station_id"].to_numpy())
+    located = pos >= 0
+    located[located] = ~np.isnan(stations.lat[pos[located]]) & ~np.isnan(stations.lon[pos[located]])
+    if not located.any():
+        return None
+
+    pos = pos[located]
+    map_df = pd.DataFrame(
+        {
+            "station_name": stations.station_names[pos],
+            "lat": stations.lat[pos],
+            "lon": stations.lon[pos],
+            "trip_count": station_counts["trip_count"].to_numpy()[located],
+        }
+    )
+    fig = px.scatter_map(
+        map_df,
+        lat="lat",
+        lon="lon",
+        size="trip_count",
+        hover_name="station_name",
+        hover_data={"trip_count": True, "lat": False, "lon": False},
+        zoom=11,
+        height=600,
+        title=f"Trips per {by.capitalize()} Station",
+    )
+    fig.update_layout(map_style="open-street-map", margin={"l": 0, "r": 0, "t": 40, "b": 0})
+    return fig
+
+
+@instrument()
+def build_station_map_figure(
+    df: pd.DataFrame,
+    stations: Optional[StationIndex] = None,
+    by: Literal["start", "end"] = "start",
+):
+    """
+    Station usage map of trip rows. Trips are counted per station id first,
+    so the figure holds one point per station whatever the number of trips.
+
+    Returns None when no station coordinates are available.
+    """
+    if stations is None:
+        coords = load_station_coordinates()
+        if coords is None:
+            return None
+        stations = build_station_index(coords)
+    return plot_station_map(station_id_counts(df, by=by), stations, by=by)
+
+
+@instrument()
+def plot_duration_distribution(hist_df: pd.DataFrame):
+    """
+    Bar chart of a duration histogram frame with columns
+    bin_start, bin_end, trip_count (e.g. CubeSelection.duration_histogram()).
+    """
+    fig, ax = plt.subplots(figsize=(8, 4))
+    ax.bar(
+        hist_df["bin_start"],
+        hist_df["trip_count"],
+        width=hist_df["bin_end"] - hist_df["bin_start"],
+        align="edge",
+    )
+    ax.set_xlabel("Trip Duration (minutes)")
+    ax.set_ylabel("Number of Trips")
+    ax.set_title("Distribution of Trip Duration")
+    fig.tight_layout()
+    return fig
+
+
+@instrument()
+def plot_duration_histogram(df: pd.DataFrame, bins: int = 50):
+    if TRIP_DURATION_MIN_COL not in df.columns:
+        raise ValueError(f"{TRIP_DURATION_MIN_COL} not found. Run parse_and_enrich_datetime first.")
+
+    counts, edges = np.histogram(df[TRIP_DURATION_MIN_COL].dropna(), bins=bins)
+    hist_df = pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "trip_count": counts})
+    return plot_duration_distribution(hist_df)
+
+
+@instrument()
+def plot_monthly_trends(df: pd.DataFrame):
+    """Bar chart of trips per calendar month (start_month)."""
+    if START_MONTH_COL not in df.columns:
+        raise ValueError(f"{START_MONTH_COL} not found. Run parse_and_enrich_datetime first.")
+
+    monthly = df.groupby(START_MONTH_COL, observed=True).size()
+    fig, ax = plt.subplots(figsize=(8, 4))
+    ax.bar(monthly.index.astype(str), monthly.to_numpy())
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Number of Trips")
+    ax.set_title("Trips per Month")
+    fig.tight_layout()
+    return fig
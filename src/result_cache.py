@@ -0,0 +1,164 @@
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+# =======================================================================
+#                        BOUNDED RESULT CACHE
+# =======================================================================
+#
+# ResultCache keeps derived per-filter results (aggregated frames, metric
+# dictionaries, encoded images) shared by every session of a process. It
+# is bounded by an entry count and by a total byte size, evicting the
+# least recently used entries first, so its memory stays flat however many
+# users and filter states are served.
+#
+# Cached frames are handed out as shallow copies: with Copy-on-Write a
+# caller that modifies its copy gets private columns, and the cached value
+# other sessions read is never changed.
+#
+# get_or_compute() is single-flight: concurrent callers asking for the same
+# missing key wait for one computation instead of each running it.
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# "Not cached" marker, so that None can be cached like any other result
+_MISSING = object()
+
+
+def result_nbytes(value) -> int:
+    """Approximate memory footprint of a cached value."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(result_nbytes(k) + result_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(result_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _detached(value):
+    """A view of a cached value that callers may modify without affecting it."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, (dict, list)):
+        return value.copy()
+    return value
+
+
+class ResultCache:
+    """
+    Bounded, thread-safe LRU cache of computed results.
+
+    Example:
+        cache = ResultCache(max_bytes=32 * 1024 * 1024)
+        hourly = cache.get_or_compute(
+            ("hourly", signature, dataset_version),
+            selection.hourly_trip_counts,    # only called on a miss
+        )
+        cache.stats()   # {"hits": ..., "misses": ..., "evictions": ..., ...}
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be positive.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key: Hashable):
+        """Cached value for a key (marking it recently used), or _MISSING."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _detached(self._entries[key])
+
+    def get(self, key: Hashable, default=None) -> Optional[object]:
+        """Cached value for a key (marking it recently used), or `default`."""
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def put(self, key: Hashable, value) -> None:
+        """Store a value, evicting least recently used entries as needed."""
+        size = result_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                del self._entries[key]
+                self._bytes -= self._sizes.pop(key)
+            if size > self.max_bytes:
+                # Larger than the whole cache: never stored
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(evicted)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        """
+        Cached value for `key`, calling `compute()` (once) on a miss.
+
+        While one caller computes a key, other callers of the same key wait
+        for it and then read the stored value.
+        """
+
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            flight = self._pending.setdefault(key, threading.Lock())
+        with flight:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return _detached(self._entries[key])
+            try:
+                value = compute()
+                self.put(key, value)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+        return _detached(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Hit / miss / eviction counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
@@ -0,0 +1,186 @@
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# =======================================================================
+#                          TRIP FRAME SCHEMA
+# =======================================================================
+#
+# Declared dtypes for the raw and cleaned trip frames. Column names are
+# spelled out here (rather than imported) so that both data_loading and
+# data_cleaning can depend on this module without import cycles.
+
+WEEKDAY_CATEGORIES = [
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday",
+]
+MONTH_CATEGORIES = [
+    "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December",
+]
+
+WEEKDAY_DTYPE = pd.CategoricalDtype(WEEKDAY_CATEGORIES, ordered=True)
+MONTH_DTYPE = pd.CategoricalDtype(MONTH_CATEGORIES, ordered=True)
+
+# Low-cardinality string columns, parsed straight into categoricals by read_csv
+CATEGORY_COLUMNS = [
+    "Start Station Name",
+    "End Station Name",
+    "User Type",
+    "Model",
+]
+
+# Integer columns and their compact dtype. Columns holding missing values
+# cannot use a numpy integer dtype and are left as read.
+INTEGER_COLUMNS: Dict[str, str] = {
+    "Trip Id": "int32",
+    "Trip  Duration": "int32",
+    "Start Station Id": "int32",
+    "End Station Id": "int32",
+    "Bike Id": "int32",
+    "start_hour": "int16",
+}
+
+# Dtypes of the derived feature columns
+FEATURE_DTYPES = {
+    "trip_date": "datetime64[s]",
+    "start_weekday": WEEKDAY_DTYPE,
+    "start_month": MONTH_DTYPE,
+    "trip_duration_min": "float32",
+}
+
+# dtype argument for pd.read_csv when loading a raw trip CSV
+RAW_READ_DTYPES = {col: "category" for col in CATEGORY_COLUMNS}
+
+
+def _fits(values: pd.Series, dtype: str) -> bool:
+    """True if `values` has no missing values and fits in the integer dtype."""
+    if values.isna().any():
+        return False
+    if values.empty:
+        return True
+    info = np.iinfo(dtype)
+    return info.min <= values.min() and values.max() <= info.max
+
+
+def apply_trip_schema(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+    """
+    Convert the columns of a raw or cleaned trip frame to the declared schema.
+
+    - station names, User Type, Model → category
+    - ids and durations (seconds)     → int32
+    - start_hour                      → int16
+    - trip_date                       → datetime64 at day resolution
+    - start_weekday / start_month     → ordered categoricals
+    - trip_duration_min               → float32
+
+    Columns that are absent are skipped, and columns already stored with the
+    target dtype are left untouched, so the function is cheap to call twice.
+    Integer columns containing missing values (or values out of range) keep
+    their original dtype.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+         Raw or cleaned trip frame.
+    copy : bool
+         If False, converted columns replace the columns of `df` itself.
+
+    Returns:
+        The frame with converted columns.
+    """
+
+    converted = {}
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            converted[col] = df[col].astype("category")
+
+    for col, dtype in INTEGER_COLUMNS.items():
+        if col in df.columns and df[col].dtype != dtype and _fits(df[col], dtype):
+            converted[col] = df[col].astype(dtype)
+
+    for col, dtype in FEATURE_DTYPES.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if col == "trip_date":
+            converted[col] = pd.to_datetime(df[col]).dt.floor("D").astype(dtype)
+        else:
+            converted[col] = df[col].astype(dtype)
+
+    if not converted:
+        return df
+    if copy:
+        return df.assign(**converted)
+    for col, values in converted.items():
+        df[col] = values
+    return df
+
+
+def concat_trip_frames(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate trip frames while keeping categorical columns categorical.
+
+    pd.concat falls back to object dtype when chunks carry different
+    categories (as separately loaded CSV chunks do); here the categories are
+    unioned instead, so the result keeps the compact schema.
+    """
+
+    frames = list(frames)
+    if not frames:
+        return pd.DataFrame()
+
+    categorical = [
+        col for col in frames[0].columns
+        if all(isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames)
+    ]
+    result = pd.concat(frames, ignore_index=True)
+    for col in categorical:
+        dtypes = {f[col].dtype for f in frames}
+        if len(dtypes) > 1:
+            result[col] = union_categoricals(
+                [f[col] for f in frames], sort_categories=True, ignore_order=True
+            )
+    return result
+
+
+def memory_usage_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compare per-column memory usage of two versions of the same trip frame.
+
+    Returns columns:
+                    - column
+                    - dtype_before / dtype_after
+                    - bytes_before / bytes_after
+                    - ratio (bytes_before / bytes_after)
+
+    A final "TOTAL" row sums every column. Object columns are measured deeply
+    (including the Python string / date objects they point to).
+    """
+
+    rows: List[dict] = []
+    for col in before.columns:
+        if col not in after.columns:
+            continue
+        rows.append(
+            {
+                "column": col,
+                "dtype_before": str(before[col].dtype),
+                "dtype_after": str(after[col].dtype),
+                "bytes_before": int(before[col].memory_usage(index=False, deep=True)),
+                "bytes_after": int(after[col].memory_usage(index=False, deep=True)),
+            }
+        )
+
+    report = pd.DataFrame(rows)
+    total = {
+        "column": "TOTAL",
+        "dtype_before": "",
+        "dtype_after": "",
+        "bytes_before": int(report["bytes_before"].sum()),
+        "bytes_after": int(report["bytes_after"].sum()),
+    }
+    report = pd.concat([report, pd.DataFrame([total])], ignore_index=True)
+    report["ratio"] = report["bytes_before"] / report["bytes_after"].replace(0, np.nan)
+    return report
@@ -0,0 +1,110 @@
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from .cache import DEFAULT_CACHE_DIR, cache_key, load_clean_data
+from .data_loading import DEFAULT_TRIP_CSV
+
+# =======================================================================
+#                     SHARED READ-ONLY DATASET HANDLE
+# =======================================================================
+#
+# One SharedDataset per source file and process: the cleaned column store
+# is opened once (memory-mapped, read-only, see cache.open_column_store)
+# and every caller, in every session, gets a shallow view of that frame.
+# Nothing is pickled or copied per session or rerun.
+#
+# Mutation is contained on two levels:
+#   - the column arrays are read-only memory maps, so writing into them
+#     raises instead of changing the shared pages;
+#   - each view() is a separate frame object under Copy-on-Write, so
+#     adding, replacing or editing columns in a view copies only what is
+#     touched, into that view.
+
+
+class SharedDataset:
+    """
+    Process-wide, read-only handle on the cleaned trip dataset.
+
+    Example:
+        dataset = shared_dataset()
+        df = dataset.view()      # cheap, safe to modify locally
+        dataset.version          # cache key of the loaded data
+    """
+
+    def __init__(self, csv_path: Optional[str] = None, cache_dir: Optional[str] = None):
+        self.csv_path = Path(csv_path) if csv_path is not None else DEFAULT_TRIP_CSV
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self._frame: Optional[pd.DataFrame] = None
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> pd.DataFrame:
+        frame = self._frame
+        if frame is None:
+            with self._lock:
+                frame = self._frame
+                if frame is None:
+                    version = cache_key(self.csv_path) if self.csv_path.exists() else None
+                    frame = load_clean_data(str(self.csv_path), str(self.cache_dir), shared=True)
+                    self._version = version
+                    self._frame = frame
+        return frame
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._frame is not None
+
+    @property
+    def version(self) -> str:
+        """Cache key of the loaded dataset (loads it if needed)."""
+        self._load()
+        return self._version
+
+    def view(self) -> pd.DataFrame:
+        """A shallow, independently modifiable view of the shared frame."""
+        return self._load().copy(deep=False)
+
+    def is_stale(self) -> bool:
+        """True if the source CSV changed since the dataset was loaded."""
+        return self.is_loaded and cache_key(self.csv_path) != self._version
+
+
+_DATASETS: Dict[Tuple[Path, Path], SharedDataset] = {}
+_DATASETS_LOCK = threading.Lock()
+
+
+def shared_dataset(
+    csv_path: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    refresh_if_stale: bool = False,
+) -> SharedDataset:
+    """
+    The process-wide SharedDataset of a source CSV.
+
+    Parameters
+    ----------
+    csv_path, cache_dir : str or None
+            As for cache.load_clean_data().
+    refresh_if_stale : bool
+            If True and the CSV changed since it was loaded, replace the
+            handle with a fresh one. Views of the old handle stay valid.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the CSV file does not exist (on first load).
+    """
+
+    path = Path(csv_path) if csv_path is not None else DEFAULT_TRIP_CSV
+    root = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+    key = (path.resolve(), root.resolve())
+    with _DATASETS_LOCK:
+        dataset = _DATASETS.get(key)
+        if dataset is None or (refresh_if_stale and dataset.is_stale()):
+            dataset = SharedDataset(str(path), str(root))
+            _DATASETS[key] = dataset
+    return dataset
@@ -0,0 +1,300 @@
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# =======================================================================
+#                      MERGEABLE DURATION SKETCH
+# =======================================================================
+#
+# DurationSketch is a fixed log-bucket histogram (the bucket layout of
+# DDSketch, over a fixed value range). Bucket i >= 1 covers
+#     (min_value * gamma**(i-1), min_value * gamma**i]
+# with gamma = (1 + a) / (1 - a), and reports 2 * min_value * gamma**i /
+# (gamma + 1) for every value it holds. Error bound:
+#   - values in (min_value, max_value]: relative error at most a
+#     (`relative_accuracy`) on every returned quantile
+#   - values in [0, min_value]: reported as min_value / 2, so absolute
+#     error at most min_value / 2
+#   - values above max_value: clamped into the last bucket
+# count, sum, min and max are tracked exactly.
+#
+# Because the bucket layout depends only on the parameters, two sketches
+# merge by adding their count arrays: the result is identical to sketching
+# the combined data. That makes the sketch usable per chunk, per partition
+# (process pool) and per filter slice (cube cells).
+
+# Defaults for trip durations in minutes: 1 second to 7 days at 1% accuracy
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MIN_MINUTES = 1.0 / 60.0
+DEFAULT_MAX_MINUTES = 7 * 24 * 60.0
+
+
+class DurationSketch:
+    """
+    Mergeable quantile sketch for non-negative values (trip durations).
+
+    Example:
+        sketch = DurationSketch()
+        for chunk in chunks:
+            sketch.add(chunk["trip_duration_min"])
+        sketch.quantile(0.5)      # within 1% of the exact median
+        sketch.summary()          # same keys as trip_duration_summary()
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        min_value: float = DEFAULT_MIN_MINUTES,
+        max_value: float = DEFAULT_MAX_MINUTES,
+    ):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1.")
+        if not 0 < min_value < max_value:
+            raise ValueError("Expected 0 < min_value < max_value.")
+
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        n_buckets = 2 + int(np.ceil(np.log(max_value / min_value) / self._log_gamma))
+
+        self.counts = np.zeros(n_buckets, dtype=np.int64)
+        self.count = 0
+        self.sum = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    # ------------------------------------------------------------------
+    # Bucket layout
+    # ------------------------------------------------------------------
+
+    @property
+    def n_buckets(self) -> int:
+        return len(self.counts)
+
+    @property
+    def params(self) -> tuple:
+        return (self.relative_accuracy, self.min_value, self.max_value)
+
+    def bucket_index(self, values) -> np.ndarray:
+        """Bucket of each value (NaN values must be removed beforehand)."""
+        values = np.asarray(values, dtype=np.float64)
+        index = np.zeros(len(values), dtype=np.intp)
+        above = values > self.min_value
+        index[above] = np.ceil(
+            np.log(values[above] / self.min_value) / self._log_gamma
+        ).astype(np.intp)
+        return np.minimum(index, self.n_buckets - 1)
+
+    def bucket_edges(self) -> np.ndarray:
+        """Bucket boundaries: [0, min_value, min_value*gamma, ...]."""
+        upper = self.min_value * self.gamma ** np.arange(self.n_buckets)
+        return np.concatenate([[0.0], upper])
+
+    def bucket_values(self) -> np.ndarray:
+        """Value reported for each bucket."""
+        values = 2 * self.min_value * self.gamma ** np.arange(self.n_buckets) / (self.gamma + 1)
+        values[0] = self.min_value / 2
+        return values
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def add(self, values) -> "DurationSketch":
+        """Add values (NaN values are ignored). Returns self."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        if values.min() < 0:
+            raise ValueError("DurationSketch only accepts non-negative values.")
+
+        self.counts += np.bincount(self.bucket_index(values), minlength=self.n_buckets)
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def merge(self, other: "DurationSketch") -> "DurationSketch":
+        """Add another sketch with the same parameters into this one. Returns self."""
+        if other.params != self.params:
+            raise ValueError("Cannot merge sketches with different parameters.")
+        self.counts += other.counts
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self) -> "DurationSketch":
+        clone = DurationSketch(*self.params)
+        return clone.merge(self)
+
+    @classmethod
+    def from_counts(
+        cls,
+        counts: np.ndarray,
+        total: float,
+        min_value: float,
+        max_value: float,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        range_min: float = DEFAULT_MIN_MINUTES,
+        range_max: float = DEFAULT_MAX_MINUTES,
+    ) -> "DurationSketch":
+        """
+        Rebuild a sketch from stored bucket counts (e.g. a sum of cube cells)
+        plus the exact sum / min / max of the same values.
+        """
+        sketch = cls(relative_accuracy, range_min, range_max)
+        if len(counts) != sketch.n_buckets:
+            raise ValueError("Bucket counts do not match the sketch parameters.")
+        sketch.counts = np.asarray(counts, dtype=np.int64).copy()
+        sketch.count = int(sketch.counts.sum())
+        sketch.sum = float(total)
+        sketch.min = float(min_value)
+        sketch.max = float(max_value)
+        return sketch
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _value_at_rank(self, cum: np.ndarray, values: np.ndarray, rank: int) -> float:
+        value = values[int(np.searchsorted(cum, rank, side="right"))]
+        # The exact extremes are known; never report beyond them
+        return min(max(value, self.min), self.max)
+
+    def quantile(self, q: float) -> float:
+        """
+        Approximate q-quantile, interpolated like Series.quantile().
+
+        Raises:
+            ValueError: If the sketch is empty or q is outside [0, 1].
+        """
+        if self.count == 0:
+            raise ValueError("Cannot compute a quantile of an empty sketch.")
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1.")
+
+        cum = np.cumsum(self.counts)
+        values = self.bucket_values()
+        position = q * (self.count - 1)
+        lower = int(position)
+        upper = min(lower + 1, self.count - 1)
+        v_lower = self._value_at_rank(cum, values, lower)
+        v_upper = self._value_at_rank(cum, values, upper)
+        return float(v_lower + (v_upper - v_lower) * (position - lower))
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        return [self.quantile(q) for q in qs]
+
+    def summary(self, quantiles: Optional[Iterable[float]] = None) -> Dict[str, float]:
+        """
+        Same keys as analytics.trip_duration_summary(): mean, min and max are
+        exact, median and qNN come from the buckets. Empty sketches give {}.
+        """
+        if quantiles is None:
+            quantiles = [0.25, 0.5, 0.75]
+        if self.count == 0:
+            return {}
+
+        result: Dict[str, float] = {
+            "mean": self.sum / self.count,
+            "median": self.quantile(0.5),
+            "min": float(self.min),
+            "max": float(self.max),
+        }
+        for q in quantiles:
+            result[f"q{int(q*100)}"] = self.quantile(q)
+        return result
+
+
+# =======================================================================
+#                       MERGEABLE HEAVY HITTERS
+# =======================================================================
+#
+# HeavyHitters is a Misra-Gries summary (equivalent to Space-Saving) that
+# keeps at most `capacity` counters. Keys arrive as exact per-chunk counts;
+# whenever more than `capacity` keys are tracked, the (capacity+1)-th
+# largest counter is subtracted from every counter and non-positive ones
+# are dropped. Guarantees, for N = total count seen:
+#   - counters[key] <= true count <= counters[key] + error
+#   - error <= N / (capacity + 1); untracked keys have true count <= error
+# So every key with a true count above N / (capacity + 1) is tracked.
+# Summaries with the same capacity merge with the same guarantees, which
+# makes the summary usable per chunk and per partition.
+
+DEFAULT_HEAVY_HITTER_CAPACITY = 10_000
+
+
+class HeavyHitters:
+    """
+    Mergeable top-k frequency summary over arbitrary (hashable) keys.
+
+    Example:
+        hitters = HeavyHitters(capacity=1000)
+        for chunk in chunks:
+            hitters.add(chunk["Start Station Name"])
+        hitters.counters.nlargest(10)   # lower bounds of the top-10 counts
+        hitters.error                   # maximum undercount of any key
+    """
+
+    def __init__(self, capacity: int = DEFAULT_HEAVY_HITTER_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        self.capacity = capacity
+        self.counters = pd.Series(dtype=np.int64)
+        self.total = 0
+        self.error = 0
+
+    def add(self, keys) -> "HeavyHitters":
+        """Count keys (missing keys are ignored). Returns self."""
+        return self.add_counts(pd.Series(keys).value_counts(sort=False))
+
+    def add_counts(self, counts: pd.Series) -> "HeavyHitters":
+        """Add exact counts indexed by key (e.g. one chunk). Returns self."""
+        counts = counts[counts > 0].astype(np.int64)
+        if counts.empty:
+            return self
+        if self.counters.empty:
+            merged = counts.copy()
+        else:
+            merged = pd.concat([self.counters, counts])
+            merged = merged.groupby(level=list(range(merged.index.nlevels))).sum()
+        self.counters = merged
+        self.total += int(counts.sum())
+        self._prune()
+        return self
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        """Add another summary with the same capacity into this one. Returns self."""
+        if other.capacity != self.capacity:
+            raise ValueError("Cannot merge heavy hitters with different capacities.")
+        total = self.total + other.total
+        self.add_counts(other.counters)
+        # Mass already pruned from `other` still counts towards N and the error
+        self.total = total
+        self.error += other.error
+        return self
+
+    def copy(self) -> "HeavyHitters":
+        clone = HeavyHitters(self.capacity)
+        clone.counters = self.counters.copy()
+        clone.total = self.total
+        clone.error = self.error
+        return clone
+
+    def _prune(self) -> None:
+        if len(self.counters) <= self.capacity:
+            return
+        values = self.counters.to_numpy()
+        k = len(values) - self.capacity - 1
+        threshold = int(np.partition(values, k)[k])
+        kept = self.counters[values > threshold] - threshold
+        self.counters = kept
+        self.error += threshold
@@ -0,0 +1,414 @@
+
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Literal, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .analytics import period_from_daily_counts, weekly_from_daily_counts
+from .data_cleaning import TRIP_DATE_COL, START_HOUR_COL, TRIP_DURATION_MIN_COL
+from .instrumentation import instrument
+
+# =======================================================================
+#                        SQLITE QUERY BACKEND
+# =======================================================================
+#
+# For trip sets larger than RAM, build_trip_database() bulk-loads cleaned
+# trips into one SQLite table (batched executemany inside a single
+# transaction) and indexes the filter and grouping columns. A filter state
+# then becomes a WHERE clause, and every query method pushes both the
+# filter and its aggregation (GROUP BY / COUNT / AVG / ORDER BY ... LIMIT)
+# down to SQLite, so only the aggregated rows reach pandas.
+#
+# TripDatabase.select() mirrors TripCube.select(): its query methods take
+# the same arguments and return the same frames as the analytics.py
+# functions on the filtered trips.
+#
+# Trip dates are stored as day numbers (days since 1970-01-01), so the
+# date filter is an integer range scan on the trip_date index.
+
+TRIPS_TABLE = "trips"
+
+# Trip frame column → SQL column (name, type)
+SQL_COLUMNS = {
+    "Trip Id": ("trip_id", "INTEGER"),
+    TRIP_DATE_COL: ("trip_date", "INTEGER"),
+    START_HOUR_COL: ("start_hour", "INTEGER"),
+    "Start Station Id": ("start_station_id", "INTEGER"),
+    "End Station Id": ("end_station_id", "INTEGER"),
+    "Start Station Name": ("start_station_name", "TEXT"),
+    "End Station Name": ("end_station_name", "TEXT"),
+    "User Type": ("user_type", "TEXT"),
+    "Model": ("model", "TEXT"),
+    TRIP_DURATION_MIN_COL: ("trip_duration_min", "REAL"),
+}
+
+INDEXED_COLUMNS = (
+    "trip_date",
+    "start_hour",
+    "start_station_id",
+    "end_station_id",
+    "user_type",
+    "model",
+)
+
+DEFAULT_BATCH_ROWS = 100_000
+
+_STATION_COLUMNS = {
+    "start": ("start_station_name", "start_station_id"),
+    "end": ("end_station_name", "end_station_id"),
+}
+
+
+def _station_columns(by: str) -> Tuple[str, str]:
+    if by not in _STATION_COLUMNS:
+        raise ValueError("Parameter 'by' must be 'start' or 'end'.")
+    return _STATION_COLUMNS[by]
+
+
+def _day_number(value) -> int:
+    """Days since the epoch of a date-like value."""
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+def _column_values(df: pd.DataFrame, col: str) -> list:
+    """One column as a list of Python values (None for missing), in its SQL form."""
+    series = df[col]
+    if col == TRIP_DATE_COL:
+        days = series.to_numpy().astype("datetime64[D]")
+        values = days.view(np.int64).astype(object)
+        values[np.isnat(days)] = None
+        return values.tolist()
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf":
+        # tolist() yields Python ints / floats; sqlite3 stores NaN as NULL
+        return series.to_numpy().tolist()
+    values = series.to_numpy(dtype=object)
+    values[pd.isna(values)] = None
+    return values.tolist()
+
+
+def _insert_rows(df: pd.DataFrame) -> Iterable[tuple]:
+    """Rows of `df` in SQL_COLUMNS order (missing columns become NULL)."""
+    columns = []
+    for col in SQL_COLUMNS:
+        if col in df.columns:
+            columns.append(_column_values(df, col))
+        else:
+            columns.append([None] * len(df))
+    return zip(*columns)
+
+
+class TripDatabase:
+    """
+    A SQLite file holding cleaned trips (see build_trip_database).
+
+    Example:
+        db = build_trip_database(clean_df, "trips.sqlite")
+        db.select(start_date="2024-08-01", user_types=["Annual Member"]).hourly_trip_counts()
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._create_table()
+
+    def _create_table(self) -> None:
+        columns = ", ".join(f"{name} {sql_type}" for name, sql_type in SQL_COLUMNS.values())
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {TRIPS_TABLE} ({columns})")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "TripDatabase":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute(f"SELECT COUNT(*) FROM {TRIPS_TABLE}").fetchone()[0]
+
+    @instrument(stage="sql_backend.append")
+    def append(
+        self,
+        frames: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        rebuild_indexes: bool = False,
+    ) -> int:
+        """
+        Insert cleaned trip frames (one frame or an iterable of chunks).
+
+        All rows are inserted with executemany in batches of `batch_rows`
+        inside one transaction: either every row is stored or, on error,
+        none is (index changes included).
+
+        The first load inserts into an unindexed table and creates the
+        indexes afterwards. Later appends go into the indexed table, so
+        SQLite updates every index row by row. That is fine for small
+        appends; for appends comparable in size to the table, pass
+        rebuild_indexes=True to drop the indexes first and rebuild them
+        once after the insert.
+
+        Returns:
+            Number of rows inserted.
+        """
+
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+
+        placeholders = ", ".join("?" for _ in SQL_COLUMNS)
+        statement = f"INSERT INTO {TRIPS_TABLE} VALUES ({placeholders})"
+        inserted = 0
+        with self.connection:
+            # Explicit BEGIN, so index DDL is part of the transaction too
+            self.connection.execute("BEGIN")
+            if rebuild_indexes:
+                for column in INDEXED_COLUMNS:
+                    self.connection.execute(f"DROP INDEX IF EXISTS idx_{TRIPS_TABLE}_{column}")
+            for df in frames:
+                for lo in range(0, len(df), batch_rows):
+                    batch = df.iloc[lo:lo + batch_rows]
+                    self.connection.executemany(statement, _insert_rows(batch))
+                    inserted += len(batch)
+            for column in INDEXED_COLUMNS:
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{TRIPS_TABLE}_{column} ON {TRIPS_TABLE} ({column})"
+                )
+        self.connection.execute("ANALYZE")
+        return inserted
+
+    def date_range(self) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """First and last trip date, or (None, None) when empty."""
+        lo, hi = self.connection.execute(
+            f"SELECT MIN(trip_date), MAX(trip_date) FROM {TRIPS_TABLE}"
+        ).fetchone()
+        if lo is None:
+            return None, None
+        return _timestamp(lo), _timestamp(hi)
+
+    def categories(self, col: Literal["User Type", "Model"]) -> List[str]:
+        """Sorted distinct values of a filter column."""
+        name = SQL_COLUMNS[col][0]
+        rows = self.connection.execute(
+            f"SELECT DISTINCT {name} FROM {TRIPS_TABLE} WHERE {name} IS NOT NULL ORDER BY {name}"
+        )
+        return [value for (value,) in rows]
+
+    @instrument(stage="sql_backend.TripDatabase.select")
+    def select(
+        self,
+        start_date=None,
+        end_date=None,
+        user_types: Optional[Iterable[str]] = None,
+        models: Optional[Iterable[str]] = None,
+    ) -> "SQLSelection":
+        """
+        Restrict queries to a dashboard filter state.
+
+        Parameters
+        ----------
+        start_date, end_date : date-like or None
+                Inclusive trip date range. None means unbounded.
+        user_types, models : iterable of str or None
+                Selected categories. None selects every category; trips
+                with a missing value are only kept when None.
+
+        Returns
+        -------
+        selection : SQLSelection
+        """
+
+        clauses, params = [], []
+        if start_date is not None:
+            clauses.append("trip_date >= ?")
+            params.append(_day_number(start_date))
+        if end_date is not None:
+            clauses.append("trip_date <= ?")
+            params.append(_day_number(end_date))
+        for name, selected in (("user_type", user_types), ("model", models)):
+            if selected is None:
+                continue
+            selected = [str(value) for value in selected]
+            clauses.append(f"{name} IN ({', '.join('?' for _ in selected)})")
+            params.extend(selected)
+
+        where = " AND ".join(clauses) if clauses else "1"
+        return SQLSelection(self, where, tuple(params))
+
+
+def _timestamp(day: int) -> pd.Timestamp:
+    return pd.Timestamp(np.datetime64(int(day), "D"))
+
+
+@dataclass
+class SQLSelection:
+    """
+    A filtered view of a TripDatabase.
+
+    The query methods mirror analytics.py and return the same frames
+    (average durations may differ in the last bits, as SQLite sums in a
+    different order).
+    """
+
+    db: TripDatabase
+    where: str
+    params: tuple
+
+    def _query(self, select: str, group_by: Optional[str] = None, tail: str = "", extra: tuple = ()) -> list:
+        sql = f"SELECT {select} FROM {TRIPS_TABLE} WHERE {self.where}"
+        if group_by is not None:
+            sql += f" AND {group_by} IS NOT NULL GROUP BY {group_by}"
+        return self.db.connection.execute(sql + tail, self.params + extra).fetchall()
+
+    # ------------------------------------------------------------------
+    # Key metrics
+    # ------------------------------------------------------------------
+
+    def total_trips(self) -> int:
+        return self._query("COUNT(*)")[0][0]
+
+    def top_station(self, by: Literal["start", "end"] = "start") -> Optional[str]:
+        """Most used station name, or None for an empty selection."""
+        top = self.popular_stations(top_n=1, by=by)
+        return None if top.empty else top.iloc[0]["station_name"]
+
+    # ------------------------------------------------------------------
+    # Counterparts of the analytics functions
+    # ------------------------------------------------------------------
+
+    @instrument(stage="sql_backend.hourly_trip_counts")
+    def hourly_trip_counts(self) -> pd.DataFrame:
+        rows = self._query("start_hour, COUNT(*)", "start_hour", " ORDER BY start_hour")
+        hours, counts = _columns(rows, 2)
+        return pd.DataFrame(
+            {
+                START_HOUR_COL: np.asarray(hours, dtype=np.int16),
+                "trip_count": np.asarray(counts, dtype=np.int64),
+            }
+        )
+
+    @instrument(stage="sql_backend.daily_trip_counts")
+    def daily_trip_counts(self) -> pd.DataFrame:
+        rows = self._query("trip_date, COUNT(*)", "trip_date", " ORDER BY trip_date")
+        days, counts = _columns(rows, 2)
+        return pd.DataFrame(
+            {
+                TRIP_DATE_COL: np.asarray(days, dtype="datetime64[D]").astype("datetime64[s]"),
+                "trip_count": np.asarray(counts, dtype=np.int64),
+            }
+        )
+
+    def weekly_trip_counts(self) -> pd.DataFrame:
+        return weekly_from_daily_counts(self.daily_trip_counts())
+
+    def period_trip_counts(self, period: str = "week") -> pd.DataFrame:
+        return period_from_daily_counts(self.daily_trip_counts(), period)
+
+    @instrument(stage="sql_backend.popular_stations")
+    def popular_stations(
+        self,
+        top_n: int = 10,
+        by: Literal["start", "end"] = "start",
+    ) -> pd.DataFrame:
+        name, _ = _station_columns(by)
+        rows = []
+        if top_n > 0:
+            rows = self._query(
+                f"{name}, COUNT(*) AS trip_count",
+                name,
+                f" ORDER BY trip_count DESC, {name} LIMIT ?",
+                (int(top_n),),
+            )
+        names, counts = _columns(rows, 2)
+        return pd.DataFrame(
+            {
+                "station_name": pd.Series(names, dtype=str),
+                "trip_count": np.asarray(counts, dtype=np.int64),
+            }
+        )
+
+    @instrument(stage="sql_backend.station_id_counts")
+    def station_id_counts(self, by: Literal["start", "end"] = "start") -> pd.DataFrame:
+        _, station_id = _station_columns(by)
+        rows = self._query(f"{station_id}, COUNT(*)", station_id, f" ORDER BY {station_id}")
+        ids, counts = _columns(rows, 2)
+        return pd.DataFrame(
+            {
+                "station_id": np.asarray(ids, dtype=np.int64),
+                "trip_count": np.asarray(counts, dtype=np.int64),
+            }
+        )
+
+    @instrument(stage="sql_backend.user_type_summary")
+    def user_type_summary(self) -> pd.DataFrame:
+        rows = self._query(
+            "user_type, COUNT(trip_id), AVG(trip_duration_min)", "user_type", " ORDER BY user_type"
+        )
+        names, counts, means = _columns(rows, 3)
+        # Same construction as the pandas path: key order, then sorted by count
+        grouped = pd.DataFrame(
+            {
+                "User Type": pd.Series(names, dtype=str),
+                "trip_count": np.asarray(counts, dtype=np.int64),
+                "avg_duration_min": np.asarray([np.nan if m is None else m for m in means], dtype=np.float64),
+            }
+        )
+        return grouped.sort_values("trip_count", ascending=False)
+
+
+def _columns(rows: list, n: int) -> tuple:
+    """Transpose fetched rows into n column lists (empty lists for no rows)."""
+    if not rows:
+        return tuple([] for _ in range(n))
+    return tuple(list(col) for col in zip(*rows))
+
+
+@instrument()
+def build_trip_database(
+    frames: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    path: Union[str, Path],
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+) -> TripDatabase:
+    """
+    Bulk-load cleaned trips into a new SQLite file and index it.
+
+    Parameters
+    ----------
+    frames : DataFrame or iterable of DataFrames
+            Cleaned, enriched trips (e.g. clean_chunks() over
+            iter_raw_data_chunks(), so the trips never sit in memory at once).
+    path : str or Path
+            Database file. An existing file is replaced.
+    batch_rows : int
+            Rows per executemany call.
+
+    Raises:
+        ValueError: If a frame has not been through parse_and_enrich_datetime().
+            No database file is left behind on error.
+    """
+
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+
+    def checked(frames):
+        for df in frames:
+            for col in (TRIP_DATE_COL, START_HOUR_COL, TRIP_DURATION_MIN_COL):
+                if col not in df.columns:
+                    raise ValueError(f"{col} not found. Did you run parse_and_enrich_datetime()?")
+            yield df
+
+    path = Path(path)
+    if path.exists():
+        path.unlink()
+    db = TripDatabase(path)
+    try:
+        db.append(checked(frames), batch_rows=batch_rows)
+    except BaseException:
+        # Leave neither an open connection nor an empty database behind
+        db.close()
+        path.unlink(missing_ok=True)
+        raise
+    return db
@@ -0,0 +1,220 @@
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_loading import load_station_coordinates
+
+# =======================================================================
+#                        STATION SPATIAL INDEX
+# =======================================================================
+#
+# StationIndex holds the station coordinates as contiguous float64 arrays
+# (degrees), sorted by station id so trips join on integer ids with one
+# binary search. Stations are also bucketed into a uniform lat/lon grid:
+# a radius query only measures the stations in the grid cells overlapping
+# the query's bounding box, and nearest-station queries run radius queries
+# with a growing radius. Distances are great-circle (haversine) distances.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180.0
+
+# Grid cell size in degrees (~1.1 km north-south)
+DEFAULT_CELL_DEGREES = 0.01
+
+TRIP_DISTANCE_COL = "trip_distance_km"
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km between points given in degrees (vectorized)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+@dataclass
+class StationIndex:
+    """
+    Station coordinates plus a grid index (see build_station_index).
+
+    Attributes:
+        station_ids: station ids (sorted)
+        station_names: station name per id
+        lat, lon: coordinates in degrees (NaN when unknown)
+        cell_degrees: grid cell size
+        cell_keys: sorted grid cell key of every located station
+        cell_order: positions (into station_ids) in cell_keys order
+    """
+
+    station_ids: np.ndarray
+    station_names: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    cell_degrees: float
+    cell_keys: np.ndarray
+    cell_order: np.ndarray
+
+    @property
+    def n_located(self) -> int:
+        """Number of stations with known coordinates."""
+        return len(self.cell_order)
+
+    def positions(self, station_ids) -> np.ndarray:
+        """Index position of each station id (-1 if unknown)."""
+        ids = np.asarray(station_ids, dtype=np.float64)
+        known = ~np.isnan(ids)
+        pos = np.searchsorted(self.station_ids, np.where(known, ids, 0).astype(np.int64))
+        pos = np.minimum(pos, len(self.station_ids) - 1)
+        found = known & (len(self.station_ids) > 0)
+        found[found] = self.station_ids[pos[found]] == ids[found].astype(np.int64)
+        return np.where(found, pos, -1)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Positions of the located stations in the grid cells around a circle."""
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = dlat / max(np.cos(np.radians(min(abs(lat) + dlat, 89.0))), 1e-6)
+        rows = np.arange(_cell(lat - dlat, self.cell_degrees), _cell(lat + dlat, self.cell_degrees) + 1)
+        cols = np.arange(_cell(lon - dlon, self.cell_degrees), _cell(lon + dlon, self.cell_degrees) + 1)
+        if len(rows) * len(cols) >= self.n_located:
+            # The box covers more cells than there are stations: scan them all
+            return self.cell_order
+
+        keys = (rows[:, None] * _CELL_ROW + cols[None, :]).ravel()
+        lo = np.searchsorted(self.cell_keys, keys, side="left")
+        hi = np.searchsorted(self.cell_keys, keys, side="right")
+        hits = [self.cell_order[a:b] for a, b in zip(lo, hi) if b > a]
+        return np.concatenate(hits) if hits else np.array([], dtype=np.intp)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> pd.DataFrame:
+        """
+        Stations within `radius_km` of a point, nearest first.
+
+        Returns columns:
+                        - station_id (int), station_name (str)
+                        - distance_km (float)
+        """
+
+        pos = self._candidates(lat, lon, radius_km)
+        dist = haversine_km(lat, lon, self.lat[pos], self.lon[pos])
+        keep = dist <= radius_km
+        pos, dist = pos[keep], dist[keep]
+        order = np.lexsort((self.station_ids[pos], dist))
+        return self._frame(pos[order], dist[order])
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> pd.DataFrame:
+        """
+        The k stations nearest to a point (same columns as within()).
+
+        Runs radius queries from one grid cell outwards, doubling the
+        radius until k stations are found.
+        """
+
+        k = min(k, self.n_located)
+        if k <= 0:
+            return self._frame(np.array([], dtype=np.intp), np.array([]))
+
+        radius = self.cell_degrees * KM_PER_DEGREE
+        max_radius = np.pi * EARTH_RADIUS_KM
+        while True:
+            found = self.within(lat, lon, radius)
+            if len(found) >= k or radius >= max_radius:
+                return found.head(k).reset_index(drop=True)
+            radius *= 2
+
+    def _frame(self, pos: np.ndarray, dist: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "station_id": self.station_ids[pos],
+                "station_name": self.station_names[pos],
+                "distance_km": dist,
+            }
+        )
+
+    def trip_distances(self, start_ids, end_ids) -> np.ndarray:
+        """
+        Straight-line distance (km) between the start and end station of each
+        trip, joined on integer station ids. NaN when a station is unknown.
+        """
+
+        start = self.positions(start_ids)
+        end = self.positions(end_ids)
+        # Unknown stations read the trailing NaN slot
+        lat = np.append(self.lat, np.nan)
+        lon = np.append(self.lon, np.nan)
+        return haversine_km(lat[start], lon[start], lat[end], lon[end])
+
+
+# Cell keys pack (row, column) into one int64
+_CELL_ROW = 1 << 32
+
+
+def _cell(value, cell_degrees: float):
+    return np.floor(np.asarray(value) / cell_degrees).astype(np.int64)
+
+
+def build_station_index(
+    coords: Optional[pd.DataFrame] = None,
+    cell_degrees: float = DEFAULT_CELL_DEGREES,
+) -> StationIndex:
+    """
+    Build the spatial index of the station coordinates.
+
+    Parameters
+    ----------
+    coords : pandas.DataFrame or None
+             Output of load_station_coordinates(). Loaded from the default
+             file when None.
+    cell_degrees : float
+             Grid cell size in degrees.
+
+    Raises:
+        FileNotFoundError: If coords is None and no coordinates file exists.
+    """
+
+    if coords is None:
+        coords = load_station_coordinates()
+        if coords is None:
+            raise FileNotFoundError("Station coordinates file not found.")
+
+    coords = coords.drop_duplicates("station_id").sort_values("station_id")
+    lat = np.ascontiguousarray(coords["lat"].to_numpy(dtype=np.float64, na_value=np.nan))
+    lon = np.ascontiguousarray(coords["lon"].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    located = np.flatnonzero(~np.isnan(lat) & ~np.isnan(lon))
+    keys = _cell(lat[located], cell_degrees) * _CELL_ROW + _cell(lon[located], cell_degrees)
+    order = np.argsort(keys, kind="stable")
+
+    return StationIndex(
+        station_ids=coords["station_id"].to_numpy(dtype=np.int64),
+        station_names=coords["station_name"].to_numpy(dtype=object),
+        lat=lat,
+        lon=lon,
+        cell_degrees=cell_degrees,
+        cell_keys=keys[order],
+        cell_order=located[order],
+    )
+
+
+def add_trip_distance(df: pd.DataFrame, index: StationIndex, copy: bool = True) -> pd.DataFrame:
+    """
+    Add TRIP_DISTANCE_COL (float32 km between start and end station).
+
+    Parameters
+    ----------
+    copy : bool
+           If False, the column is added to `df` itself.
+    """
+
+    if copy:
+        df = df.copy()
+    distances = index.trip_distances(
+        df["Start Station Id"].to_numpy(dtype=np.float64, na_value=np.nan),
+        df["End Station Id"].to_numpy(dtype=np.float64, na_value=np.nan),
+    )
+    df[TRIP_DISTANCE_COL] = distances.astype(np.float32)
+    return df
@@ -0,0 +1,172 @@
+
+from pathlib import Path
+from typing import Iterator, Union
+
+import numpy as np
+import pandas as pd
+
+from .data_cleaning import DATETIME_FORMAT
+from .data_loading import EXPECTED_TRIP_COLUMNS
+
+# =======================================================================
+#                     SYNTHETIC TRIP GENERATOR
+# =======================================================================
+#
+# Deterministic raw trips shaped like the Toronto Bike Share export: the
+# EXPECTED_TRIP_COLUMNS fields, timestamps as "%m/%d/%Y %H:%M" strings and
+# a few invalid rows for the cleaning step to drop. Rows are generated in
+# chunks, each from its own generator seeded with (seed, chunk number), so
+# a given (n_rows, seed, chunk_rows) always yields the same trips and a
+# 10M-row CSV can be written without holding the whole frame in memory.
+#
+# Realism, roughly matching a summer month of the real data:
+# - ~850 stations with power-law popularity, ~7% round trips
+# - ~7,500 bikes, some ridden far more often than others
+# - two commuter peaks on weekdays, a midday hump on weekends
+# - log-normal durations (median ~12 min), ~75% annual members
+
+DEFAULT_STATIONS = 850
+DEFAULT_BIKES = 7_500
+FIRST_STATION_ID = 7000
+FIRST_TRIP_ID = 26_000_000
+DEFAULT_START = "2024-08-01"
+DEFAULT_DAYS = 31
+DEFAULT_GENERATOR_CHUNK = 1_000_000
+
+USER_TYPES = np.array(["Annual Member", "Casual Member"], dtype=object)
+USER_TYPE_SHARES = [0.75, 0.25]
+MODELS = np.array(["ICONIC", "EFIT", "EFIT G5"], dtype=object)
+MODEL_SHARES = [0.6, 0.3, 0.1]
+
+ROUND_TRIP_SHARE = 0.07
+# Share of rows with a missing End Time / User Type, and with a negative duration
+MISSING_SHARE = 0.001
+NEGATIVE_DURATION_SHARE = 0.0005
+
+# Relative trips per start hour (0..23)
+WEEKDAY_HOURS = np.array(
+    [4, 2, 1, 1, 1, 3, 10, 28, 45, 26, 18, 21, 26, 26, 25, 32, 48, 62, 46, 32, 24, 18, 13, 8],
+    dtype=np.float64,
+)
+WEEKEND_HOURS = np.array(
+    [9, 6, 4, 2, 1, 1, 3, 7, 14, 24, 33, 40, 44, 45, 45, 44, 42, 38, 32, 26, 20, 16, 13, 10],
+    dtype=np.float64,
+)
+
+
+def _popularity(rng: np.random.Generator, n: int, exponent: float) -> np.ndarray:
+    """Power-law weights assigned to n items in a random order."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return rng.permutation(weights / weights.sum())
+
+
+def _minute_weights(start: pd.Timestamp, days: int) -> np.ndarray:
+    """Probability of each minute of the period being a trip's start minute."""
+    weekdays = (start + pd.to_timedelta(np.arange(days), unit="D")).dayofweek
+    hourly = np.where((weekdays >= 5)[:, None], WEEKEND_HOURS, WEEKDAY_HOURS)
+    # Weekends carry ~85% of a weekday's trips
+    hourly = hourly / hourly.sum(axis=1, keepdims=True) * np.where(weekdays >= 5, 0.85, 1.0)[:, None]
+    minutes = np.repeat(hourly.ravel(), 60)
+    return minutes / minutes.sum()
+
+
+def iter_synthetic_trips(
+    n_rows: int,
+    seed: int = 0,
+    chunk_rows: int = DEFAULT_GENERATOR_CHUNK,
+    n_stations: int = DEFAULT_STATIONS,
+    n_bikes: int = DEFAULT_BIKES,
+    start: str = DEFAULT_START,
+    days: int = DEFAULT_DAYS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield raw synthetic trips (EXPECTED_TRIP_COLUMNS) in chunks of chunk_rows.
+
+    Station and bike popularity are drawn from `seed` alone, so every chunk
+    (and every dataset size) shares the same stations and bikes.
+    """
+
+    if n_rows < 0 or chunk_rows < 1:
+        raise ValueError("n_rows must be >= 0 and chunk_rows >= 1.")
+
+    setup = np.random.default_rng([seed, 0])
+    station_weights = _popularity(setup, n_stations, exponent=0.9)
+    bike_weights = _popularity(setup, n_bikes, exponent=0.3)
+    station_names = np.array([f"Station {i:04d}" for i in range(n_stations)], dtype=object)
+
+    period_start = pd.Timestamp(start)
+    minute_weights = _minute_weights(period_start, days)
+    # Every start minute plus up to a day of trip time, formatted once
+    stamps = period_start + pd.to_timedelta(np.arange((days + 1) * 24 * 60), unit="min")
+    labels = np.asarray(stamps.strftime(DATETIME_FORMAT), dtype=object)
+
+    for chunk, first in enumerate(range(0, n_rows, chunk_rows)):
+        rng = np.random.default_rng([seed, chunk + 1])
+        size = min(chunk_rows, n_rows - first)
+
+        start_minute = rng.choice(len(minute_weights), size=size, p=minute_weights)
+        durations = np.clip(rng.lognormal(np.log(720), 0.75, size), 60, 6 * 3600).astype(np.int64)
+        durations[rng.random(size) < NEGATIVE_DURATION_SHARE] *= -1
+        end_minute = start_minute + np.maximum(durations, 0) // 60
+
+        start_station = rng.choice(n_stations, size=size, p=station_weights)
+        end_station = rng.choice(n_stations, size=size, p=station_weights)
+        round_trip = rng.random(size) < ROUND_TRIP_SHARE
+        end_station[round_trip] = start_station[round_trip]
+
+        end_time = labels[end_minute]
+        end_time[rng.random(size) < MISSING_SHARE] = None
+        user_type = rng.choice(USER_TYPES, size=size, p=USER_TYPE_SHARES)
+        user_type[rng.random(size) < MISSING_SHARE] = None
+
+        frame = pd.DataFrame(
+            {
+                "Trip Id": FIRST_TRIP_ID + first + np.arange(size),
+                "Trip  Duration": durations,
+                "Start Station Id": FIRST_STATION_ID + start_station,
+                "Start Time": labels[start_minute],
+                "Start Station Name": station_names[start_station],
+                "End Station Id": FIRST_STATION_ID + end_station,
+                "End Time": end_time,
+                "End Station Name": station_names[end_station],
+                "Bike Id": 1 + rng.choice(n_bikes, size=size, p=bike_weights),
+                "User Type": user_type,
+                "Model": rng.choice(MODELS, size=size, p=MODEL_SHARES),
+            }
+        )
+        yield frame[EXPECTED_TRIP_COLUMNS]
+
+
+def generate_trips(n_rows: int, seed: int = 0, **kwargs) -> pd.DataFrame:
+    """
+    Raw synthetic trips as one DataFrame (see iter_synthetic_trips).
+
+    Example:
+        raw = generate_trips(100_000, seed=1)
+        df = full_clean_pipeline(raw)
+    """
+
+    chunks = list(iter_synthetic_trips(n_rows, seed=seed, **kwargs))
+    if not chunks:
+        return pd.DataFrame(columns=EXPECTED_TRIP_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def write_synthetic_csv(path: Union[str, Path], n_rows: int, seed: int = 0, **kwargs) -> Path:
+    """
+    Write synthetic trips to a CSV readable by load_raw_data(), chunk by chunk.
+
+    Returns:
+        The path written.
+    """
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as handle:
+        header = True
+        for chunk in iter_synthetic_trips(n_rows, seed=seed, **kwargs):
+            chunk.to_csv(handle, index=False, header=header)
+            header = False
+        if header:
+            pd.DataFrame(columns=EXPECTED_TRIP_COLUMNS).to_csv(handle, index=False)
+    return path
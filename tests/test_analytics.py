@@ -71,3 +71,107 @@ def test_popular_stations_start():
     assert top_start.iloc[0]["station_name"] in {"A", "B"}
     # We know each appears 2 times, so counts sum to 2
     assert top_start.iloc[0]["trip_count"] == 2
+
+
+def test_stream_trip_summary_matches_in_memory_functions():
+    from src.analytics import stream_trip_summary, user_type_summary, trip_duration_summary
+    from src.data_cleaning import full_clean_pipeline
+
+    raw = sample_enriched_df().drop(columns=[TRIP_DATE_COL, START_HOUR_COL])
+    raw["Start Time"] = raw["Start Time"].dt.strftime("%m/%d/%Y %H:%M")
+    df = full_clean_pipeline(raw)
+    chunks = [df.iloc[:1], df.iloc[1:3], df.iloc[3:]]
+
+    summary = stream_trip_summary(chunks, top_n=1)
+
+    pd.testing.assert_frame_equal(summary["hourly"], hourly_trip_counts(df))
+    pd.testing.assert_frame_equal(summary["daily"], daily_trip_counts(df))
+    pd.testing.assert_frame_equal(summary["weekly"], weekly_trip_counts(df))
+    pd.testing.assert_frame_equal(summary["popular_end"], popular_stations(df, top_n=1, by="end"))
+    pd.testing.assert_frame_equal(summary["user_type"], user_type_summary(df))
+    assert summary["duration"] == trip_duration_summary(df)
+
+
+def test_compute_aggregates_matches_individual_functions():
+    from src.analytics import compute_aggregates, user_type_summary, trip_duration_summary
+    from src.data_cleaning import full_clean_pipeline
+
+    raw = sample_enriched_df().drop(columns=[TRIP_DATE_COL, START_HOUR_COL])
+    raw["Start Time"] = raw["Start Time"].dt.strftime("%m/%d/%Y %H:%M")
+    df = full_clean_pipeline(raw)
+
+    result = compute_aggregates(df, top_n=1)
+
+    pd.testing.assert_frame_equal(result["hourly"], hourly_trip_counts(df))
+    pd.testing.assert_frame_equal(result["daily"], daily_trip_counts(df))
+    pd.testing.assert_frame_equal(result["weekly"], weekly_trip_counts(df))
+    pd.testing.assert_frame_equal(result["popular_start"], popular_stations(df, top_n=1))
+    pd.testing.assert_frame_equal(result["popular_end"], popular_stations(df, top_n=1, by="end"))
+    pd.testing.assert_frame_equal(result["user_type"], user_type_summary(df))
+    assert result["duration"] == trip_duration_summary(df)
+
+
+def test_compute_aggregates_only_returns_requested():
+    import pytest
+    from src.analytics import compute_aggregates
+
+    df = sample_enriched_df()
+    df["trip_duration_min"] = df["Trip  Duration"] / 60.0
+
+    result = compute_aggregates(df, ["hourly", "popular_start"])
+
+    assert set(result) == {"hourly", "popular_start"}
+    with pytest.raises(ValueError):
+        compute_aggregates(df, ["monthly"])
+
+
+def test_popular_stations_orders_ties_by_name():
+    df = pd.DataFrame({"Start Station Name": ["C", "B", "A", "C", "B", "D"]})
+
+    top = popular_stations(df, top_n=2)
+
+    assert top["station_name"].tolist() == ["B", "C"]
+    assert top["trip_count"].tolist() == [2, 2]
+
+
+def test_popular_od_exact_and_streaming():
+    from src.analytics import compute_aggregates, stream_trip_summary
+
+    df = sample_enriched_df()
+    df["trip_duration_min"] = df["Trip  Duration"] / 60.0
+    df["End Station Name"] = ["X", "X", "X", "Y"]
+
+    exact = compute_aggregates(df, ["popular_od"], top_n=2)["popular_od"]
+    assert exact.columns.tolist() == ["start_station", "end_station", "trip_count"]
+    assert exact.iloc[0].tolist() == ["A", "X", 2]
+
+    streamed = stream_trip_summary(
+        [df.iloc[:2], df.iloc[2:]], top_n=2, aggregates=["popular_od"], approximate=True, capacity=2
+    )["popular_od"]
+    assert streamed.iloc[0][["start_station", "end_station"]].tolist() == ["A", "X"]
+    both = streamed.merge(exact, on=["start_station", "end_station"], suffixes=("", "_exact"))
+    assert (both["trip_count"] <= both["trip_count_exact"]).all()
+    assert (both["trip_count_exact"] <= both["trip_count"] + both["max_error"]).all()
+
+    bounded = compute_aggregates(df, ["popular_od"], top_n=2, approximate=True, capacity=1)["popular_od"]
+    assert len(bounded) == 1
+    assert bounded.iloc[0][["start_station", "end_station"]].tolist() == ["A", "X"]
+
+
+def test_period_trip_counts_match_strftime_labels():
+    import pytest
+    from src.analytics import period_trip_counts
+
+    dates = pd.Series(pd.date_range("2020-12-25", "2022-01-05", freq="D"))
+    df = pd.DataFrame({TRIP_DATE_COL: dates.repeat(2).reset_index(drop=True)})
+
+    for period, fmt in (("week", "%G-W%V"), ("month", "%Y-%m")):
+        expected = df.groupby(df[TRIP_DATE_COL].dt.strftime(fmt)).size()
+        result = period_trip_counts(df, period)
+        assert result[f"{period}_label"].tolist() == expected.index.tolist()
+        assert result["trip_count"].tolist() == expected.tolist()
+
+    quarters = period_trip_counts(df, "quarter")
+    assert quarters["quarter_label"].tolist() == ["2020-Q4", "2021-Q1", "2021-Q2", "2021-Q3", "2021-Q4", "2022-Q1"]
+    with pytest.raises(ValueError):
+        period_trip_counts(df, "fortnight")
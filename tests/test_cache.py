@@ -0,0 +1,207 @@
+import os
+import sys
+
+import datetime
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import cache
+from src.cache import (
+    export_column_store,
+    load_clean_data,
+    open_column_store,
+    read_column_store,
+    write_column_store,
+)
+from src.data_cleaning import full_clean_pipeline
+from src.data_loading import load_raw_data
+
+
+def write_sample_csv(path, n_extra=0):
+    data = {
+        "Trip Id": [1, 2, 3, 4 + n_extra],
+        "Trip  Duration": [600, -10, 300, 120],
+        "Start Station Id": [111, 222, 333, 111],
+        "Start Time": ["08/01/2024 10:00", "08/01/2024 11:00", None, "08/02/2024 07:30"],
+        "Start Station Name": ["A", "B", "C", "A"],
+        "End Station Id": [444, 555, 666, 444],
+        "End Time": ["08/01/2024 10:10", "08/01/2024 11:05", "08/01/2024 11:10", "08/02/2024 07:32"],
+        "End Station Name": ["D", "E", "F", None],
+        "Bike Id": [1, 2, 3, 1],
+        "User Type": ["Casual Member", "Member", None, "Annual Member"],
+        "Model": ["ICONIC", "ICONIC", "ICONIC", "EFIT"],
+    }
+    pd.DataFrame(data).to_csv(path, index=False)
+
+
+def test_column_store_round_trip(tmp_path):
+    csv_path = tmp_path / "trips.csv"
+    write_sample_csv(csv_path)
+    df = full_clean_pipeline(load_raw_data(str(csv_path)))
+
+    write_column_store(df, tmp_path / "store")
+    restored = read_column_store(tmp_path / "store")
+
+    pd.testing.assert_frame_equal(restored, df)
+
+
+def test_failed_export_leaves_no_temporary_directory(tmp_path, monkeypatch):
+    csv_path = tmp_path / "trips.csv"
+    write_sample_csv(csv_path)
+    df = full_clean_pipeline(load_raw_data(str(csv_path)))
+    export_column_store(df, tmp_path / "store")
+
+    def disk_full(frame, directory):
+        directory.mkdir(parents=True)
+        (directory / "c000.npy").write_bytes(b"partial")
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(cache, "write_column_store", disk_full)
+    with pytest.raises(OSError):
+        export_column_store(df, tmp_path / "store")
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["store", "trips.csv"]
+    pd.testing.assert_frame_equal(read_column_store(tmp_path / "store"), df)
+
+
+def test_open_column_store_is_zero_copy_and_read_only(tmp_path):
+    csv_path = tmp_path / "trips.csv"
+    write_sample_csv(csv_path)
+    df = full_clean_pipeline(load_raw_data(str(csv_path)))
+    export_column_store(df, tmp_path / "store")
+
+    shared = open_column_store(tmp_path / "store")
+    pd.testing.assert_frame_equal(shared, df)
+
+    hours = shared["start_hour"].to_numpy()
+    # A view of the read-only file mapping, not a private copy
+    assert not hours.flags.owndata
+    assert not hours.flags.writeable
+    with pytest.raises(ValueError):
+        shared.loc[0, "start_hour"] = 3
+
+
+def test_open_column_store_keeps_strings_dictionary_encoded(tmp_path):
+    df = pd.DataFrame(
+        {
+            "name": pd.Series(["a", None, "b", "a"], dtype=object),
+            "day": [datetime.date(2024, 8, 1), None, datetime.date(2024, 8, 2), datetime.date(2024, 8, 1)],
+            "n": [1, 2, 3, 4],
+        }
+    )
+    export_column_store(df, tmp_path / "store")
+
+    shared = open_column_store(tmp_path / "store")
+    assert isinstance(shared["name"].dtype, pd.CategoricalDtype)
+    assert shared["name"].astype(object).where(shared["name"].notna(), None).tolist() == ["a", None, "b", "a"]
+    assert shared["day"].cat.categories.tolist() == [pd.Timestamp("2024-08-01"), pd.Timestamp("2024-08-02")]
+    assert shared["n"].tolist() == [1, 2, 3, 4]
+
+
+def test_load_clean_data_shared(tmp_path):
+    csv_path = tmp_path / "trips.csv"
+    write_sample_csv(csv_path)
+    cache_dir = str(tmp_path / "cache")
+
+    cold = load_clean_data(str(csv_path), cache_dir=cache_dir, shared=True)
+    warm = load_clean_data(str(csv_path), cache_dir=cache_dir, shared=True)
+    expected = full_clean_pipeline(load_raw_data(str(csv_path)))
+
+    pd.testing.assert_frame_equal(cold, expected)
+    pd.testing.assert_frame_equal(warm, expected)
+    assert not warm["trip_duration_min"].to_numpy().flags.writeable
+
+
+def test_load_clean_data_uses_cache_on_warm_start(tmp_path, monkeypatch):
+    csv_path = tmp_path / "trips.csv"
+    write_sample_csv(csv_path)
+
+    cold = load_clean_data(str(csv_path), cache_dir=str(tmp_path / "cache"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("pipeline should not run on a warm start")
+
+    monkeypatch.setattr(cache, "full_clean_pipeline", fail)
+    warm = load_clean_data(str(csv_path), cache_dir=str(tmp_path / "cache"))
+
+    pd.testing.assert_frame_equal(warm, cold)
+
+
+def test_load_clean_data_rebuilds_when_source_changes(tmp_path):
+    csv_path = tmp_path / "trips.csv"
+    cache_dir = tmp_path / "cache"
+    write_sample_csv(csv_path)
+    first = load_clean_data(str(csv_path), cache_dir=str(cache_dir))
+
+    write_sample_csv(csv_path, n_extra=100)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    second = load_clean_data(str(csv_path), cache_dir=str(cache_dir))
+
+    assert first["Trip Id"].max() == 4
+    assert second["Trip Id"].max() == 104
+    # Stale entries for the same source are removed
+    assert len([p for p in cache_dir.iterdir() if p.is_dir()]) == 1
+
+
+def test_load_clean_data_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_clean_data(str(tmp_path / "missing.csv"), cache_dir=str(tmp_path / "cache"))
+
+
+def _export_and_open(args):
+    directory, replace = args
+    # Like a cache entry: every process publishes the same content
+    df = pd.DataFrame({"x": range(1_000)})
+    for _ in range(5):
+        export_column_store(df, directory, replace=replace)
+        assert len(open_column_store(directory)) == 1_000
+    return True
+
+
+def _cold_start(args):
+    csv_path, cache_dir = args
+    return len(load_clean_data(csv_path, cache_dir, shared=True))
+
+
+@pytest.mark.parametrize("replace", [False, True])
+def test_concurrent_exports_never_hide_the_store(tmp_path, replace):
+    directory = tmp_path / "store"
+    jobs = [(directory, replace)] * 4
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        assert all(pool.map(_export_and_open, jobs))
+    # No temporary or retired directories are left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["store"]
+
+
+def test_export_keeps_or_replaces_a_published_store(tmp_path):
+    export_column_store(pd.DataFrame({"x": [1]}), tmp_path / "store")
+    export_column_store(pd.DataFrame({"x": [2]}), tmp_path / "store")
+    assert read_column_store(tmp_path / "store")["x"].tolist() == [1]
+
+    export_column_store(pd.DataFrame({"x": [3]}), tmp_path / "store", replace=True)
+    assert read_column_store(tmp_path / "store")["x"].tolist() == [3]
+
+
+def test_concurrent_cold_starts_share_one_entry(tmp_path):
+    csv_path = tmp_path / "trips.csv"
+    write_sample_csv(csv_path)
+    jobs = [(str(csv_path), str(tmp_path / "cache"))] * 4
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        assert pool.map(_cold_start, jobs) == [2] * 4
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+
+def test_shared_load_falls_back_when_the_entry_vanishes(tmp_path, monkeypatch):
+    csv_path = tmp_path / "trips.csv"
+    write_sample_csv(csv_path)
+
+    def removed(directory):
+        raise FileNotFoundError(directory)
+
+    monkeypatch.setattr(cache, "open_column_store", removed)
+    df = load_clean_data(str(csv_path), str(tmp_path / "cache"), shared=True)
+    pd.testing.assert_frame_equal(df, full_clean_pipeline(load_raw_data(str(csv_path))))
@@ -0,0 +1,101 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import analytics
+from src.cube import DURATION_SKETCH_ACCURACY, build_trip_cube
+from src.data_cleaning import TRIP_DATE_COL, full_clean_pipeline
+
+
+def sample_clean_df():
+    data = {
+        "Trip Id": [1, 2, 3, 4, 5, 6],
+        "Trip  Duration": [300, 600, 900, 1200, 60, 2400],
+        "Start Station Id": [1, 1, 2, 2, 3, 1],
+        "Start Time": [
+            "08/01/2024 08:00",
+            "08/01/2024 09:00",
+            "08/02/2024 08:00",
+            "08/05/2024 09:00",
+            "08/05/2024 17:30",
+            "08/07/2024 23:10",
+        ],
+        "Start Station Name": ["A", "A", "B", "B", "C", "A"],
+        "End Station Id": [10, 10, 20, 20, 1, 2],
+        "End Time": [
+            "08/01/2024 08:05",
+            "08/01/2024 09:10",
+            "08/02/2024 08:15",
+            "08/05/2024 09:20",
+            "08/05/2024 17:31",
+            "08/07/2024 23:50",
+        ],
+        "End Station Name": ["X", "X", "Y", "Y", "A", "B"],
+        "Bike Id": [1, 2, 3, 4, 1, 2],
+        "User Type": ["Casual Member", "Annual Member", "Annual Member", "Casual Member",
+                      "Annual Member", "Annual Member"],
+        "Model": ["ICONIC", "ICONIC", "EFIT", "ICONIC", "EFIT", "ICONIC"],
+    }
+    return full_clean_pipeline(pd.DataFrame(data))
+
+
+def filter_rows(df, start_date, end_date, user_types, models):
+    return df[
+        (df[TRIP_DATE_COL] >= pd.Timestamp(start_date))
+        & (df[TRIP_DATE_COL] <= pd.Timestamp(end_date))
+        & (df["User Type"].isin(user_types))
+        & (df["Model"].isin(models))
+    ]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        ("2024-08-01", "2024-08-07", ["Casual Member", "Annual Member"], ["ICONIC", "EFIT"]),
+        ("2024-08-02", "2024-08-05", ["Annual Member"], ["EFIT", "ICONIC"]),
+        ("2024-07-01", "2024-08-01", ["Casual Member"], ["ICONIC"]),
+    ],
+)
+def test_cube_selection_matches_row_level_analytics(filters):
+    df = sample_clean_df()
+    cube = build_trip_cube(df)
+    rows = filter_rows(df, *filters)
+    sel = cube.select(*filters)
+
+    assert sel.total_trips() == len(rows)
+    pd.testing.assert_frame_equal(sel.hourly_trip_counts(), analytics.hourly_trip_counts(rows))
+    pd.testing.assert_frame_equal(sel.daily_trip_counts(), analytics.daily_trip_counts(rows))
+    pd.testing.assert_frame_equal(sel.weekly_trip_counts(), analytics.weekly_trip_counts(rows))
+    pd.testing.assert_frame_equal(
+        sel.period_trip_counts("month"), analytics.period_trip_counts(rows, "month")
+    )
+    pd.testing.assert_frame_equal(sel.popular_stations(top_n=2), analytics.popular_stations(rows, top_n=2))
+    pd.testing.assert_frame_equal(
+        sel.popular_stations(by="end"), analytics.popular_stations(rows, by="end")
+    )
+    pd.testing.assert_frame_equal(sel.user_type_summary(), analytics.user_type_summary(rows))
+    pd.testing.assert_frame_equal(sel.station_id_counts(), analytics.station_id_counts(rows))
+
+
+def test_cube_duration_summary_is_within_bucket_error():
+    df = sample_clean_df()
+    exact = analytics.trip_duration_summary(df)
+    approx = build_trip_cube(df).select().trip_duration_summary()
+
+    assert approx["mean"] == pytest.approx(exact["mean"])
+    assert approx["min"] == exact["min"] and approx["max"] == exact["max"]
+    tolerance = DURATION_SKETCH_ACCURACY
+    for key in ("q25", "median", "q75"):
+        assert approx[key] == pytest.approx(exact[key], rel=tolerance)
+
+
+def test_empty_selection():
+    sel = build_trip_cube(sample_clean_df()).select(user_types=[])
+
+    assert sel.total_trips() == 0
+    assert sel.top_station() is None
+    assert sel.trip_duration_summary() == {}
+    assert sel.hourly_trip_counts().empty
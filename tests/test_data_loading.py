@@ -78,3 +78,54 @@ def test_parse_and_enrich_datetime_adds_features():
     assert row[TRIP_DATE_COL].year == 2024
     assert row[START_HOUR_COL] == 10
     assert row[TRIP_DURATION_MIN_COL] == 600 / 60.0
+
+
+def test_iter_raw_data_chunks_streams_all_files(tmp_path):
+    from src.data_loading import iter_raw_data_chunks
+
+    sample_raw_df().to_csv(tmp_path / "a.csv", index=False)
+    sample_raw_df().to_csv(tmp_path / "b.csv", index=False)
+
+    chunks = list(iter_raw_data_chunks([tmp_path / "a.csv", tmp_path / "b.csv"], chunksize=2))
+
+    assert [len(c) for c in chunks] == [2, 1, 2, 1]
+    assert list(chunks[0].columns) == EXPECTED_TRIP_COLUMNS
+
+
+def test_iter_raw_data_chunks_validates_columns_up_front(tmp_path):
+    from src.data_loading import iter_raw_data_chunks
+
+    sample_raw_df().to_csv(tmp_path / "good.csv", index=False)
+    sample_raw_df().drop(columns=["Model"]).to_csv(tmp_path / "bad.csv", index=False)
+
+    with pytest.raises(ValueError):
+        next(iter_raw_data_chunks([tmp_path / "good.csv", tmp_path / "bad.csv"]))
+
+
+def test_clean_chunks_matches_full_pipeline():
+    from src.data_cleaning import clean_chunks, full_clean_pipeline
+    from src.schema import concat_trip_frames
+
+    df_raw = pd.concat([sample_raw_df()] * 3, ignore_index=True)
+    chunks = [df_raw.iloc[i:i + 2] for i in range(0, len(df_raw), 2)]
+
+    streamed = concat_trip_frames(clean_chunks(chunks))
+
+    pd.testing.assert_frame_equal(streamed, full_clean_pipeline(df_raw))
+
+
+def test_parse_and_enrich_datetime_derives_calendar_features():
+    from src.data_cleaning import parse_timestamps
+
+    df_raw = sample_raw_df()
+    df_raw["Start Time"] = ["08/01/2024 10:00", "12/31/2023 23:59", "08/01/2024 10:00"]
+    df_feat = parse_and_enrich_datetime(df_raw)
+
+    assert list(df_feat[START_HOUR_COL]) == [10, 23, 10]
+    assert list(df_feat[START_WEEKDAY_COL]) == ["Thursday", "Sunday", "Thursday"]
+    assert list(df_feat[START_MONTH_COL]) == ["August", "December", "August"]
+    assert df_feat[TRIP_DATE_COL].iloc[1] == pd.Timestamp("2023-12-31")
+
+    parsed = parse_timestamps(pd.Series(["08/01/2024 10:00", None, "08/01/2024 10:00"]))
+    assert parsed.iloc[0] == parsed.iloc[2] == pd.Timestamp("2024-08-01 10:00")
+    assert pd.isna(parsed.iloc[1])
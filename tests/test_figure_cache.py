@@ -0,0 +1,75 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.figure_cache import FigureCache
+from src.plots import plot_hourly_counts, plot_station_counts
+
+
+def hourly():
+    return pd.DataFrame({"start_hour": [8, 9], "trip_count": [3, 5]})
+
+
+def test_render_caches_bytes_and_closes_figures():
+    cache = FigureCache()
+    calls = []
+
+    def data():
+        calls.append(1)
+        return hourly()
+
+    first = cache.render(plot_hourly_counts, ("2024-08-01",), "v1", data)
+    second = cache.render(plot_hourly_counts, ("2024-08-01",), "v1", data)
+
+    assert first == second
+    assert first.startswith(b"\x89PNG")
+    assert len(calls) == 1
+    assert plt.get_fignums() == []
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_key_covers_signature_version_and_kwargs():
+    cache = FigureCache()
+    stations = pd.DataFrame({"station_name": ["A"], "trip_count": [1]})
+
+    cache.render(plot_hourly_counts, ("a",), "v1", hourly)
+    cache.render(plot_hourly_counts, ("b",), "v1", hourly)
+    cache.render(plot_hourly_counts, ("a",), "v2", hourly)
+    cache.render(plot_station_counts, ("a",), "v1", lambda: stations, by="start")
+    cache.render(plot_station_counts, ("a",), "v1", lambda: stations, by="end")
+    svg = cache.render(plot_hourly_counts, ("a",), "v1", hourly, fmt="svg")
+    low = cache.render(plot_hourly_counts, ("a",), "v1", hourly, dpi=50)
+    high = cache.render(plot_hourly_counts, ("a",), "v1", hourly, dpi=200)
+
+    assert cache.stats()["misses"] == 8
+    assert len(low) < len(high)
+    assert b"<svg" in svg
+    with pytest.raises(ValueError):
+        cache.render(plot_hourly_counts, ("a",), "v1", hourly, fmt="gif")
+
+
+def test_lru_eviction_by_count_and_bytes():
+    cache = FigureCache(max_entries=2)
+    for key in ("a", "b", "a", "c"):
+        cache.put(key, b"x" * 10)
+        cache.get(key)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+    small = FigureCache(max_bytes=25)
+    small.put("a", b"x" * 10)
+    small.put("b", b"x" * 10)
+    small.put("c", b"x" * 10)
+    small.put("huge", b"x" * 100)
+    assert small.stats()["entries"] == 2
+    assert small.stats()["bytes"] == 20
+    assert small.get("huge") is None
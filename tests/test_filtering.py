@@ -0,0 +1,95 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_cleaning import TRIP_DATE_COL, full_clean_pipeline
+from src.filtering import build_filter_index
+
+
+def sample_clean_df():
+    # Deliberately out of date order
+    data = {
+        "Trip Id": [1, 2, 3, 4, 5, 6],
+        "Trip  Duration": [300, 600, 900, 1200, 60, 2400],
+        "Start Station Id": [1, 1, 2, 2, 3, 1],
+        "Start Time": [
+            "08/05/2024 09:00",
+            "08/01/2024 09:00",
+            "08/07/2024 23:10",
+            "08/01/2024 08:00",
+            "08/05/2024 17:30",
+            "08/02/2024 08:00",
+        ],
+        "Start Station Name": ["A", "A", "B", "B", "C", "A"],
+        "End Station Id": [10, 10, 20, 20, 1, 2],
+        "End Time": [
+            "08/05/2024 09:20",
+            "08/01/2024 09:10",
+            "08/07/2024 23:50",
+            "08/01/2024 08:05",
+            "08/05/2024 17:31",
+            "08/02/2024 08:15",
+        ],
+        "End Station Name": ["X", "X", "Y", "Y", "A", "B"],
+        "Bike Id": [1, 2, 3, 4, 1, 2],
+        "User Type": ["Casual Member", "Annual Member", "Annual Member", "Casual Member",
+                      "Annual Member", "Annual Member"],
+        "Model": ["ICONIC", "ICONIC", "EFIT", "ICONIC", "EFIT", "ICONIC"],
+    }
+    return full_clean_pipeline(pd.DataFrame(data))
+
+
+def mask_filter(df, start_date, end_date, user_types, models):
+    return df[
+        (df[TRIP_DATE_COL] >= pd.Timestamp(start_date))
+        & (df[TRIP_DATE_COL] <= pd.Timestamp(end_date))
+        & (df["User Type"].isin(user_types))
+        & (df["Model"].isin(models))
+    ]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        ("2024-08-01", "2024-08-07", ["Casual Member", "Annual Member"], ["ICONIC", "EFIT"]),
+        ("2024-08-02", "2024-08-05", ["Annual Member"], ["EFIT", "ICONIC"]),
+        ("2024-08-01", "2024-08-01", ["Casual Member"], ["ICONIC"]),
+        ("2024-09-01", "2024-09-30", ["Casual Member"], ["ICONIC"]),
+    ],
+)
+def test_select_matches_boolean_mask(filters):
+    df = sample_clean_df()
+    index = build_filter_index(df)
+
+    selected = index.select(*filters)
+    expected = mask_filter(df, *filters)
+
+    assert sorted(selected["Trip Id"]) == sorted(expected["Trip Id"])
+
+
+def test_frame_is_sorted_by_date():
+    index = build_filter_index(sample_clean_df())
+
+    assert index.frame[TRIP_DATE_COL].is_monotonic_increasing
+    assert list(index.frame.index) == list(range(6))
+
+
+def test_date_only_filter_returns_slice():
+    index = build_filter_index(sample_clean_df())
+
+    positions = index.positions(start_date="2024-08-02", end_date="2024-08-05")
+
+    assert positions == slice(2, 5)
+
+
+def test_category_filter_returns_positions():
+    index = build_filter_index(sample_clean_df())
+
+    positions = index.positions(user_types=["Casual Member"], models=["ICONIC", "EFIT"])
+
+    assert isinstance(positions, np.ndarray)
+    assert sorted(index.frame.iloc[positions]["Trip Id"]) == [1, 4]
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.fleet import build_bike_chains
+
+
+def sample_trips():
+    # Rows are deliberately out of order
+    return pd.DataFrame(
+        {
+            "Bike Id": [7, 5, 7, 5, 7],
+            "Trip  Duration": [600, 1200, 300, 900, 600],
+            "Start Station Id": [2, 10, 1, 11, 4],
+            "End Station Id": [3, 11, 2, 12, 1],
+            "Start Time": pd.to_datetime(
+                ["2024-08-01 09:00", "2024-08-01 08:00", "2024-08-01 08:00", "2024-08-01 08:30", "2024-08-01 12:00"]
+            ),
+            "End Time": pd.to_datetime(
+                ["2024-08-01 09:10", "2024-08-01 08:20", "2024-08-01 08:05", "2024-08-01 08:45", "2024-08-01 12:10"]
+            ),
+        }
+    )
+
+
+def test_utilization_per_bike():
+    usage = build_bike_chains(sample_trips()).utilization()
+
+    assert usage["bike_id"].tolist() == [5, 7]
+    assert usage["trip_count"].tolist() == [2, 3]
+    assert usage["busy_min"].tolist() == [35.0, 25.0]
+    # Bike 7: gaps 08:05 → 09:00 and 09:10 → 12:00
+    assert usage["idle_min"].tolist() == [10.0, 55.0 + 170.0]
+    assert usage["max_idle_min"].tolist() == [10.0, 170.0]
+    assert usage["utilization"].iloc[0] == pytest.approx(35 / 45)
+    assert usage["first_start"].iloc[1] == pd.Timestamp("2024-08-01 08:00")
+    assert usage["last_end"].iloc[1] == pd.Timestamp("2024-08-01 12:10")
+
+
+def test_relocations_detect_chain_breaks():
+    chains = build_bike_chains(sample_trips())
+
+    moves = chains.relocations()
+    # Bike 7 ended at 3 and next started at 4; every other link matches
+    assert moves[["bike_id", "from_station_id", "to_station_id"]].values.tolist() == [[7, 3, 4]]
+    assert moves["gap_min"].tolist() == [170.0]
+    assert chains.utilization()["relocations"].tolist() == [0, 1]
+    assert chains.relocation_flows()["relocations"].tolist() == [1]
+
+
+def test_overlapping_trips_and_missing_values():
+    trips = sample_trips()
+    trips.loc[4, "Start Time"] = pd.Timestamp("2024-08-01 09:05")
+    trips.loc[1, "Bike Id"] = np.nan
+
+    usage = build_bike_chains(trips).utilization()
+
+    assert usage["bike_id"].tolist() == [5, 7]
+    assert usage["trip_count"].tolist() == [1, 3]
+    assert usage["overlaps"].tolist() == [0, 1]
+    assert usage["idle_min"].iloc[1] == 55.0
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.hash_index import MAX_LOAD, TripIdIndex
+
+
+def test_add_and_contains():
+    index = TripIdIndex()
+    assert index.add(np.array([10, 11, 12, 11])) == 3
+    assert index.add([12, 13]) == 1
+
+    assert len(index) == 4
+    assert index.contains([10, 13, 14, -1]).tolist() == [True, True, False, False]
+    assert sorted(index.ids().tolist()) == [10, 11, 12, 13]
+
+
+def test_growth_keeps_every_id_and_load_factor():
+    rng = np.random.default_rng(0)
+    ids = rng.choice(10**12, 50_000, replace=False)
+    index = TripIdIndex()
+    for batch in np.array_split(ids, 7):
+        index.add(batch)
+
+    assert len(index) == len(ids)
+    assert len(index) <= MAX_LOAD * index.n_slots
+    assert index.contains(ids).all()
+    others = rng.integers(10**12, 2 * 10**12, 10_000)
+    assert not index.contains(others).any()
+
+
+def test_save_and_load(tmp_path):
+    index = TripIdIndex()
+    index.add(np.arange(26_000_000, 26_005_000))
+    index.save(tmp_path / "ids.npy")
+
+    loaded = TripIdIndex.load(tmp_path / "ids.npy", mmap_mode="r")
+    assert len(loaded) == 5_000
+    assert loaded.contains([26_000_000, 26_004_999, 26_005_000]).tolist() == [True, True, False]
+
+
+def test_missing_ids_rejected():
+    with pytest.raises(ValueError):
+        TripIdIndex().add(np.array([1.0, np.nan]))
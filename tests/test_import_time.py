@@ -0,0 +1,63 @@
+import json
+import subprocess
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from src.lazy_imports import lazy_import
+
+# Seconds `import src.analytics` may add on top of numpy and pandas
+ANALYTICS_IMPORT_BUDGET_S = 0.5
+
+PLOTTING_AND_UI = ("matplotlib", "plotly", "streamlit", "seaborn", "scipy")
+
+
+def run_fresh(code: str) -> dict:
+    """Run code in a new interpreter (cold imports) and parse its JSON output."""
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+LOADED = f"sorted({{m.split('.')[0] for m in sys.modules}} & set({PLOTTING_AND_UI!r}))"
+
+
+def test_import_analytics_within_budget():
+    result = run_fresh(
+        "import json, sys, time\n"
+        "import numpy, pandas\n"
+        "start = time.perf_counter()\n"
+        "import src.analytics, src.data_loading\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': {LOADED}}}))\n"
+    )
+
+    assert result["loaded"] == []
+    assert result["elapsed"] < ANALYTICS_IMPORT_BUDGET_S
+
+
+def test_plotting_stack_loads_on_first_plot():
+    result = run_fresh(
+        "import json, sys\n"
+        "import pandas as pd\n"
+        "import src.plots, src.figure_cache, src.cube\n"
+        f"before = {LOADED}\n"
+        "src.plots.plot_hourly_counts(pd.DataFrame({'start_hour': [8], 'trip_count': [3]}))\n"
+        f"print(json.dumps({{'before': before, 'after': {LOADED}}}))\n"
+    )
+
+    assert result["before"] == []
+    assert "matplotlib" in result["after"]
+
+
+def test_lazy_module_proxy():
+    module = lazy_import("json")
+    assert not module.is_loaded
+    assert module.dumps([1]) == "[1]"
+    assert module.is_loaded
@@ -0,0 +1,174 @@
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import incremental
+from src.analytics import daily_trip_counts, hourly_trip_counts, popular_stations
+from src.data_cleaning import full_clean_pipeline
+from src.analytics import partial_trip_aggregates
+from src.incremental import IncrementalTripStore, read_aggregates, write_aggregates
+from src.synthetic import generate_trips
+
+
+@pytest.fixture
+def trips():
+    return generate_trips(3_000, seed=5)
+
+
+def sorted_by_id(df):
+    return df.sort_values("Trip Id").reset_index(drop=True)
+
+
+def test_ingest_matches_full_pipeline(tmp_path, trips):
+    (tmp_path / "in").mkdir()
+    trips.iloc[:1_000].to_csv(tmp_path / "in" / "a.csv", index=False)
+    trips.iloc[1_000:].to_csv(tmp_path / "in" / "b.csv", index=False)
+
+    store = IncrementalTripStore(tmp_path / "store")
+    report = store.ingest(tmp_path / "in")
+
+    expected = full_clean_pipeline(trips)
+    assert report.rows_read == 3_000
+    assert report.rows_added == len(expected) == store.n_rows
+    assert report.rows_dropped == 3_000 - len(expected)
+    pd.testing.assert_frame_equal(sorted_by_id(store.frame()), sorted_by_id(expected), check_categorical=False)
+
+    summary = IncrementalTripStore(tmp_path / "store").summary()
+    pd.testing.assert_frame_equal(summary["daily"], daily_trip_counts(expected))
+    pd.testing.assert_frame_equal(summary["hourly"], hourly_trip_counts(expected))
+    pd.testing.assert_frame_equal(summary["popular_start"], popular_stations(expected))
+
+
+def test_unchanged_files_are_skipped(tmp_path, trips, monkeypatch):
+    trips.to_csv(tmp_path / "a.csv", index=False)
+    IncrementalTripStore(tmp_path / "store").ingest(tmp_path / "a.csv")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("nothing should be cleaned")
+
+    monkeypatch.setattr(incremental, "full_clean_pipeline", fail)
+    report = IncrementalTripStore(tmp_path / "store").ingest(tmp_path / "a.csv")
+    assert report.files_skipped == [str(tmp_path / "a.csv")]
+    assert report.rows_read == 0
+
+
+def test_grown_file_reads_only_the_tail(tmp_path, trips):
+    path = tmp_path / "a.csv"
+    trips.iloc[:2_000].to_csv(path, index=False)
+    store = IncrementalTripStore(tmp_path / "store")
+    store.ingest(path)
+    first_watermark = store.watermark
+
+    trips.iloc[2_000:].to_csv(path, index=False, header=False, mode="a")
+    report = store.ingest(path)
+
+    assert report.rows_read == 1_000
+    assert "from byte" in report.files_read[0]
+    assert store.watermark["max_trip_id"] > first_watermark["max_trip_id"]
+    assert store.n_rows == len(full_clean_pipeline(trips))
+    assert len(store.segments) == 2
+
+
+def test_duplicates_and_late_rows(tmp_path, trips):
+    trips.iloc[1_000:2_000].to_csv(tmp_path / "a.csv", index=False)
+    store = IncrementalTripStore(tmp_path / "store")
+    store.ingest(tmp_path / "a.csv")
+
+    # Re-delivered rows, a row repeated within the file, and older (late) trips
+    batch = pd.concat([trips.iloc[1_500:1_600], trips.iloc[:10], trips.iloc[:1]])
+    batch.to_csv(tmp_path / "b.csv", index=False)
+    report = store.ingest(tmp_path / "b.csv")
+
+    assert report.rows_duplicate == 101
+    assert report.rows_late == 10
+    assert store.frame()["Trip Id"].is_unique
+
+
+def test_compact_and_crash_safe_generations(tmp_path, trips):
+    for i in range(3):
+        trips.iloc[i * 1_000:(i + 1) * 1_000].to_csv(tmp_path / f"{i}.csv", index=False)
+        IncrementalTripStore(tmp_path / "store").ingest(tmp_path / f"{i}.csv")
+
+    store = IncrementalTripStore(tmp_path / "store")
+    before = sorted_by_id(store.frame())
+    store.compact()
+
+    reopened = IncrementalTripStore(tmp_path / "store")
+    assert len(reopened.segments) == 1
+    pd.testing.assert_frame_equal(sorted_by_id(reopened.frame(shared=True)), before, check_categorical=False)
+    # Only the current generation's index and aggregates are kept
+    assert len(list((tmp_path / "store").glob("trip_ids-*.npy"))) == 1
+    assert len(list((tmp_path / "store").glob("aggregates-*"))) == 1
+
+
+def test_pipeline_version_mismatch(tmp_path, trips, monkeypatch):
+    trips.to_csv(tmp_path / "a.csv", index=False)
+    IncrementalTripStore(tmp_path / "store").ingest(tmp_path / "a.csv")
+
+    monkeypatch.setattr(incremental, "PIPELINE_VERSION", "999")
+    with pytest.raises(ValueError):
+        IncrementalTripStore(tmp_path / "store")
+
+
+def test_aggregates_round_trip_without_pickle(tmp_path, trips):
+    partial = partial_trip_aggregates(full_clean_pipeline(trips), approximate=True, capacity=50)
+    write_aggregates(partial, tmp_path / "agg")
+    restored = read_aggregates(tmp_path / "agg")
+
+    assert restored.keys() == partial.keys()
+    for key, value in partial.items():
+        if isinstance(value, pd.Series):
+            pd.testing.assert_series_equal(restored[key], value)
+    sketch, restored_sketch = partial["duration"], restored["duration"]
+    assert (restored_sketch.counts == sketch.counts).all()
+    assert restored_sketch.summary() == sketch.summary()
+    hitters, restored_hitters = partial["od_pairs"], restored["od_pairs"]
+    pd.testing.assert_series_equal(restored_hitters.counters, hitters.counters)
+    assert (restored_hitters.total, restored_hitters.error) == (hitters.total, hitters.error)
+
+
+def test_reader_follows_commits_of_another_writer(tmp_path, trips):
+    trips.iloc[:1_000].to_csv(tmp_path / "a.csv", index=False)
+    IncrementalTripStore(tmp_path / "store").ingest(tmp_path / "a.csv")
+    reader = IncrementalTripStore(tmp_path / "store")
+
+    # The writer's commits delete the generation the reader was opened on
+    writer = IncrementalTripStore(tmp_path / "store")
+    trips.iloc[1_000:].to_csv(tmp_path / "b.csv", index=False)
+    writer.ingest(tmp_path / "b.csv")
+    writer.compact()
+
+    expected = full_clean_pipeline(trips)
+    assert reader.summary()["daily"]["trip_count"].sum() == len(expected)
+    assert len(reader.frame()) == len(expected)
+    assert len(reader.trip_index()) == len(writer.trip_index())
+    assert reader.segments == writer.segments
+
+
+def test_failed_commit_leaves_the_store_and_object_unchanged(tmp_path, trips, monkeypatch):
+    trips.iloc[:1_000].to_csv(tmp_path / "a.csv", index=False)
+    store = IncrementalTripStore(tmp_path / "store")
+    store.ingest(tmp_path / "a.csv")
+    before = (store.n_rows, store.segments, store.watermark, store.files)
+
+    def disk_full(aggregates, directory):
+        raise OSError("No space left on device")
+
+    trips.iloc[1_000:].to_csv(tmp_path / "b.csv", index=False)
+    with monkeypatch.context() as patch:
+        patch.setattr(incremental, "write_aggregates", disk_full)
+        with pytest.raises(OSError):
+            store.ingest(tmp_path / "b.csv")
+
+    assert (store.n_rows, store.segments, store.watermark, store.files) == before
+    assert IncrementalTripStore(tmp_path / "store").n_rows == before[0]
+
+    # Retrying on the same object ingests the file that failed
+    report = store.ingest(tmp_path / "b.csv")
+    assert report.rows_read == 2_000
+    assert store.n_rows == len(full_clean_pipeline(trips))
+    reopened = IncrementalTripStore(tmp_path / "store")
+    assert reopened.n_rows == store.n_rows == len(reopened.frame())
+    assert reopened.summary()["daily"]["trip_count"].sum() == store.n_rows
@@ -0,0 +1,101 @@
+import json
+import logging
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.analytics import hourly_trip_counts
+from src.data_cleaning import full_clean_pipeline
+from src.instrumentation import PROFILER, PipelineProfiler, instrument, rss_bytes
+
+
+def sample_raw_df():
+    data = {
+        "Trip Id": [1, 2, 3, 4],
+        "Trip  Duration": [600, 300, -5, 1200],
+        "Start Station Id": [1, 1, 2, 3],
+        "Start Time": ["08/01/2024 8:00", "08/01/2024 9:00", "08/02/2024 8:00", None],
+        "Start Station Name": ["A", "A", "B", "C"],
+        "End Station Id": [2, 3, 1, 1],
+        "End Time": ["08/01/2024 8:10", "08/01/2024 9:05", "08/02/2024 8:15", "08/02/2024 18:00"],
+        "End Station Name": ["B", "C", "A", "A"],
+        "Bike Id": [1, 2, 3, 4],
+        "User Type": ["Annual Member", "Casual Member", "Annual Member", "Annual Member"],
+        "Model": ["ICONIC", "EFIT", "ICONIC", "ICONIC"],
+    }
+    return pd.DataFrame(data)
+
+
+def test_instrumented_stages_record_rows():
+    PROFILER.reset()
+    clean = full_clean_pipeline(sample_raw_df())
+    hourly_trip_counts(clean)
+
+    metrics = PROFILER.metrics()
+    assert metrics["data_cleaning.clean_basic"]["rows_in"] == 4
+    assert metrics["data_cleaning.clean_basic"]["rows_out"] == 2
+    assert metrics["data_cleaning.full_clean_pipeline"]["calls"] == 1
+    assert metrics["analytics.hourly_trip_counts"]["rows_out"] == 2
+
+    stages = [r["stage"] for r in PROFILER.records()]
+    # Inner stages finish (and are recorded) before the pipeline that calls them
+    assert stages.index("data_cleaning.clean_basic") < stages.index("data_cleaning.full_clean_pipeline")
+
+
+def test_profiler_totals_errors_and_bounded_records():
+    profiler = PipelineProfiler(max_records=3)
+
+    @instrument(stage="double", profiler=profiler)
+    def double(df):
+        return pd.concat([df, df])
+
+    @instrument(stage="fail", profiler=profiler)
+    def fail(df):
+        raise KeyError("boom")
+
+    frame = pd.DataFrame({"x": [1, 2]})
+    for _ in range(4):
+        double(frame)
+    with pytest.raises(KeyError):
+        fail(frame)
+
+    metrics = profiler.metrics()
+    assert metrics["double"]["calls"] == 4
+    assert metrics["double"]["rows_in"] == 8
+    assert metrics["double"]["rows_out"] == 16
+    assert metrics["double"]["mean_s"] == pytest.approx(metrics["double"]["total_s"] / 4)
+    assert metrics["fail"]["errors"] == 1
+
+    records = profiler.records()
+    assert len(records) == 3
+    assert records[-1]["stage"] == "fail"
+    assert records[-1]["error"] == "KeyError"
+    assert records[-1]["rows_out"] is None
+    assert [json.loads(line)["stage"] for line in profiler.to_json_lines().splitlines()] == [
+        "double", "double", "fail"
+    ]
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = PipelineProfiler(enabled=False)
+    wrapped = instrument(profiler=profiler)(len)
+
+    assert wrapped([1, 2, 3]) == 3
+    assert profiler.metrics() == {}
+
+
+def test_records_are_logged_as_json(caplog):
+    profiler = PipelineProfiler()
+    with caplog.at_level(logging.DEBUG, logger="bikeshare.stages"):
+        instrument(stage="noop", profiler=profiler)(lambda df: df)(pd.DataFrame({"x": [1]}))
+
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged["stage"] == "noop"
+    assert logged["rows_in"] == logged["rows_out"] == 1
+
+
+def test_rss_bytes():
+    rss = rss_bytes()
+    assert rss is None or rss > 0
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.net_flow import build_station_flow
+
+
+def sample_trips():
+    return pd.DataFrame(
+        {
+            "Start Station Id": [1, 1, 1, 2, 3],
+            "End Station Id": [2, 2, 3, 1, 1],
+            "Start Time": pd.to_datetime(
+                ["2024-08-01 07:10", "2024-08-01 07:40", "2024-08-01 08:05", "2024-08-01 09:00", "2024-08-01 09:30"]
+            ),
+            "End Time": pd.to_datetime(
+                ["2024-08-01 07:20", "2024-08-01 08:10", "2024-08-01 08:30", "2024-08-01 09:15", "2024-08-01 10:05"]
+            ),
+        }
+    )
+
+
+def test_flow_counts_departures_and_arrivals_per_hour():
+    flow = build_station_flow(sample_trips())
+
+    assert flow.station_ids.tolist() == [1, 2, 3]
+    assert flow.hours[0] == np.datetime64("2024-08-01T07", "h")
+    assert flow.departures.sum() == flow.arrivals.sum() == 5
+
+    station_1 = flow.station_series(1)
+    assert station_1["departures"].tolist() == [2, 1, 0, 0]
+    assert station_1["arrivals"].tolist() == [0, 0, 1, 1]
+    assert station_1["net_flow"].sum() == 1
+    with pytest.raises(KeyError):
+        flow.station_series(99)
+
+
+def test_incremental_update_matches_single_build():
+    trips = sample_trips()
+    later = trips.assign(
+        **{
+            "Start Station Id": [4, 1, 2, 2, 3],
+            "Start Time": trips["Start Time"] - pd.Timedelta(days=1),
+            "End Time": trips["End Time"] + pd.Timedelta(days=1),
+        }
+    )
+
+    incremental = build_station_flow(trips).update(later)
+    full = build_station_flow(pd.concat([trips, later], ignore_index=True))
+
+    assert incremental.station_ids.tolist() == full.station_ids.tolist()
+    assert incremental.first_hour == full.first_hour
+    np.testing.assert_array_equal(incremental.departures, full.departures)
+    np.testing.assert_array_equal(incremental.arrivals, full.arrivals)
+
+
+def test_largest_deficits_over_window():
+    flow = build_station_flow(sample_trips())
+
+    # Station 1 loses 3 bikes by 08:00; stations 2 and 3 receive bikes first
+    deficits = flow.largest_deficits(top_n=2)
+    assert deficits["station_id"].tolist() == [1]
+    assert deficits["max_deficit"].tolist() == [3]
+    assert deficits["deficit_hour"].iloc[0] == np.datetime64("2024-08-01T08", "h")
+
+    morning = flow.largest_deficits(start="2024-08-01 09:00", end="2024-08-01 10:00")
+    assert morning["station_id"].tolist() == [2, 3]
+    assert morning["net_flow"].tolist() == [1, 1]
+    assert flow.largest_deficits(start="2030-01-01").empty
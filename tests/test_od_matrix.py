@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.od_matrix import build_od_matrix
+
+
+def sample_trips(n=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    start = rng.integers(0, 30, n)
+    end = np.where(rng.random(n) < 0.1, start, rng.integers(0, 30, n))
+    names = np.array([f"Station {i}" for i in range(30)], dtype=object)
+    return pd.DataFrame(
+        {
+            "Start Station Id": (start + 7000).astype(np.int32),
+            "End Station Id": (end + 7000).astype(np.int32),
+            "Start Station Name": pd.Categorical(names[start]),
+            "End Station Name": pd.Categorical(names[end]),
+            "User Type": pd.Categorical(rng.choice(["Annual Member", "Casual Member"], n)),
+            "start_hour": rng.integers(0, 24, n).astype(np.int16),
+            "trip_duration_min": rng.uniform(1, 60, n).astype(np.float32),
+        }
+    )
+
+
+def expected_pairs(df):
+    return (
+        df.groupby(["Start Station Id", "End Station Id"])
+        .agg(trip_count=("trip_duration_min", "size"), avg=("trip_duration_min", "mean"))
+        .reset_index()
+    )
+
+
+def test_top_flows_match_groupby():
+    df = sample_trips()
+    od = build_od_matrix(df)
+
+    top = od.top_flows(top_n=5)
+    expected = expected_pairs(df).sort_values(
+        ["trip_count", "Start Station Id", "End Station Id"], ascending=[False, True, True]
+    ).head(5)
+
+    assert top["start_station_id"].tolist() == expected["Start Station Id"].tolist()
+    assert top["end_station_id"].tolist() == expected["End Station Id"].tolist()
+    assert top["trip_count"].tolist() == expected["trip_count"].tolist()
+    np.testing.assert_allclose(top["avg_duration_min"], expected["avg"], rtol=1e-5)
+    assert od.to_dense().sum() == len(df)
+
+
+def test_station_degrees_and_round_trips():
+    df = sample_trips()
+    od = build_od_matrix(df)
+    degrees = od.station_degrees().set_index("station_id")
+
+    out_trips = df.groupby("Start Station Id").size()
+    in_degree = df.groupby("End Station Id")["Start Station Id"].nunique()
+    loops = df["Start Station Id"] == df["End Station Id"]
+
+    assert degrees["out_trips"].reindex(out_trips.index).tolist() == out_trips.tolist()
+    assert degrees["in_degree"].reindex(in_degree.index).tolist() == in_degree.tolist()
+    assert degrees["round_trips"].sum() == loops.sum()
+    assert od.round_trip_share() == pytest.approx(loops.mean())
+
+
+@pytest.mark.parametrize("by, column, selected", [("hour", "start_hour", [7, 8, 9]), ("user_type", "User Type", ["Casual Member"])])
+def test_sliced_matrix_matches_filtered_rows(by, column, selected):
+    df = sample_trips()
+    od = build_od_matrix(df, by=by)
+    rows = df[df[column].isin(selected)]
+
+    assert od.to_dense(slices=selected).sum() == len(rows)
+    assert od.top_flows(3, slices=selected)["trip_count"].tolist() == (
+        expected_pairs(rows)["trip_count"].sort_values(ascending=False).head(3).tolist()
+    )
+    assert od.round_trip_share(slices=selected) == pytest.approx(
+        (rows["Start Station Id"] == rows["End Station Id"]).mean()
+    )
+
+
+def test_unsliced_matrix_rejects_slices():
+    od = build_od_matrix(sample_trips(100))
+    with pytest.raises(ValueError):
+        od.pairs(slices=[8])
+    with pytest.raises(ValueError):
+        build_od_matrix(sample_trips(100), by="model")
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.analytics import stream_trip_summary
+from src.data_cleaning import clean_chunks
+from src.data_loading import iter_raw_data_chunks, resolve_trip_csvs
+from src.parallel import ingest_trip_files
+
+
+def sample_raw_df(day: int):
+    data = {
+        "Trip Id": [10 * day + i for i in range(4)],
+        "Trip  Duration": [600, 300, 900, 1200],
+        "Start Station Id": [1, 1, 2, 3],
+        "Start Time": [f"08/{day:02d}/2024 {h}:00" for h in (8, 9, 8, 17)],
+        "Start Station Name": ["A", "A", "B", f"S{day}"],
+        "End Station Id": [2, 3, 1, 1],
+        "End Time": [f"08/{day:02d}/2024 {h}:30" for h in (8, 9, 8, 17)],
+        "End Station Name": ["B", f"S{day}", "A", "A"],
+        "Bike Id": [1, 2, 3, 4],
+        "User Type": ["Annual Member", "Casual Member", "Annual Member", "Annual Member"],
+        "Model": ["ICONIC", "EFIT", "ICONIC", "ICONIC"],
+    }
+    return pd.DataFrame(data)
+
+
+def write_monthly_files(directory):
+    for day in (1, 9, 20):
+        sample_raw_df(day).to_csv(directory / f"trips-{day:02d}.csv", index=False)
+
+
+def assert_summaries_equal(left, right):
+    assert left.keys() == right.keys()
+    for key, value in left.items():
+        if isinstance(value, pd.DataFrame):
+            pd.testing.assert_frame_equal(value, right[key])
+        else:
+            assert value == right[key]
+
+
+def test_resolve_trip_csvs_accepts_directory_and_glob(tmp_path):
+    write_monthly_files(tmp_path)
+
+    names = [p.name for p in resolve_trip_csvs(tmp_path)]
+    assert names == ["trips-01.csv", "trips-09.csv", "trips-20.csv"]
+    assert resolve_trip_csvs(str(tmp_path / "trips-0*.csv")) == resolve_trip_csvs(tmp_path)[:2]
+    with pytest.raises(FileNotFoundError):
+        resolve_trip_csvs(tmp_path / "empty-*.csv")
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_ingest_trip_files_matches_streaming_summary(tmp_path, max_workers):
+    write_monthly_files(tmp_path)
+
+    result = ingest_trip_files(tmp_path, top_n=2, max_workers=max_workers)
+    expected = stream_trip_summary(clean_chunks(iter_raw_data_chunks(tmp_path)), top_n=2)
+
+    assert_summaries_equal(result.summary, expected)
+    assert result.rows_per_file == [4, 4, 4]
+    assert result.frame is None
+
+
+def test_ingest_trip_files_keeps_rows_on_request(tmp_path):
+    write_monthly_files(tmp_path)
+
+    result = ingest_trip_files(tmp_path, aggregates=["daily"], keep_rows=True, max_workers=2)
+
+    assert len(result.frame) == 12
+    assert result.frame["Trip Id"].tolist() == sorted(result.frame["Trip Id"])
+    assert isinstance(result.frame["Start Station Name"].dtype, pd.CategoricalDtype)
+
+
+def test_ingest_trip_files_validates_before_starting(tmp_path):
+    write_monthly_files(tmp_path)
+    sample_raw_df(2).drop(columns=["Model"]).to_csv(tmp_path / "trips-02.csv", index=False)
+
+    with pytest.raises(ValueError):
+        ingest_trip_files(tmp_path, max_workers=2)
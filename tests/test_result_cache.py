@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.result_cache import ResultCache, result_nbytes
+
+
+def test_get_or_compute_caches_and_counts():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return pd.DataFrame({"start_hour": [8, 9], "trip_count": [3, 5]})
+
+    first = cache.get_or_compute(("hourly", "sig", "v1"), compute)
+    second = cache.get_or_compute(("hourly", "sig", "v1"), compute)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert cache.stats()["bytes"] == result_nbytes(first)
+
+
+def test_cached_frames_are_protected_from_callers():
+    cache = ResultCache()
+    cache.put("k", pd.DataFrame({"trip_count": [1, 2]}))
+
+    view = cache.get("k")
+    view.loc[0, "trip_count"] = 100
+    view["extra"] = 1
+
+    assert cache.get("k")["trip_count"].tolist() == [1, 2]
+    assert list(cache.get("k").columns) == ["trip_count"]
+
+    cache.put("d", {"mean": 1.0})
+    cache.get("d")["mean"] = 2.0
+    assert cache.get("d") == {"mean": 1.0}
+
+
+def test_memory_limit_evicts_least_recently_used():
+    frame = pd.DataFrame({"x": range(1_000)})
+    size = result_nbytes(frame)
+    cache = ResultCache(max_bytes=int(size * 2.5))
+
+    for key in ("a", "b", "a", "c"):
+        cache.put(key, frame)
+        cache.get(key)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["bytes"] == 2 * size <= cache.max_bytes
+
+    cache.put("huge", pd.DataFrame({"x": range(10_000)}))
+    assert cache.get("huge") is None
+    with pytest.raises(ValueError):
+        ResultCache(max_bytes=0)
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"total": 42}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"total": 42}] * 8
+
+
+def test_none_results_are_cached():
+    cache = ResultCache()
+    calls = []
+
+    def empty_selection_top_station():
+        calls.append(1)
+        return None
+
+    for _ in range(3):
+        assert cache.get_or_compute(("top_station", "empty"), empty_selection_top_station) is None
+
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+    assert cache.get("absent", default="default") == "default"
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_cleaning import full_clean_pipeline
+from src.schema import apply_trip_schema, concat_trip_frames, memory_usage_report
+
+
+def sample_raw_df():
+    data = {
+        "Trip Id": [1, 2, 3, 4],
+        "Trip  Duration": [600, 300, 900, 120],
+        "Start Station Id": [111, 222, 111, 333],
+        "Start Time": ["08/01/2024 10:00", "08/01/2024 11:00", "08/03/2024 17:45", "08/04/2024 00:10"],
+        "Start Station Name": ["A", "B", "A", "C"],
+        "End Station Id": [444, 555, 666, 444],
+        "End Time": ["08/01/2024 10:10", "08/01/2024 11:05", "08/03/2024 18:00", "08/04/2024 00:12"],
+        "End Station Name": ["D", "E", "F", "D"],
+        "Bike Id": [1, 2, 3, 1],
+        "User Type": ["Casual Member", "Annual Member", "Annual Member", "Casual Member"],
+        "Model": ["ICONIC", "ICONIC", "EFIT", "ICONIC"],
+    }
+    return pd.DataFrame(data)
+
+
+def test_clean_pipeline_returns_declared_dtypes():
+    df = full_clean_pipeline(sample_raw_df())
+
+    assert isinstance(df["Start Station Name"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["User Type"].dtype, pd.CategoricalDtype)
+    assert df["Trip Id"].dtype == "int32"
+    assert df["start_hour"].dtype == "int16"
+    assert df["trip_duration_min"].dtype == "float32"
+    assert df["trip_date"].dtype == "datetime64[s]"
+    assert list(df["start_weekday"]) == ["Thursday", "Thursday", "Saturday", "Sunday"]
+    assert df["start_weekday"].cat.ordered
+
+
+def test_apply_trip_schema_keeps_integer_columns_with_missing_values():
+    df = sample_raw_df()
+    df["End Station Id"] = df["End Station Id"].astype("float64")
+    df.loc[0, "End Station Id"] = None
+
+    converted = apply_trip_schema(df)
+
+    assert converted["End Station Id"].dtype == "float64"
+    assert converted["Start Station Id"].dtype == "int32"
+    # The input frame is left untouched
+    assert df["Start Station Id"].dtype == "int64"
+
+
+def test_concat_trip_frames_unions_categories():
+    df = full_clean_pipeline(sample_raw_df())
+    parts = [apply_trip_schema(df.iloc[:2].astype({"Start Station Name": str})),
+             apply_trip_schema(df.iloc[2:].astype({"Start Station Name": str}))]
+
+    combined = concat_trip_frames(parts)
+
+    assert isinstance(combined["Start Station Name"].dtype, pd.CategoricalDtype)
+    assert list(combined["Start Station Name"].cat.categories) == ["A", "B", "C"]
+    assert list(combined["Start Station Name"]) == ["A", "B", "A", "C"]
+
+
+def test_memory_usage_report_shows_savings():
+    raw = sample_raw_df()
+    legacy = raw.astype(object)
+
+    report = memory_usage_report(legacy, apply_trip_schema(raw))
+
+    total = report[report["column"] == "TOTAL"].iloc[0]
+    assert total["bytes_after"] < total["bytes_before"]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.cache import cache_key, load_clean_data
+from src.shared_data import shared_dataset
+from src.synthetic import write_synthetic_csv
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "trips.csv"
+    write_synthetic_csv(path, 2_000, seed=2)
+    return path
+
+
+def test_one_handle_per_source_and_process(csv_path, tmp_path):
+    dataset = shared_dataset(str(csv_path), str(tmp_path / "cache"))
+    assert shared_dataset(str(csv_path), str(tmp_path / "cache")) is dataset
+    assert not dataset.is_loaded
+
+    first, second = dataset.view(), dataset.view()
+    assert first is not second
+    assert dataset.version == cache_key(csv_path)
+    # Views share the memory-mapped columns instead of copying them
+    assert np.shares_memory(first["Trip Id"].to_numpy(), second["Trip Id"].to_numpy())
+    assert first.equals(load_clean_data(str(csv_path), str(tmp_path / "cache")))
+
+
+def test_views_cannot_change_the_shared_frame(csv_path, tmp_path):
+    dataset = shared_dataset(str(csv_path), str(tmp_path / "cache"))
+    original = dataset.view()["Trip  Duration"].copy()
+
+    view = dataset.view()
+    view.loc[0, "Trip  Duration"] = -1
+    view["Trip  Duration"] = 0
+    view["extra"] = 1
+    with pytest.raises(ValueError):
+        dataset.view()["Trip Id"].to_numpy()[0] = -1
+
+    fresh = dataset.view()
+    assert fresh["Trip  Duration"].equals(original)
+    assert "extra" not in fresh.columns
+
+
+def test_stale_handle_is_replaced_on_request(csv_path, tmp_path):
+    dataset = shared_dataset(str(csv_path), str(tmp_path / "cache"))
+    old_view = dataset.view()
+
+    write_synthetic_csv(csv_path, 3_000, seed=2)
+    os.utime(csv_path, ns=(0, 1))
+    assert dataset.is_stale()
+    assert shared_dataset(str(csv_path), str(tmp_path / "cache")) is dataset
+
+    refreshed = shared_dataset(str(csv_path), str(tmp_path / "cache"), refresh_if_stale=True)
+    assert refreshed is not dataset
+    assert len(refreshed.view()) > len(old_view)
+    assert old_view["Trip Id"].notna().all()
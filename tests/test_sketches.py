@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.sketches import DurationSketch
+from src.analytics import stream_trip_summary, trip_duration_summary
+from src.data_cleaning import START_HOUR_COL, TRIP_DATE_COL, TRIP_DURATION_MIN_COL
+
+
+def sample_durations(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.lognormal(mean=2.5, sigma=0.8, size=n)
+
+
+def test_quantiles_within_relative_accuracy():
+    values = sample_durations()
+    sketch = DurationSketch(relative_accuracy=0.01).add(values)
+
+    for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+        exact = np.quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact + 1e-9
+
+
+def test_merge_equals_sketch_of_combined_data():
+    values = sample_durations()
+    whole = DurationSketch().add(values)
+    merged = DurationSketch().add(values[:7_000]).merge(DurationSketch().add(values[7_000:]))
+
+    assert np.array_equal(whole.counts, merged.counts)
+    assert merged.count == whole.count
+    assert merged.summary() == pytest.approx(whole.summary())
+
+
+def test_merge_rejects_different_parameters():
+    with pytest.raises(ValueError):
+        DurationSketch(relative_accuracy=0.01).merge(DurationSketch(relative_accuracy=0.02))
+
+
+def test_empty_sketch():
+    sketch = DurationSketch().add([np.nan])
+    assert sketch.summary() == {}
+    with pytest.raises(ValueError):
+        sketch.quantile(0.5)
+
+
+def test_approximate_summary_matches_exact_summary():
+    df = pd.DataFrame({TRIP_DURATION_MIN_COL: sample_durations(5_000, seed=1)})
+    exact = trip_duration_summary(df)
+    approx = trip_duration_summary(df, approximate=True)
+
+    assert approx.keys() == exact.keys()
+    for key in ["mean", "min", "max"]:
+        assert approx[key] == pytest.approx(exact[key])
+    for key in ["median", "q25", "q75"]:
+        assert approx[key] == pytest.approx(exact[key], rel=0.01)
+
+
+def test_stream_summary_approximate_mode():
+    df = pd.DataFrame(
+        {
+            TRIP_DURATION_MIN_COL: sample_durations(6_000, seed=2),
+            START_HOUR_COL: 8,
+            TRIP_DATE_COL: pd.Timestamp("2024-08-01"),
+        }
+    )
+    chunks = [df.iloc[i:i + 1_000] for i in range(0, len(df), 1_000)]
+
+    summary = stream_trip_summary(chunks, aggregates=["duration"], approximate=True)
+    exact = trip_duration_summary(df)
+
+    assert summary["duration"]["median"] == pytest.approx(exact["median"], rel=0.01)
+    assert summary["duration"]["max"] == pytest.approx(exact["max"])
+
+
+def test_heavy_hitters_error_bound():
+    from src.sketches import HeavyHitters
+
+    rng = np.random.default_rng(3)
+    keys = rng.zipf(1.5, size=50_000) % 5_000
+    exact = pd.Series(keys).value_counts()
+
+    hitters = HeavyHitters(capacity=100)
+    for chunk in np.array_split(keys, 10):
+        hitters.add(chunk)
+
+    assert len(hitters.counters) <= 100
+    assert hitters.total == len(keys)
+    assert hitters.error <= len(keys) / 101
+    tracked = exact.reindex(hitters.counters.index)
+    assert (hitters.counters <= tracked).all()
+    assert (tracked <= hitters.counters + hitters.error).all()
+    # Every key above the error bound is tracked
+    assert set(exact[exact > hitters.error].index) <= set(hitters.counters.index)
+
+
+def test_heavy_hitters_merge():
+    from src.sketches import HeavyHitters
+
+    left = HeavyHitters(capacity=2).add(["a", "a", "a", "b", "c"])
+    right = HeavyHitters(capacity=2).add(["a", "d", "d", "e"])
+    merged = left.copy().merge(right)
+
+    assert merged.total == 9
+    assert merged.error <= 9 / 3
+    assert merged.counters["a"] <= 4 <= merged.counters["a"] + merged.error
+    with pytest.raises(ValueError):
+        left.merge(HeavyHitters(capacity=3))
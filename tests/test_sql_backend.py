@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import analytics
+from src.data_cleaning import full_clean_pipeline, parse_and_enrich_datetime
+from src.filtering import build_filter_index
+from src.sql_backend import build_trip_database
+from src.synthetic import generate_trips
+
+QUERIES = ["hourly_trip_counts", "daily_trip_counts", "weekly_trip_counts", "user_type_summary"]
+
+
+@pytest.fixture(scope="module")
+def clean_df():
+    return full_clean_pipeline(generate_trips(20_000, seed=11))
+
+
+@pytest.fixture(scope="module")
+def db(clean_df, tmp_path_factory):
+    path = tmp_path_factory.mktemp("sql") / "trips.sqlite"
+    # Load in chunks with small batches to exercise the batched insert
+    chunks = [clean_df.iloc[:7_000], clean_df.iloc[7_000:]]
+    with build_trip_database(chunks, path, batch_rows=3_000) as database:
+        yield database
+
+
+def test_unfiltered_queries_match_pandas(db, clean_df):
+    assert len(db) == len(clean_df)
+    selection = db.select()
+    for name in QUERIES:
+        pd.testing.assert_frame_equal(getattr(selection, name)(), getattr(analytics, name)(clean_df))
+    for by in ("start", "end"):
+        pd.testing.assert_frame_equal(
+            selection.popular_stations(top_n=7, by=by), analytics.popular_stations(clean_df, top_n=7, by=by)
+        )
+        pd.testing.assert_frame_equal(
+            selection.station_id_counts(by=by), analytics.station_id_counts(clean_df, by=by)
+        )
+    pd.testing.assert_frame_equal(
+        selection.period_trip_counts("month"), analytics.period_trip_counts(clean_df, "month")
+    )
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        dict(start_date="2024-08-03", end_date="2024-08-09"),
+        dict(user_types=["Casual Member"], models=["EFIT", "ICONIC"]),
+        dict(start_date="2024-08-20", user_types=["Annual Member"]),
+        dict(models=[]),
+    ],
+)
+def test_filtered_queries_match_pandas(db, clean_df, filters):
+    subset = build_filter_index(clean_df).select(**filters)
+    selection = db.select(**filters)
+
+    assert selection.total_trips() == len(subset)
+    for name in QUERIES:
+        pd.testing.assert_frame_equal(
+            getattr(selection, name)().reset_index(drop=True),
+            getattr(analytics, name)(subset).reset_index(drop=True),
+        )
+    pd.testing.assert_frame_equal(selection.popular_stations(top_n=5), analytics.popular_stations(subset, top_n=5))
+
+
+def test_indexes_and_filter_values(db, clean_df):
+    indexes = {row[1] for row in db.connection.execute("PRAGMA index_list(trips)")}
+    assert {"idx_trips_trip_date", "idx_trips_user_type", "idx_trips_model", "idx_trips_start_hour"} <= indexes
+
+    plan = db.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM trips WHERE trip_date BETWEEN 19936 AND 19940"
+    ).fetchall()
+    assert "idx_trips_trip_date" in str(plan)
+
+    first, last = db.date_range()
+    assert first == clean_df["trip_date"].min() and last == clean_df["trip_date"].max()
+    assert db.categories("Model") == sorted(clean_df["Model"].dropna().unique())
+    assert db.select().top_station() == analytics.popular_stations(clean_df, top_n=1)["station_name"][0]
+
+
+def test_failed_load_inserts_nothing(tmp_path, clean_df):
+    raw = generate_trips(100, seed=1)
+    chunks = [clean_df.iloc[:500], raw]  # second chunk is not enriched
+    with pytest.raises(ValueError):
+        build_trip_database(chunks, tmp_path / "trips.sqlite", batch_rows=100)
+    assert not (tmp_path / "trips.sqlite").exists()
+
+    with build_trip_database(parse_and_enrich_datetime(raw), tmp_path / "trips.sqlite") as db:
+        assert len(db) == 100
+
+
+def test_append_with_index_rebuild(tmp_path, clean_df):
+    with build_trip_database(clean_df.iloc[:1_000], tmp_path / "trips.sqlite") as db:
+        db.append(clean_df.iloc[1_000:], rebuild_indexes=True)
+
+        indexes = {row[1] for row in db.connection.execute("PRAGMA index_list(trips)")}
+        assert len(indexes) == 6
+        pd.testing.assert_frame_equal(db.select().daily_trip_counts(), analytics.daily_trip_counts(clean_df))
+
+        # A failing append rolls back the dropped indexes with the rows
+        def failing_chunks():
+            yield clean_df.iloc[:10]
+            raise ValueError("bad chunk")
+
+        with pytest.raises(ValueError):
+            db.append(failing_chunks(), rebuild_indexes=True)
+        assert len(db) == len(clean_df)
+        assert {row[1] for row in db.connection.execute("PRAGMA index_list(trips)")} == indexes
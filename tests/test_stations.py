@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_loading import load_station_coordinates
+from src.stations import TRIP_DISTANCE_COL, add_trip_distance, build_station_index, haversine_km
+
+
+def sample_coords(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    coords = pd.DataFrame(
+        {
+            "station_id": np.arange(n) + 7000,
+            "station_name": [f"Station {i}" for i in range(n)],
+            "lat": 43.65 + rng.uniform(-0.1, 0.1, n),
+            "lon": -79.38 + rng.uniform(-0.15, 0.15, n),
+        }
+    )
+    coords.loc[5, ["lat", "lon"]] = np.nan
+    return coords
+
+
+def brute_force_distances(coords, lat, lon):
+    return pd.Series(haversine_km(lat, lon, coords["lat"], coords["lon"]), index=coords["station_id"])
+
+
+def test_haversine_known_distance():
+    # Toronto Union Station → CN Tower is roughly 0.5 km
+    assert haversine_km(43.6453, -79.3806, 43.6426, -79.3871) == pytest.approx(0.6, abs=0.1)
+    assert haversine_km(0, 0, 0, 180) == pytest.approx(np.pi * 6371.0088)
+
+
+def test_radius_and_nearest_match_brute_force():
+    coords = sample_coords()
+    index = build_station_index(coords)
+    expected = brute_force_distances(coords, 43.66, -79.40).dropna().sort_values()
+
+    within = index.within(43.66, -79.40, radius_km=2.5)
+    assert set(within["station_id"]) == set(expected[expected <= 2.5].index)
+    assert within["distance_km"].is_monotonic_increasing
+
+    nearest = index.nearest(43.66, -79.40, k=3)
+    assert nearest["station_id"].tolist() == expected.index[:3].tolist()
+    assert index.nearest(10.0, 10.0)["station_id"].tolist() == [
+        brute_force_distances(coords, 10.0, 10.0).idxmin()
+    ]
+
+
+def test_trip_distance_joins_on_station_ids():
+    coords = sample_coords()
+    index = build_station_index(coords)
+    trips = pd.DataFrame(
+        {"Start Station Id": [7000, 7001, 7005, 9999], "End Station Id": [7001, 7001, 7000, 7000]}
+    )
+
+    result = add_trip_distance(trips, index)
+
+    first = haversine_km(*coords.loc[0, ["lat", "lon"]], *coords.loc[1, ["lat", "lon"]])
+    assert result[TRIP_DISTANCE_COL].iloc[0] == pytest.approx(first, rel=1e-6)
+    assert result[TRIP_DISTANCE_COL].iloc[1] == 0
+    # Missing coordinates and unknown ids give NaN
+    assert result[TRIP_DISTANCE_COL].iloc[2:].isna().all()
+    assert TRIP_DISTANCE_COL not in trips.columns
+
+
+def test_load_station_coordinates_accepts_latitude_longitude(tmp_path):
+    path = tmp_path / "coords.csv"
+    pd.DataFrame(
+        {"station_id": [1], "station_name": ["A"], "latitude": [43.6], "longitude": [-79.4]}
+    ).to_csv(path, index=False)
+
+    coords = load_station_coordinates(str(path))
+
+    assert {"lat", "lon"} <= set(coords.columns)
+    assert build_station_index(coords).nearest(43.6, -79.4)["station_id"].tolist() == [1]
+
+
+def test_station_map_has_one_point_per_station():
+    from src.plots import build_station_map_figure
+
+    coords = sample_coords(10)
+    trips = pd.DataFrame({"Start Station Id": np.repeat([7000, 7001, 7002, 7005], 50)})
+
+    fig = build_station_map_figure(trips, build_station_index(coords))
+
+    # Station 7005 has no coordinates and is left out
+    assert len(fig.data[0].lat) == 3
+    assert sorted(fig.data[0].marker.size) == [50, 50, 50]
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_cleaning import full_clean_pipeline
+from src.data_loading import EXPECTED_TRIP_COLUMNS, load_raw_data
+from src.synthetic import generate_trips, iter_synthetic_trips, write_synthetic_csv
+
+
+def test_generate_trips_is_deterministic():
+    first = generate_trips(5_000, seed=3, chunk_rows=2_000)
+    again = generate_trips(5_000, seed=3, chunk_rows=2_000)
+    other = generate_trips(5_000, seed=4, chunk_rows=2_000)
+
+    pd.testing.assert_frame_equal(first, again)
+    assert not first["Start Time"].equals(other["Start Time"])
+
+
+def test_generate_trips_shape_and_cardinalities():
+    df = generate_trips(20_000, seed=0, n_stations=50, n_bikes=300, chunk_rows=7_000)
+
+    assert list(df.columns) == EXPECTED_TRIP_COLUMNS
+    assert len(df) == 20_000
+    assert df["Trip Id"].is_unique
+    assert df["Start Station Id"].nunique() == 50
+    assert df["Bike Id"].between(1, 300).all()
+    assert set(df["User Type"].dropna()) == {"Annual Member", "Casual Member"}
+    # Popular stations take far more than their even share of trips
+    assert df["Start Station Id"].value_counts().iloc[0] > 3 * len(df) / 50
+
+
+def test_chunks_share_stations_and_sizes():
+    chunks = list(iter_synthetic_trips(2_500, seed=1, chunk_rows=1_000, n_stations=20))
+
+    assert [len(c) for c in chunks] == [1_000, 1_000, 500]
+    names = {tuple(sorted(set(c["Start Station Name"]))) for c in chunks}
+    assert len(names) == 1
+
+
+def test_synthetic_csv_runs_through_pipeline(tmp_path):
+    path = write_synthetic_csv(tmp_path / "trips.csv", 10_000, seed=2, chunk_rows=4_000)
+
+    raw = load_raw_data(path)
+    generated = generate_trips(10_000, seed=2, chunk_rows=4_000)
+    for col in ["Trip Id", "Start Station Id", "Bike Id", "Start Time"]:
+        assert raw[col].tolist() == generated[col].tolist()
+    assert raw["End Time"].isna().sum() == generated["End Time"].isna().sum()
+
+    clean = full_clean_pipeline(raw)
+    # The invalid rows (missing End Time / User Type, negative duration) are dropped
+    assert 0 < len(raw) - len(clean) < 100
+    assert clean["trip_duration_min"].median() == pytest.approx(12, abs=2)
+
+
+def test_empty_and_invalid_sizes(tmp_path):
+    assert list(generate_trips(0).columns) == EXPECTED_TRIP_COLUMNS
+    assert load_raw_data(write_synthetic_csv(tmp_path / "empty.csv", 0)).empty
+    with pytest.raises(ValueError):
+        generate_trips(10, chunk_rows=0)